@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark de asignación punto→barrio: ``gpd.sjoin`` frente a ``BarrioGeometryIndex``.
+
+Genera 73 barrios sintéticos (Voronoi recortado al rectángulo de Barcelona, con
+bordes densificados para tener un número de vértices parecido al real) y 100k
+puntos aleatorios (un 5% fuera de la ciudad):
+
+- ``sjoin``: ruta anterior de ``_map_listings_to_barrios_geocoding``
+  (``iterrows`` + ``json.loads`` + ``shape()`` y ``gpd.sjoin`` en cada llamada).
+- ``index (build)``: construir ``BarrioGeometryIndex`` y asignar los puntos.
+- ``index (cached)``: asignar con el índice ya construido.
+- ``numpy``: backend de ray casting sin shapely.
+
+Uso:
+    python scripts/benchmark_assign_points.py --points 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.transform.geometry import BACKEND_NUMPY, BarrioGeometryIndex  # noqa: E402
+
+BBOX = (2.05, 41.32, 2.23, 41.47)
+
+
+def build_synthetic_barrios(n_barrios: int = 73, seed: int = 42) -> pd.DataFrame:
+    """Dimensión de barrios sintética con geometrías GeoJSON."""
+    import shapely
+
+    rng = np.random.default_rng(seed)
+    seeds = shapely.multipoints(
+        np.column_stack(
+            [rng.uniform(BBOX[0], BBOX[2], n_barrios), rng.uniform(BBOX[1], BBOX[3], n_barrios)]
+        )
+    )
+    cells = shapely.get_parts(shapely.voronoi_polygons(seeds, extend_to=shapely.box(*BBOX)))
+    cells = shapely.segmentize(shapely.intersection(cells, shapely.box(*BBOX)), 0.0003)
+    return pd.DataFrame(
+        {
+            "barrio_id": np.arange(1, len(cells) + 1),
+            "geometry_json": [json.dumps(shapely.geometry.mapping(cell)) for cell in cells],
+        }
+    )
+
+
+def assign_with_sjoin(barrios: pd.DataFrame, lon: np.ndarray, lat: np.ndarray) -> pd.Series:
+    """Ruta anterior: parseo fila a fila y ``gpd.sjoin``."""
+    import geopandas as gpd
+    from shapely.geometry import shape
+
+    geometries, barrio_ids = [], []
+    for _, row in barrios.iterrows():
+        geometries.append(shape(json.loads(row["geometry_json"])))
+        barrio_ids.append(row["barrio_id"])
+    barrios_gdf = gpd.GeoDataFrame({"barrio_id": barrio_ids}, geometry=geometries, crs="EPSG:4326")
+    points = gpd.GeoDataFrame(
+        {"id": np.arange(len(lon))}, geometry=gpd.points_from_xy(lon, lat), crs="EPSG:4326"
+    )
+    joined = gpd.sjoin(points, barrios_gdf, how="left", predicate="within")
+    result = pd.Series([None] * len(lon), dtype="Int64")
+    result.loc[joined.index] = joined["barrio_id"].values
+    return result
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=100_000, help="Puntos aleatorios")
+    args = parser.parse_args()
+
+    barrios = build_synthetic_barrios()
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(BBOX[0], BBOX[2], args.points)
+    lat = rng.uniform(BBOX[1], BBOX[3], args.points)
+    outside = rng.random(args.points) < 0.05
+    lon[outside] = 0.0
+    lat[outside] = 0.0
+
+    vertices = sum(len(json.loads(g)["coordinates"][0]) for g in barrios["geometry_json"])
+    print(f"Barrios: {len(barrios)} ({vertices:,} vértices)  Puntos: {args.points:,}")
+
+    expected, seconds = timed(assign_with_sjoin, barrios, lon, lat)
+    print(f"{'sjoin':>15}: {seconds:8.3f}s")
+
+    def build_and_assign(backend=None):
+        return BarrioGeometryIndex(barrios, backend=backend).assign_points(lon, lat)
+
+    index = BarrioGeometryIndex(barrios)
+    cases = [
+        ("index (build)", build_and_assign),
+        ("index (cached)", lambda: index.assign_points(lon, lat)),
+        ("numpy", lambda: build_and_assign(BACKEND_NUMPY)),
+    ]
+    for name, func in cases:
+        result, seconds = timed(func)
+        mismatches = int((result.fillna(-1) != expected.fillna(-1)).sum())
+        print(f"{name:>15}: {seconds:8.3f}s  diferencias vs sjoin: {mismatches}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga masiva en SQLite: ``DataFrame.to_sql`` frente a ``bulk_insert_dataframe``.
+
+Genera un ``fact_demografia_ampliada`` sintético (1M filas por defecto) y lo carga
+en dos bases de datos temporales con el esquema real:
+
+- ``to_sql``: ruta anterior de ``insert_dataframe_in_batches`` (lotes de 10k,
+  ``method='multi'``, ``chunksize=1000`` y ``gc.collect()`` por lote).
+- ``bulk``: ``bulk_insert_dataframe`` (``executemany`` en una transacción,
+  PRAGMAs de carga e índices diferidos).
+
+Uso:
+    python scripts/benchmark_bulk_load.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.database_setup import create_connection, create_database_schema  # noqa: E402
+from src.etl.batch_processor import bulk_insert_dataframe  # noqa: E402
+
+TABLE = "fact_demografia_ampliada"
+
+
+def build_synthetic_ampliada(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Genera un fact_demografia_ampliada sintético con la forma del real."""
+    rng = np.random.default_rng(seed)
+    grupos = np.array([f"{i}-{i + 4}" for i in range(0, 95, 5)] + ["95+"])
+    return pd.DataFrame(
+        {
+            "barrio_id": rng.integers(1, 74, rows),
+            "anio": rng.integers(2015, 2025, rows),
+            "sexo": rng.choice(np.array(["hombre", "mujer"]), rows),
+            "grupo_edad": rng.choice(grupos, rows),
+            "nacionalidad": rng.choice(np.array(["Espanya", "Estranger", None], dtype=object), rows),
+            "poblacion": rng.integers(0, 2000, rows),
+            "barrio_nombre_normalizado": "barrio",
+            "dataset_id": "benchmark",
+            "source": "synthetic",
+            "etl_loaded_at": "2024-01-01T00:00:00",
+        }
+    )
+
+
+def load_with_to_sql(df: pd.DataFrame, conn, batch_size: int = 10000) -> None:
+    """Ruta de carga anterior basada en ``DataFrame.to_sql``."""
+    conn.execute("PRAGMA foreign_keys=OFF")
+    for i in range(0, len(df), batch_size):
+        batch = df.iloc[i:i + batch_size]
+        batch.to_sql(TABLE, conn, if_exists="append", index=False, method="multi", chunksize=1000)
+        del batch
+        gc.collect()
+    conn.commit()
+
+
+def run_case(name: str, df: pd.DataFrame, db_path: Path) -> float:
+    conn = create_connection(db_path)
+    create_database_schema(conn)
+    start = time.perf_counter()
+    if name == "to_sql":
+        load_with_to_sql(df, conn)
+    else:
+        bulk_insert_dataframe(df, TABLE, conn)
+    elapsed = time.perf_counter() - start
+    loaded = conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+    conn.close()
+    if loaded != len(df):
+        raise RuntimeError(f"{name}: se esperaban {len(df)} filas y se cargaron {loaded}")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas sintéticas")
+    args = parser.parse_args()
+
+    df = build_synthetic_ampliada(args.rows)
+    print(f"Filas: {len(df):,}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("to_sql", "bulk"):
+            seconds = run_case(name, df, Path(tmp) / f"{name}.db")
+            print(f"{name:>7}: {seconds:8.2f}s  {len(df) / seconds:12,.0f} filas/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
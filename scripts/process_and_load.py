@@ -34,6 +34,23 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Ruta del archivo SQLite a generar (por defecto data/processed/database.db)",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Solo recalcula las tablas de hechos cuyos archivos de entrada han cambiado",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Procesos para las etapas de preparación en paralelo (0 = todas las CPUs; "
+        "por defecto ETL_MAX_WORKERS o 1)",
+    )
+    parser.add_argument(
+        "--no-materialize-views",
+        action="store_true",
+        help="Mantiene las vistas analíticas como vistas SQLite sin materializarlas en tablas mv_*",
+    )
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -62,6 +79,9 @@ def main() -> int:
             raw_base_dir=Path(args.raw_dir),
             processed_dir=Path(args.processed_dir),
             db_path=Path(args.db_path) if args.db_path else None,
+            incremental=args.incremental,
+            max_workers=args.workers,
+            materialize_views=not args.no_materialize_views,
         )
         logging.info("ETL finalizado. Base de datos disponible en %s", db_path)
         print(f"✅ ETL completado. Base de datos: {db_path}")
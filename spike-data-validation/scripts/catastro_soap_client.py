@@ -7,6 +7,10 @@ obtener datos no protegidos de inmuebles (superficie, año construcción, uso).
 URL Endpoint: http://ovc.catastro.meh.es/ovcservweb/OVCSWLocalizacionRC/OVCCoordenadas.asmx
 Operación: Consulta_DNPRC (Datos No Protegidos por Referencia Catastral)
 
+Para lotes grandes, ``CatastroBatchFetcher`` (y ``get_buildings_batch``) consulta
+en paralelo bajo un límite de tasa, reintenta errores transitorios y guarda las
+respuestas en una caché SQLite.
+
 Issue: #200
 Author: Equipo A - Data Infrastructure
 Enfoque: 100% gratuito, oficial, sin dependencias externas
@@ -14,10 +18,18 @@ Enfoque: 100% gratuito, oficial, sin dependencias externas
 
 from __future__ import annotations
 
+import json
 import logging
+import random
+import sqlite3
+import threading
+import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
 
 import requests
 
@@ -42,6 +54,10 @@ class CatastroSOAPError(Exception):
     """Error de alto nivel para problemas con la API SOAP del Catastro."""
 
 
+class CatastroSOAPTransientError(CatastroSOAPError):
+    """Error transitorio (red, timeout, HTTP 429/5xx) que puede reintentarse."""
+
+
 class CatastroSOAPClient:
     """
     Cliente para la API SOAP oficial del Catastro.
@@ -79,20 +95,10 @@ class CatastroSOAPClient:
         provincia = "08"  # Barcelona
         municipio = "019"  # Barcelona ciudad
         
-        # #region agent log
-        import json
-        import time
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2,H3,H4,H5","location":"catastro_soap_client.py:_build_soap_request","message":"Construyendo SOAP request","data":{"provincia":provincia,"municipio":municipio,"ref":referencia_catastral,"ref_len":len(referencia_catastral)},"timestamp":int(time.time()*1000)}) + '\n')
-        # #endregion
         
         # Normalizar referencia: truncar a 20 caracteres si tiene 21
         ref_normalized = referencia_catastral[:20] if len(referencia_catastral) > 20 else referencia_catastral
         
-        # #region agent log
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H5","location":"catastro_soap_client.py:_build_soap_request","message":"Referencia normalizada","data":{"ref_original":referencia_catastral,"ref_normalized":ref_normalized,"original_len":len(referencia_catastral),"normalized_len":len(ref_normalized)},"timestamp":int(time.time()*1000)}) + '\n')
-        # #endregion
         
         # Formato según documentación oficial del Catastro
         # NOTA: zeep usa RC como parámetro Python, pero el elemento XML correcto es RefCat
@@ -107,10 +113,6 @@ class CatastroSOAPClient:
   </soap:Body>
 </soap:Envelope>"""
         
-        # #region agent log
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H3","location":"catastro_soap_client.py:_build_soap_request","message":"SOAP body generado (orden: Provincia, Municipio, RefCat)","data":{"soap_body_preview":soap_body[:200]},"timestamp":int(time.time()*1000)}) + '\n')
-        # #endregion
         
         return soap_body
 
@@ -251,7 +253,8 @@ class CatastroSOAPClient:
         except (ValueError, AttributeError) as exc:
             raise CatastroSOAPError(f"Error al extraer datos del XML: {exc}") from exc
 
-    def _normalize_referencia_catastral(self, ref_catastral: str) -> str:
+    @staticmethod
+    def _normalize_referencia_catastral(ref_catastral: str) -> str:
         """
         Normaliza una referencia catastral al formato esperado por la API SOAP.
 
@@ -264,11 +267,6 @@ class CatastroSOAPClient:
         Returns:
             Referencia normalizada a 20 caracteres.
         """
-        # #region agent log
-        import json
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H1,H3,H4","location":"catastro_soap_client.py:_normalize_referencia_catastral","message":"Normalizando referencia","data":{"original":ref_catastral,"len_original":len(ref_catastral)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-        # #endregion
         
         ref_clean = ref_catastral.strip().upper()
         
@@ -277,18 +275,10 @@ class CatastroSOAPClient:
             # Hipótesis: El último carácter puede ser un checksum o separador
             # Intentar truncar a 20 caracteres
             ref_normalized = ref_clean[:20]
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H3","location":"catastro_soap_client.py:_normalize_referencia_catastral","message":"Truncado de 21 a 20","data":{"original":ref_clean,"normalized":ref_normalized,"removed_char":ref_clean[20]},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
             return ref_normalized
         elif len(ref_clean) == 20:
             return ref_clean
         else:
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H5","location":"catastro_soap_client.py:_normalize_referencia_catastral","message":"Formato inesperado","data":{"original":ref_clean,"len":len(ref_clean)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
             return ref_clean
 
     def get_building_by_rc(self, ref_catastral: str) -> Dict[str, Any]:
@@ -309,22 +299,11 @@ class CatastroSOAPClient:
         Raises:
             CatastroSOAPError: Si la API devuelve un error o el payload es inválido.
         """
-        # #region agent log
-        import json
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H1","location":"catastro_soap_client.py:get_building_by_rc","message":"Entrada función","data":{"ref_original":ref_catastral,"len_original":len(ref_catastral) if ref_catastral else 0},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-        # #endregion
-        
         if not ref_catastral:
             raise CatastroSOAPError("La referencia catastral está vacía")
 
         # Normalizar referencia (21 -> 20 caracteres si es necesario)
         ref_normalized = self._normalize_referencia_catastral(ref_catastral)
-        
-        # #region agent log
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H1","location":"catastro_soap_client.py:get_building_by_rc","message":"Después normalización","data":{"ref_normalized":ref_normalized,"len_normalized":len(ref_normalized)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-        # #endregion
 
         if len(ref_normalized) != 20:
             raise CatastroSOAPError(
@@ -334,77 +313,32 @@ class CatastroSOAPClient:
 
         # Construir petición SOAP con referencia normalizada
         soap_body = self._build_soap_request(ref_normalized)
-        
-        # #region agent log
-        import json
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2","location":"catastro_soap_client.py:get_building_by_rc","message":"Antes petición SOAP","data":{"ref_usada":ref_normalized},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-        # #endregion
 
         try:
             # Realizar petición SOAP
-            # #region agent log
-            import json
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H6,H7","location":"catastro_soap_client.py:get_building_by_rc","message":"Enviando petición SOAP","data":{"url":self.config.base_url,"ref":ref_normalized,"soap_body_len":len(soap_body),"soap_body":soap_body},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
-            
             response = self.session.post(
                 self.config.base_url,
                 data=soap_body.encode("utf-8"),
                 timeout=self.config.timeout,
             )
-            
-            # #region agent log
-            import json
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H6,H7","location":"catastro_soap_client.py:get_building_by_rc","message":"Respuesta HTTP recibida","data":{"ref":ref_normalized,"status_code":response.status_code,"response_preview":response.text[:1000] if response.text else "empty","headers":dict(response.headers)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
-            
             response.raise_for_status()
         except requests.RequestException as exc:
-            # #region agent log
-            import json
-            response_text = None
-            status_code = None
-            if hasattr(exc, 'response') and exc.response is not None:
-                response_text = exc.response.text[:1000] if exc.response.text else None
-                status_code = exc.response.status_code
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2,H6,H7","location":"catastro_soap_client.py:get_building_by_rc","message":"Error de red/HTTP","data":{"ref":ref_normalized,"error":str(exc),"status_code":status_code,"response_text":response_text},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
+            status_code = exc.response.status_code if exc.response is not None else None
+            if status_code is None or status_code == 429 or status_code >= 500:
+                raise CatastroSOAPTransientError(
+                    f"Error de red al consultar Catastro SOAP: {exc}"
+                ) from exc
             raise CatastroSOAPError(f"Error de red al consultar Catastro SOAP: {exc}") from exc
 
-        # #region agent log
-        import json
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2","location":"catastro_soap_client.py:get_building_by_rc","message":"Respuesta HTTP recibida","data":{"ref":ref_normalized,"status_code":response.status_code,"response_len":len(response.text)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-        # #endregion
-
         # Parsear respuesta
         try:
             resultado = self._parse_soap_response(response.text)
             resultado["referencia_catastral"] = ref_normalized
-            # #region agent log
-            import json
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2","location":"catastro_soap_client.py:get_building_by_rc","message":"Respuesta exitosa","data":{"ref_original":ref_catastral,"ref_normalized":ref_normalized,"superficie":resultado.get("superficie_m2")},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
             logger.debug("Respuesta Catastro SOAP para %s: %s", ref_normalized, resultado)
             return resultado
-        except CatastroSOAPError as parse_exc:
-            # #region agent log
-            import json
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2","location":"catastro_soap_client.py:get_building_by_rc","message":"Error parsing respuesta","data":{"ref":ref_normalized,"error":str(parse_exc),"response_preview":response.text[:500]},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
+        except CatastroSOAPError:
             raise
         except Exception as exc:
-            # #region agent log
-            import json
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2","location":"catastro_soap_client.py:get_building_by_rc","message":"Error inesperado parsing","data":{"ref":ref_normalized,"error":str(exc)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
             raise CatastroSOAPError(f"Error inesperado al procesar respuesta: {exc}") from exc
 
     def get_buildings_batch(
@@ -412,69 +346,39 @@ class CatastroSOAPClient:
         referencias: list[str],
         continue_on_error: bool = True,
         delay_seconds: float = 1.0,
+        max_workers: int = 1,
+        cache_path: Optional[Path] = None,
     ) -> list[dict[str, Any]]:
         """
         Obtiene información de múltiples inmuebles en lote.
 
+        Delegado en ``CatastroBatchFetcher``: ``max_workers`` peticiones
+        concurrentes como máximo, ``1 / delay_seconds`` peticiones por segundo
+        (token bucket), reintentos con backoff para errores transitorios y, si
+        se indica ``cache_path``, caché SQLite de respuestas para que las
+        re-ejecuciones solo consulten referencias nuevas.
+
         Args:
             referencias: Lista de referencias catastrales.
             continue_on_error: Si True, continúa aunque haya errores individuales.
-            delay_seconds: Delay entre peticiones para evitar rate limiting.
+            delay_seconds: Intervalo medio entre peticiones para evitar rate limiting.
+            max_workers: Peticiones concurrentes como máximo.
+            cache_path: Ruta opcional de la caché SQLite de respuestas.
 
         Returns:
             Lista de diccionarios con datos de inmuebles (solo los exitosos).
         """
-        import time
-
-        resultados: list[dict[str, Any]] = []
-        total = len(referencias)
-
-        logger.info(f"Iniciando extracción batch de {total} referencias...")
-
-        for idx, ref in enumerate(referencias, start=1):
-            # #region agent log
-            import json
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H1","location":"catastro_soap_client.py:get_buildings_batch","message":"Procesando referencia en batch","data":{"idx":idx,"total":total,"ref":ref,"len":len(ref)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
-            try:
-                resultado = self.get_building_by_rc(ref)
-                resultados.append(resultado)
-                # #region agent log
-                import json
-                with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2","location":"catastro_soap_client.py:get_buildings_batch","message":"Referencia exitosa","data":{"idx":idx,"ref":ref,"superficie":resultado.get("superficie_m2")},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-                # #endregion
-                logger.info(f"({idx}/{total}) ✓ {ref}: {resultado.get('superficie_m2')} m²")
-            except CatastroSOAPError as exc:
-                # #region agent log
-                import json
-                with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2","location":"catastro_soap_client.py:get_buildings_batch","message":"Error en referencia","data":{"idx":idx,"ref":ref,"error":str(exc)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-                # #endregion
-                if continue_on_error:
-                    logger.warning(f"({idx}/{total}) ✗ {ref}: {exc}")
-                    continue
-                else:
-                    raise
-            except Exception as exc:
-                # #region agent log
-                import json
-                with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H2","location":"catastro_soap_client.py:get_buildings_batch","message":"Error inesperado","data":{"idx":idx,"ref":ref,"error":str(exc),"error_type":type(exc).__name__},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-                # #endregion
-                if continue_on_error:
-                    logger.warning(f"({idx}/{total}) ✗ {ref}: Error inesperado: {exc}")
-                    continue
-                else:
-                    raise
-
-            # Delay entre peticiones para evitar rate limiting
-            if idx < total and delay_seconds > 0:
-                time.sleep(delay_seconds)
-
-        logger.info(f"Extracción batch completada: {len(resultados)}/{total} exitosos")
-        return resultados
+        fetcher = CatastroBatchFetcher(
+            config=self.config,
+            max_workers=max_workers,
+            rate_per_second=1.0 / delay_seconds if delay_seconds > 0 else None,
+            cache=ResponseCache(cache_path) if cache_path is not None else None,
+        )
+        try:
+            result = fetcher.fetch(referencias, continue_on_error=continue_on_error)
+        finally:
+            fetcher.close()
+        return result.resultados
 
     def get_rc_by_address(
         self,
@@ -508,11 +412,6 @@ class CatastroSOAPClient:
         Raises:
             CatastroSOAPError: Si hay error en la petición SOAP
         """
-        # #region agent log
-        import json
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H35","location":"catastro_soap_client.py:get_rc_by_address","message":"Buscando RC por dirección","data":{"provincia":provincia,"municipio":municipio,"tipo_via":tipo_via,"nombre_via":nombre_via,"numero":numero},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-        # #endregion
 
         # Construir SOAP request para Consulta_DNPLOC según documentación oficial
         # Formato según ejemplos oficiales del Catastro
@@ -538,10 +437,6 @@ class CatastroSOAPClient:
   </soap:Body>
 </soap:Envelope>"""
 
-        # #region agent log
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H35","location":"catastro_soap_client.py:get_rc_by_address","message":"SOAP request construido","data":{"soap_body":soap_body},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-        # #endregion
 
         try:
             # Usar SOAPAction específico para Consulta_DNPLOC
@@ -557,10 +452,6 @@ class CatastroSOAPClient:
                 timeout=self.config.timeout,
             )
 
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H35","location":"catastro_soap_client.py:get_rc_by_address","message":"Respuesta recibida","data":{"status_code":response.status_code,"response_preview":response.text[:500]},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
 
             response.raise_for_status()
 
@@ -598,10 +489,6 @@ class CatastroSOAPClient:
                 pc2 = pc2_elem.text.strip() if pc2_elem.text else ""
                 referencia_completa = f"{pc1}{pc2}"
 
-                # #region agent log
-                with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H35","location":"catastro_soap_client.py:get_rc_by_address","message":"Referencia encontrada","data":{"pc1":pc1,"pc2":pc2,"referencia_completa":referencia_completa},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-                # #endregion
 
                 logger.debug(f"Referencia encontrada: {referencia_completa}")
                 return referencia_completa
@@ -620,16 +507,8 @@ class CatastroSOAPClient:
             return None
 
         except requests.RequestException as exc:
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H35","location":"catastro_soap_client.py:get_rc_by_address","message":"Error de red","data":{"error":str(exc)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
             raise CatastroSOAPError(f"Error de red al consultar por dirección: {exc}") from exc
         except ET.ParseError as exc:
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H35","location":"catastro_soap_client.py:get_rc_by_address","message":"Error parsing XML","data":{"error":str(exc)},"timestamp":int(__import__('time').time()*1000)}) + '\n')
-            # #endregion
             raise CatastroSOAPError(f"Error al parsear respuesta XML: {exc}") from exc
 
     def get_building_by_coordinates(
@@ -652,12 +531,6 @@ class CatastroSOAPClient:
         Raises:
             CatastroSOAPError: Si hay error en la petición
         """
-        # #region agent log
-        import json
-        import time
-        with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALTERNATIVE","location":"catastro_soap_client.py:get_building_by_coordinates","message":"Consultando por coordenadas","data":{"lon":lon,"lat":lat,"srs":srs},"timestamp":int(time.time()*1000)}) + '\n')
-        # #endregion
         
         url = "http://ovc.catastro.meh.es/ovcservweb/OVCSWLocalizacionRC/OVCCoordenadas.asmx/Consulta_RCCOOR"
         params = {
@@ -670,10 +543,6 @@ class CatastroSOAPClient:
             response = requests.get(url, params=params, timeout=self.config.timeout)
             response.raise_for_status()
             
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALTERNATIVE","location":"catastro_soap_client.py:get_building_by_coordinates","message":"Respuesta recibida","data":{"status_code":response.status_code,"response_preview":response.text[:500]},"timestamp":int(time.time()*1000)}) + '\n')
-            # #endregion
             
             # Parsear respuesta
             root = ET.fromstring(response.text)
@@ -688,10 +557,6 @@ class CatastroSOAPClient:
             
             ref_catastral = f"{pc1_elem.text}{pc2_elem.text}"
             
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALTERNATIVE","location":"catastro_soap_client.py:get_building_by_coordinates","message":"Referencia obtenida","data":{"ref":ref_catastral},"timestamp":int(time.time()*1000)}) + '\n')
-            # #endregion
             
             # Consulta_RCCOOR devuelve referencias de 14 caracteres (PC1 + PC2)
             # Consulta_DNPRC requiere 20 caracteres, pero actualmente falla con error "LA PROVINCIA NO EXISTE"
@@ -721,37 +586,254 @@ class CatastroSOAPClient:
                     # Si funciona, combinar datos
                     building_data.update(rc_data)
                     building_data["metodo"] = "coordenadas+RC"
-                    # #region agent log
-                    with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                        f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALTERNATIVE","location":"catastro_soap_client.py:get_building_by_coordinates","message":"Datos obtenidos por RC","data":{"ref":ref_catastral,"superficie":rc_data.get("superficie_m2")},"timestamp":int(time.time()*1000)}) + '\n')
-                    # #endregion
                 except CatastroSOAPError as rc_error:
                     # Si Consulta_DNPRC falla (esperado actualmente), mantener datos de coordenadas
                     logger.warning(
                         f"Consulta_DNPRC falló para {ref_catastral} (esperado): {rc_error}"
                     )
-                    # #region agent log
-                    with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                        f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALTERNATIVE","location":"catastro_soap_client.py:get_building_by_coordinates","message":"Consulta_DNPRC falló (esperado)","data":{"ref":ref_catastral,"error":str(rc_error)},"timestamp":int(time.time()*1000)}) + '\n')
-                    # #endregion
             
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALTERNATIVE","location":"catastro_soap_client.py:get_building_by_coordinates","message":"Datos devueltos","data":{"ref":ref_catastral,"direccion":direccion,"metodo":building_data.get("metodo")},"timestamp":int(time.time()*1000)}) + '\n')
-            # #endregion
             
             return building_data
                 
         except requests.RequestException as exc:
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALTERNATIVE","location":"catastro_soap_client.py:get_building_by_coordinates","message":"Error de red","data":{"error":str(exc)},"timestamp":int(time.time()*1000)}) + '\n')
-            # #endregion
             raise CatastroSOAPError(f"Error de red al consultar por coordenadas: {exc}") from exc
         except ET.ParseError as exc:
-            # #region agent log
-            with open('/Users/adrianiraeguialvear/Projects/barcelona-housing-demographics-analyzer/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALTERNATIVE","location":"catastro_soap_client.py:get_building_by_coordinates","message":"Error parsing XML","data":{"error":str(exc)},"timestamp":int(time.time()*1000)}) + '\n')
-            # #endregion
             raise CatastroSOAPError(f"Error al parsear respuesta XML: {exc}") from exc
 
+
+class TokenBucket:
+    """
+    Limitador de tasa *token bucket* seguro entre hilos.
+
+    Attributes:
+        rate: Tokens repuestos por segundo.
+        capacity: Tokens máximos acumulables (ráfaga permitida).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate debe ser positivo")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Consume un token, esperando si no hay ninguno disponible.
+
+        Returns:
+            Segundos esperados.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class ResponseCache:
+    """
+    Caché en disco (SQLite) de respuestas parseadas por referencia catastral.
+
+    Attributes:
+        path: Ruta del archivo SQLite.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS catastro_responses (
+                    referencia TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def get_many(self, referencias: list[str]) -> Dict[str, Dict[str, Any]]:
+        """Devuelve las respuestas en caché de las referencias indicadas."""
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for start in range(0, len(referencias), 500):
+                chunk = referencias[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT referencia, payload FROM catastro_responses WHERE referencia IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update({ref: json.loads(payload) for ref, payload in rows})
+        return found
+
+    def put(self, referencia: str, payload: Dict[str, Any]) -> None:
+        """Guarda (o reemplaza) la respuesta de una referencia."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO catastro_responses (referencia, payload, fetched_at) VALUES (?, ?, ?)",
+                (referencia, json.dumps(payload, ensure_ascii=False), datetime.now().isoformat()),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM catastro_responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class BatchResult:
+    """
+    Resultado de ``CatastroBatchFetcher.fetch``.
+
+    Attributes:
+        resultados: Inmuebles obtenidos, en el orden de las referencias de entrada.
+        errores: Mensaje de error por referencia fallida.
+        cache_hits: Referencias servidas desde la caché.
+        fetched: Referencias consultadas al servicio.
+        retries: Reintentos realizados por errores transitorios.
+    """
+
+    resultados: list[dict[str, Any]] = field(default_factory=list)
+    errores: Dict[str, str] = field(default_factory=dict)
+    cache_hits: int = 0
+    fetched: int = 0
+    retries: int = 0
+
+
+class CatastroBatchFetcher:
+    """
+    Consulta concurrente de referencias catastrales.
+
+    - ``max_workers`` hilos, cada uno con su propio ``CatastroSOAPClient``
+      (``requests.Session`` no es seguro entre hilos).
+    - Un ``TokenBucket`` compartido limita las peticiones por segundo.
+    - Los errores transitorios (``CatastroSOAPTransientError``) se reintentan
+      con backoff exponencial con *jitter* completo.
+    - Las respuestas correctas se guardan en ``ResponseCache``; las referencias
+      ya en caché no se vuelven a consultar.
+    """
+
+    def __init__(
+        self,
+        config: Optional[CatastroSOAPConfig] = None,
+        max_workers: int = 4,
+        rate_per_second: Optional[float] = 2.0,
+        burst: Optional[float] = None,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        cache: Optional[ResponseCache] = None,
+        client_factory: Optional[Callable[[], CatastroSOAPClient]] = None,
+    ) -> None:
+        self.config = config or CatastroSOAPConfig()
+        self.max_workers = max(1, int(max_workers))
+        self.bucket = TokenBucket(rate_per_second, burst) if rate_per_second else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self._client_factory = client_factory or (lambda: CatastroSOAPClient(self.config))
+        self._local = threading.local()
+        self._retries = 0
+        self._retries_lock = threading.Lock()
+
+    def _client(self) -> CatastroSOAPClient:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._client_factory()
+            self._local.client = client
+        return client
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera con *full jitter*: uniforme en [0, min(max, base·2^intento)]."""
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _fetch_one(self, referencia: str) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                return self._client().get_building_by_rc(referencia)
+            except CatastroSOAPTransientError as exc:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                with self._retries_lock:
+                    self._retries += 1
+                logger.debug("Reintento %s para %s en %.2fs: %s", attempt + 1, referencia, delay, exc)
+                time.sleep(delay)
+        raise CatastroSOAPError(f"Sin respuesta para {referencia}")  # pragma: no cover
+
+    def fetch(self, referencias: list[str], continue_on_error: bool = True) -> BatchResult:
+        """
+        Obtiene los inmuebles de una lista de referencias.
+
+        Args:
+            referencias: Referencias catastrales (se normalizan y deduplican).
+            continue_on_error: Si False, el primer error cancela el lote y se propaga.
+
+        Returns:
+            ``BatchResult`` con los inmuebles en el orden de entrada.
+
+        Raises:
+            CatastroSOAPError: Si ``continue_on_error`` es False y falla una referencia.
+        """
+        normalize = CatastroSOAPClient._normalize_referencia_catastral
+        unique = list(dict.fromkeys(normalize(ref) for ref in referencias if ref))
+        result = BatchResult()
+        found = self.cache.get_many(unique) if self.cache is not None else {}
+        result.cache_hits = len(found)
+        pending = [ref for ref in unique if ref not in found]
+        self._retries = 0
+
+        logger.info(
+            "Iniciando extracción batch de %s referencias (%s en caché, %s hilos)...",
+            len(unique), result.cache_hits, self.max_workers,
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._fetch_one, ref): ref for ref in pending}
+            for done, future in enumerate(as_completed(futures), start=1):
+                ref = futures[future]
+                try:
+                    found[ref] = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    if not continue_on_error:
+                        for other in futures:
+                            other.cancel()
+                        raise
+                    result.errores[ref] = str(exc)
+                    logger.warning("(%s/%s) ✗ %s: %s", done, len(pending), ref, exc)
+                    continue
+                result.fetched += 1
+                if self.cache is not None:
+                    self.cache.put(ref, found[ref])
+                logger.debug("(%s/%s) ✓ %s", done, len(pending), ref)
+
+        result.resultados = [found[ref] for ref in unique if ref in found]
+        result.retries = self._retries
+        logger.info(
+            "Extracción batch completada: %s/%s exitosos (%s desde caché, %s reintentos)",
+            len(result.resultados), len(unique), result.cache_hits, result.retries,
+        )
+        return result
+
+    def close(self) -> None:
+        """Cierra la caché en disco (si la hay)."""
+        if self.cache is not None:
+            self.cache.close()
+
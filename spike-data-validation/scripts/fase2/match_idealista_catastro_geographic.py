@@ -315,57 +315,38 @@ def match_idealista_catastro_geographic(
         logger.error("No se pudo importar calculate_heuristic_score. Abortando.")
         raise ImportError("calculate_heuristic_score no disponible")
     
-    matches = []
+    from match_idealista_catastro_improved import prepare_matching_frames
+    from src.transform.matching import CatastroMatcher
     
     logger.info(f"Buscando matches entre {len(df_idealista)} propiedades Idealista y {len(df_catastro)} edificios Catastro...")
     
+    # Matching por bloques (rejilla de max_distance metros / barrio) vectorizado:
+    # sustituye el doble bucle iterrows sobre todos los pares
+    listings, buildings = prepare_matching_frames(df_idealista, df_catastro)
+    catastro_lat = 'catastro_lat' if 'catastro_lat' in df_catastro.columns else 'lat'
+    catastro_lon = 'catastro_lon' if 'catastro_lon' in df_catastro.columns else 'lon'
+    matcher = CatastroMatcher(
+        buildings,
+        barrio_col='_barrio',
+        lat_col=catastro_lat,
+        lon_col=catastro_lon,
+        max_distance_m=max_distance,
+    )
+    result = matcher.match(
+        listings,
+        barrio_col='_barrio',
+        features_col='_features',
+        geographic_weight=geographic_weight,
+        min_score=min_combined_score,
+    )
+    
+    matches = []
     for idx_idealista, idealista_row in df_idealista.iterrows():
-        best_match = None
-        best_combined_score = 0.0
-        best_distance = float('inf')
-        
-        # Verificar que Idealista tiene coordenadas
-        idealista_lat = idealista_row.get('lat')
-        idealista_lon = idealista_row.get('lon')
-        
-        if pd.isna(idealista_lat) or pd.isna(idealista_lon):
-            # Si no tiene coordenadas, usar solo matching heurístico
-            logger.debug(f"Propiedad {idx_idealista} sin coordenadas, usando solo matching heurístico")
-            for idx_catastro, catastro_row in df_catastro.iterrows():
-                heuristic_score = calculate_heuristic_score(idealista_row, catastro_row)
-                if heuristic_score > best_combined_score:
-                    best_combined_score = heuristic_score
-                    best_match = (idx_catastro, catastro_row, 0.0, heuristic_score, float('inf'))
-        else:
-            # Buscar mejor match considerando distancia geográfica
-            for idx_catastro, catastro_row in df_catastro.iterrows():
-                # Calcular score heurístico
-                heuristic_score = calculate_heuristic_score(idealista_row, catastro_row)
-                
-                # Calcular score geográfico
-                distance_m, geographic_score = match_by_coordinates(
-                    idealista_row, catastro_row, max_distance
-                )
-                
-                # Combinar scores
-                combined_score = combine_scores(
-                    heuristic_score, geographic_score, geographic_weight
-                )
-                
-                # Actualizar mejor match
-                if combined_score > best_combined_score:
-                    best_combined_score = combined_score
-                    best_match = (
-                        idx_catastro, catastro_row,
-                        geographic_score, heuristic_score, distance_m
-                    )
-        
-        # Si encontramos un match con score suficiente
-        if best_match and best_combined_score >= min_combined_score:
-            idx_catastro, catastro_row, geo_score, heur_score, distance = best_match
-            
-            # Crear fila combinada
-            match_row = idealista_row.to_dict()
+        match = result.loc[idx_idealista]
+        match_row = idealista_row.to_dict()
+        if match['matched']:
+            catastro_row = df_catastro.loc[match['catastro_index']]
+            distance = match['match_distance_m']
             match_row.update({
                 'catastro_referencia_catastral': catastro_row.get('referencia_catastral'),
                 'catastro_direccion_normalizada': catastro_row.get('direccion_normalizada'),
@@ -376,25 +357,20 @@ def match_idealista_catastro_geographic(
                 'catastro_lon': catastro_row.get('lon') or catastro_row.get('catastro_lon'),
                 'catastro_barrio_id': catastro_row.get('barrio_id'),
                 'catastro_barrio_nombre': catastro_row.get('barrio_nombre'),
-                'match_score_geographic': geo_score,
-                'match_score_heuristic': heur_score,
-                'match_score_combined': best_combined_score,
-                'match_distance_m': distance,
-                'match_method': 'geographic+heuristic' if distance < float('inf') else 'heuristic_only',
+                'match_score_geographic': 0.0 if pd.isna(match['match_score_geographic']) else match['match_score_geographic'],
+                'match_score_heuristic': match['match_score_heuristic'],
+                'match_score_combined': match['match_score'],
+                'match_distance_m': float('inf') if pd.isna(distance) else distance,
+                'match_method': match['match_method'],
                 'matched': True
             })
-            matches.append(match_row)
         else:
             # Sin match
-            match_row = idealista_row.to_dict()
             match_row.update({
                 'matched': False,
-                'match_score_combined': best_combined_score if best_match else 0.0
+                'match_score_combined': match['match_score']
             })
-            matches.append(match_row)
-        
-        if (idx_idealista + 1) % 50 == 0:
-            logger.info(f"  Procesadas {idx_idealista + 1}/{len(df_idealista)} propiedades...")
+        matches.append(match_row)
     
     df_matched = pd.DataFrame(matches)
     
@@ -22,12 +22,19 @@ import argparse
 import json
 import logging
 import re
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.transform.matching import CatastroMatcher  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 # Rutas por defecto
@@ -330,6 +337,54 @@ def calculate_match_score(
     return score
 
 
+def prepare_matching_frames(
+    df_idealista: pd.DataFrame,
+    df_catastro: pd.DataFrame,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Prepara las entradas de ``CatastroMatcher`` a partir de los CSV del spike.
+    
+    Extrae el barrio normalizado de la localidad de Idealista (columna
+    ``_barrio``, clave de bloqueo) y la presencia de características en la
+    descripción (``_features``). Las columnas ``lat``/``lon`` de Idealista se
+    conservan si existen.
+    
+    Args:
+        df_idealista: DataFrame con propiedades de Idealista
+        df_catastro: DataFrame con datos de Catastro
+        
+    Returns:
+        Tupla (anuncios, edificios) con el mismo índice que las entradas
+    """
+    idealista_barrio = (
+        df_idealista['localidad'].map(extract_barrio_from_localidad)
+        if 'localidad' in df_idealista.columns
+        else pd.Series(None, index=df_idealista.index, dtype=object)
+    )
+    descripcion = df_idealista.get('descripcion', pd.Series('', index=df_idealista.index)).astype(str)
+    detalles = df_idealista.get('detalles', pd.Series('', index=df_idealista.index)).astype(str)
+    listings = pd.DataFrame(
+        {
+            '_barrio': idealista_barrio,
+            'superficie_m2': df_idealista.get('superficie_m2'),
+            'habitaciones': df_idealista.get('habitaciones'),
+            'lat': df_idealista.get('lat'),
+            'lon': df_idealista.get('lon'),
+            '_features': (descripcion + ' ' + detalles).map(
+                lambda text: any(extract_features_from_description(text).values())
+            ),
+        },
+        index=df_idealista.index,
+    )
+    catastro_barrio = (
+        df_catastro['barrio_nombre'].map(normalize_barrio_name).replace('', None)
+        if 'barrio_nombre' in df_catastro.columns
+        else pd.Series(None, index=df_catastro.index, dtype=object)
+    )
+    buildings = df_catastro.assign(_barrio=catastro_barrio)
+    return listings, buildings
+
+
 def match_heuristic(
     df_idealista: pd.DataFrame,
     df_catastro: pd.DataFrame,
@@ -352,51 +407,45 @@ def match_heuristic(
     logger.info(f"   Idealista: {len(df_idealista)} propiedades")
     logger.info(f"   Catastro: {len(df_catastro)} edificios")
     
+    # Matching por bloques de barrio vectorizado (src.transform.matching) en lugar
+    # de comparar cada propiedad con todos los edificios (O(N×M) con iterrows)
+    listings, buildings = prepare_matching_frames(df_idealista, df_catastro)
+    idealista_barrio = listings['_barrio']
+    matcher = CatastroMatcher(buildings, barrio_col='_barrio', lat_col=None, lon_col=None)
+    result = matcher.match(
+        listings,
+        barrio_col='_barrio',
+        lat_col=None,
+        lon_col=None,
+        features_col='_features',
+        min_score=min_match_score,
+    )
+    
     matched_rows = []
     match_scores = []
     unmatched_reasons = []  # Para análisis de casos sin match
     
-    # Para cada propiedad de Idealista, buscar el mejor match en Catastro
     for idx, idealista_row in df_idealista.iterrows():
-        best_match = None
-        best_score = 0.0
-        best_reason = "No match encontrado"
-        
-        # Buscar en todos los edificios de Catastro
-        for catastro_idx, catastro_row in df_catastro.iterrows():
-            score = calculate_match_score(
-                idealista_row,
-                catastro_row,
-                base_superficie_tolerance=base_superficie_tolerance,
-            )
-            
-            if score > best_score:
-                best_score = score
-                best_match = catastro_row
-                # Guardar razón del match
-                idealista_barrio = extract_barrio_from_localidad(idealista_row.get('localidad', ''))
-                catastro_barrio = normalize_barrio_name(catastro_row.get('barrio_nombre', ''))
-                if idealista_barrio == catastro_barrio:
-                    best_reason = f"Match por barrio: {idealista_barrio}"
-                else:
-                    best_reason = f"Score: {score:.3f}"
+        match = result.loc[idx]
+        best_score = float(match['match_score'])
+        if pd.isna(match['catastro_index']):
+            best_reason = "No match encontrado"
+        else:
+            best_reason = f"Match por barrio: {idealista_barrio.loc[idx]}"
         
-        # Si encontramos un match con score suficiente, agregarlo
-        if best_match is not None and best_score >= min_match_score:
-            combined_row = idealista_row.to_dict()
-            
+        combined_row = idealista_row.to_dict()
+        if match['matched']:
+            best_match = df_catastro.loc[match['catastro_index']]
             # Agregar datos de Catastro con prefijo
             for col in df_catastro.columns:
                 if col not in combined_row:
                     combined_row[f'catastro_{col}'] = best_match[col]
-            
             combined_row['match_score'] = best_score
             combined_row['match_reason'] = best_reason
             matched_rows.append(combined_row)
             match_scores.append(best_score)
         else:
             # Propiedad sin match
-            combined_row = idealista_row.to_dict()
             combined_row['match_score'] = best_score
             combined_row['match_reason'] = best_reason
             combined_row['matched'] = False
@@ -31,6 +31,16 @@ from parse_catastro_masivo_output import (  # noqa: E402
     _try_client_parser,
 )
 
+PROJECT_ROOT = SCRIPTS_ROOT.parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.extraction.catastro_xml import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    export_catastro_xml,
+    load_catastro_xml_to_sqlite,
+)
+
 LOG_DIR = Path("spike-data-validation/data/logs")
 PROCESSED_DIR = Path("spike-data-validation/data/processed")
 
@@ -74,6 +84,26 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Ejecutar validaciones después del parseo",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Parseo en streaming con memoria constante (exportaciones de ciudad completa): "
+            "escribe --out por lotes (Parquet si termina en .parquet, CSV si no)"
+        ),
+    )
+    parser.add_argument(
+        "--sqlite",
+        type=str,
+        default=None,
+        help="Con --stream, cargar además los inmuebles en fact_catastro_inmuebles de esta BD",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Inmuebles por lote en modo --stream",
+    )
     return parser.parse_args()
 
 
@@ -141,6 +171,51 @@ def validate_parsed_data(df: pd.DataFrame) -> Dict[str, Any]:
     }
 
 
+def run_streaming(args: argparse.Namespace, xml_path: Path, out_path: Path, limit: int) -> int:
+    """
+    Parsea el XML en streaming (sin construir el árbol ni acumular filas).
+
+    Args:
+        args: Argumentos CLI.
+        xml_path: XML de entrada.
+        out_path: Archivo de salida (Parquet o CSV).
+        limit: Máximo de inmuebles (0 = sin límite).
+
+    Returns:
+        Código de salida.
+    """
+    stats = export_catastro_xml(xml_path, out_path, batch_size=args.batch_size, limit=limit)
+    if stats["records"] == 0:
+        logger.error("No se encontraron inmuebles en el XML")
+        return 1
+    logger.info(
+        "✓ %s inmuebles en %ss (%s inmuebles/s, %s MB/s)",
+        stats["records"],
+        stats["seconds"],
+        stats["records_per_second"],
+        stats["mb_per_second"],
+    )
+
+    if args.sqlite:
+        import sqlite3
+
+        conn = sqlite3.connect(args.sqlite)
+        try:
+            load_catastro_xml_to_sqlite(xml_path, conn, batch_size=args.batch_size, limit=limit)
+        finally:
+            conn.close()
+        logger.info("✓ Cargado en %s", args.sqlite)
+
+    if args.validate:
+        df = pd.read_parquet(out_path) if out_path.suffix.lower() == ".parquet" else pd.read_csv(out_path)
+        validation = validate_parsed_data(df)
+        if not validation["valid"]:
+            logger.error("✗ Validación falló: %s", validation.get("error"))
+            return 1
+        logger.info("✓ Validación pasada (%s filas)", validation["total_rows"])
+    return 0
+
+
 def main() -> int:
     """Punto de entrada principal."""
     setup_logging()
@@ -161,6 +236,9 @@ def main() -> int:
     logger.info("Output: %s", out_path)
     logger.info("")
 
+    if args.stream:
+        return run_streaming(args, xml_path, out_path, limit)
+
     # Intentar parser del cliente primero
     logger.info("Intentando parser del cliente oficial...")
     rows = _try_client_parser(xml_path)
@@ -27,7 +27,6 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
-import xml.etree.ElementTree as ET
 
 import sys
 
@@ -35,7 +34,12 @@ scripts_dir = Path(__file__).parent
 if str(scripts_dir) not in sys.path:
     sys.path.insert(0, str(scripts_dir))
 
+PROJECT_ROOT = scripts_dir.resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
 from catastro_oficial_client import CatastroOficialClient
+from src.extraction.catastro_xml import iter_catastro_batches
 
 logger = logging.getLogger(__name__)
 
@@ -78,67 +82,15 @@ def _heuristic_iterparse(xml_path: Path, limit: int) -> List[Dict[str, Any]]:
     
     Estructura esperada:
     DS -> LDS -> DSA -> LBI -> BIE -> IBI (datos), DTR (dirección), FIN (finca), etc.
+
+    Usa el parser en streaming de ``src.extraction.catastro_xml`` (memoria
+    constante); para exportaciones de ciudad completa es preferible
+    ``export_catastro_xml``, que además no acumula las filas en una lista.
     """
-    if not xml_path.exists():
-        raise FileNotFoundError(f"XML no encontrado: {xml_path}")
-
-    results: List[Dict[str, Any]] = []
-    # Buscar BIE (bienes/inmuebles) en el XML
-    inmueble_like = {"BIE", "INMUEBLE", "inmueble"}
-
-    for event, elem in ET.iterparse(xml_path, events=("end",)):
-        tag = _strip_ns(elem.tag)
-        if tag not in inmueble_like:
-            continue
-
-        # Extraer datos por tags hijos conocidos
-        # Usar iter() para buscar recursivamente en todos los descendientes
-        text_by_tag: Dict[str, str] = {}
-        for descendant in elem.iter():
-            dtag = _strip_ns(descendant.tag)
-            if descendant.text and descendant.text.strip():
-                # Guardar el texto del tag, pero priorizar PCA para referencia catastral
-                if dtag == "PCA":
-                    text_by_tag["PCA"] = descendant.text.strip()
-                elif dtag not in text_by_tag:  # Solo guardar si no existe ya
-                    text_by_tag[dtag] = descendant.text.strip()
-
-        # Extraer referencia catastral (puede estar en PCA dentro de RCA dentro de IBI)
-        rc = (
-            text_by_tag.get("PCA") or 
-            text_by_tag.get("RC") or 
-            text_by_tag.get("RefCat") or 
-            text_by_tag.get("ref_catastral")
-        )
-        
-        # Extraer dirección (DTR contiene la dirección completa)
-        direccion = text_by_tag.get("DTR") or text_by_tag.get("DIRECCION") or text_by_tag.get("ldt")
-        
-        # Extraer superficie (SUP dentro de IBI)
-        sup = text_by_tag.get("SUP")
-        
-        # Extraer año construcción (ACO dentro de IBI)
-        anyo = text_by_tag.get("ACO")
-        
-        # Extraer plantas (buscar en LEC/ELEMENTOS COMUNES o usar heurística)
-        # El número de plantas puede estar en PLA dentro de ELC
-        plantas = text_by_tag.get("PLA") or text_by_tag.get("PLANTAS") or text_by_tag.get("planta")
-
-        if rc:
-            row: Dict[str, Any] = {
-                "referencia_catastral": rc,
-                "direccion_normalizada": direccion,
-                "superficie_m2": pd.to_numeric(sup, errors="coerce") if sup else None,
-                "ano_construccion": pd.to_numeric(anyo, errors="coerce") if anyo else None,
-                "plantas": pd.to_numeric(plantas, errors="coerce") if plantas else None,
-            }
-            results.append(row)
-
-        elem.clear()
-        if limit and len(results) >= limit:
-            break
-
-    return results
+    rows: List[Dict[str, Any]] = []
+    for batch in iter_catastro_batches(xml_path, limit=limit):
+        rows.extend(batch.astype(object).where(batch.notna(), None).to_dict("records"))
+    return rows
 
 
 def main() -> int:
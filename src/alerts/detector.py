@@ -16,31 +16,13 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 import pandas as pd
-import sqlite3
 
-from ..database_setup import DEFAULT_DB_NAME
+from ..database_pool import get_readonly_connection
 from .notifier import Alert, AlertPriority, create_alert
 
 logger = logging.getLogger(__name__)
 
 
-def _get_db_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
-    """
-    Obtiene conexión a la base de datos.
-    
-    Args:
-        db_path: Ruta opcional a la base de datos.
-    
-    Returns:
-        Conexión SQLite.
-    """
-    if db_path is None:
-        project_root = Path(__file__).parent.parent.parent
-        db_path = project_root / "data" / "processed" / DEFAULT_DB_NAME
-    
-    return sqlite3.connect(str(db_path))
-
-
 def detect_changes(
     barrio_id: int,
     metric: str,
@@ -172,7 +154,7 @@ def detect_tourism_pressure_changes(
     Returns:
         Lista de alertas de presión turística.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     alerts = []
     
@@ -269,7 +251,7 @@ def detect_regulation_changes(
     Returns:
         Lista de alertas de regulación.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     alerts = []
     
@@ -15,32 +15,14 @@ from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import sqlite3
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
-from ..database_setup import DEFAULT_DB_NAME
+from ..database_pool import get_readonly_connection
 
 logger = logging.getLogger(__name__)
 
 
-def _get_db_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
-    """
-    Obtiene conexión a la base de datos.
-    
-    Args:
-        db_path: Ruta opcional a la base de datos.
-    
-    Returns:
-        Conexión SQLite.
-    """
-    if db_path is None:
-        project_root = Path(__file__).parent.parent.parent
-        db_path = project_root / "data" / "processed" / DEFAULT_DB_NAME
-    
-    return sqlite3.connect(str(db_path))
-
-
 def _load_barrio_features(
     year: Optional[int] = None,
     db_path: Optional[Path] = None
@@ -55,7 +37,7 @@ def _load_barrio_features(
     Returns:
         DataFrame con features por barrio.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         query = """
@@ -137,7 +119,7 @@ def classify_barrio(
     Returns:
         Diccionario con clasificación y scores.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         # Obtener datos del barrio desde vista de riesgo de gentrificación
@@ -13,30 +13,12 @@ from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import sqlite3
 
-from ..database_setup import DEFAULT_DB_NAME
+from ..database_pool import get_readonly_connection
 
 logger = logging.getLogger(__name__)
 
 
-def _get_db_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
-    """
-    Obtiene conexión a la base de datos.
-    
-    Args:
-        db_path: Ruta opcional a la base de datos.
-    
-    Returns:
-        Conexión SQLite.
-    """
-    if db_path is None:
-        project_root = Path(__file__).parent.parent.parent
-        db_path = project_root / "data" / "processed" / DEFAULT_DB_NAME
-    
-    return sqlite3.connect(str(db_path))
-
-
 def calculate_trends(
     barrio_id: int,
     metric: str,
@@ -64,7 +46,7 @@ def calculate_trends(
         - significant_changes: Lista de cambios significativos detectados
         - inflection_points: Años donde hay cambios de tendencia
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         # Mapear métricas a tablas y columnas
@@ -192,7 +174,7 @@ def compare_barrios(
     Returns:
         DataFrame con comparación de barrios y métricas.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         # Usar vista de scorecard si está disponible
@@ -264,7 +246,7 @@ def identify_outliers(
     Returns:
         DataFrame con barrios outliers y sus valores.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         # Obtener datos de la métrica
@@ -342,7 +324,7 @@ def calculate_correlations(
     Returns:
         DataFrame con matriz de correlaciones.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         # Usar vista de correlaciones si está disponible
@@ -413,7 +395,7 @@ def generate_scorecard(
         - Scores normalizados (0-100)
         - Comparación con promedio de Barcelona
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         # Obtener datos del barrio desde vista scorecard
@@ -17,32 +17,14 @@ from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import sqlite3
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 
-from ..database_setup import DEFAULT_DB_NAME
+from ..database_pool import get_readonly_connection
 
 logger = logging.getLogger(__name__)
 
 
-def _get_db_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
-    """
-    Obtiene conexión a la base de datos.
-    
-    Args:
-        db_path: Ruta opcional a la base de datos.
-    
-    Returns:
-        Conexión SQLite.
-    """
-    if db_path is None:
-        project_root = Path(__file__).parent.parent.parent
-        db_path = project_root / "data" / "processed" / DEFAULT_DB_NAME
-    
-    return sqlite3.connect(str(db_path))
-
-
 def prepare_macro_features_v03(
     db_path: Optional[Path] = None,
     include_new_features: bool = True
@@ -65,7 +47,7 @@ def prepare_macro_features_v03(
     Returns:
         Tupla con (DataFrame con features, lista de nombres de features).
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         logger.info("Preparando features para MACRO v0.3...")
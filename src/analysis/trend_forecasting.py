@@ -16,9 +16,8 @@ from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import sqlite3
 
-from ..database_setup import DEFAULT_DB_NAME
+from ..database_pool import get_readonly_connection
 
 logger = logging.getLogger(__name__)
 
@@ -38,23 +37,6 @@ except ImportError:
     logger.warning("prophet no disponible. Prophet no funcionará.")
 
 
-def _get_db_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
-    """
-    Obtiene conexión a la base de datos.
-    
-    Args:
-        db_path: Ruta opcional a la base de datos.
-    
-    Returns:
-        Conexión SQLite.
-    """
-    if db_path is None:
-        project_root = Path(__file__).parent.parent.parent
-        db_path = project_root / "data" / "processed" / DEFAULT_DB_NAME
-    
-    return sqlite3.connect(str(db_path))
-
-
 def _get_historical_data(
     barrio_id: int,
     metric: str,
@@ -71,7 +53,7 @@ def _get_historical_data(
     Returns:
         DataFrame con columnas 'anio' y 'value'.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         metric_mapping = {
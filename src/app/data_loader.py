@@ -17,15 +17,19 @@ import pandas as pd
 import streamlit as st
 
 from src.app.config import DB_PATH, VIVIENDA_TIPO_M2
+from src.database_pool import get_readonly_connection
 from src.database_setup import validate_table_name
 
 
 def get_connection() -> sqlite3.Connection:
     """
-    Crea una conexión a la base de datos SQLite.
+    Obtiene una conexión de solo lectura del pool compartido.
+    
+    Las conexiones se reutilizan entre cargas y sesiones (ver
+    ``src.database_pool``); ``conn.close()`` la devuelve al pool.
     
     Returns:
-        Conexión SQLite con foreign keys habilitadas.
+        Conexión SQLite de solo lectura.
     
     Raises:
         FileNotFoundError: Si la base de datos no existe.
@@ -33,9 +37,7 @@ def get_connection() -> sqlite3.Connection:
     if not DB_PATH.exists():
         raise FileNotFoundError(f"Base de datos no encontrada: {DB_PATH}")
     
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return get_readonly_connection(DB_PATH)
 
 
 @st.cache_data(ttl=3600)
@@ -0,0 +1,232 @@
+"""
+Pool de conexiones SQLite de solo lectura compartido por el dashboard y los análisis.
+
+Abrir una conexión ``sqlite3`` por consulta tiene un coste apreciable cuando
+varias sesiones del dashboard cargan datos a la vez. Este módulo mantiene, por
+base de datos, un pool de conexiones reutilizables y seguro entre hilos:
+
+- Las conexiones se abren con URI ``mode=ro`` (no pueden escribir) y con
+  ``immutable=1`` cuando la base de datos no se está reconstruyendo (no hay
+  ``-journal`` ni ``-wal`` junto al archivo), lo que evita los bloqueos de
+  lectura de SQLite.
+- Cada conexión nueva fija ``mmap_size``, ``cache_size`` y ``query_only``.
+- Si el archivo cambia (el ETL lo ha reescrito), las conexiones inactivas se
+  descartan y las que estaban en uso se cierran al devolverse, de modo que
+  nunca se sirven datos de una versión anterior.
+
+``conn.close()`` devuelve la conexión al pool en lugar de cerrarla, así que
+el patrón habitual ``conn = ...; try: ... finally: conn.close()`` sigue siendo
+válido.
+
+Uso típico:
+    from src.database_pool import get_readonly_connection
+
+    conn = get_readonly_connection(db_path)
+    try:
+        df = pd.read_sql("SELECT * FROM dim_barrios", conn)
+    finally:
+        conn.close()
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from .database_setup import DEFAULT_DB_NAME
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = PROJECT_ROOT / "data" / "processed" / DEFAULT_DB_NAME
+
+# Variable de entorno para desactivar ``immutable=1`` (p. ej. si otro proceso escribe)
+IMMUTABLE_ENV = "DB_POOL_IMMUTABLE"
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHE_SIZE_KIB = 64 * 1024
+
+# Archivos auxiliares que indican una escritura en curso
+_WRITE_SIDECARS = ("-journal", "-wal")
+
+_FileSignature = Tuple[int, int, int]
+
+
+class PooledConnection(sqlite3.Connection):
+    """Conexión cuyo ``close()`` la devuelve al pool en lugar de cerrarla."""
+
+    _pool: Optional["ReadOnlyConnectionPool"] = None
+    _signature: Optional[_FileSignature] = None
+    _in_pool: bool = False
+
+    def close(self) -> None:
+        pool = self._pool
+        if pool is None:
+            super().close()
+        elif not self._in_pool:  # un segundo close() no la devuelve dos veces
+            pool.release(self)
+
+    def _close(self) -> None:
+        """Cierra realmente la conexión."""
+        self._pool = None
+        super().close()
+
+
+class ReadOnlyConnectionPool:
+    """
+    Pool de conexiones de solo lectura a una base de datos SQLite.
+
+    Attributes:
+        db_path: Ruta de la base de datos.
+        max_idle: Conexiones inactivas que se conservan como máximo.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_idle: int = DEFAULT_POOL_SIZE,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        cache_size_kib: int = DEFAULT_CACHE_SIZE_KIB,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.max_idle = max_idle
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+        self._signature: Optional[_FileSignature] = None
+
+    def _file_signature(self) -> _FileSignature:
+        stat = self.db_path.stat()
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _being_written(self) -> bool:
+        return any(
+            Path(f"{self.db_path}{suffix}").exists() for suffix in _WRITE_SIDECARS
+        )
+
+    def _use_immutable(self) -> bool:
+        if os.environ.get(IMMUTABLE_ENV, "1").strip().lower() in {"0", "false", "no"}:
+            return False
+        return not self._being_written()
+
+    def _open(self, signature: _FileSignature) -> PooledConnection:
+        uri = f"file:{quote(str(self.db_path.resolve()))}?mode=ro"
+        if self._use_immutable():
+            uri += "&immutable=1"
+        conn = sqlite3.connect(
+            uri, uri=True, check_same_thread=False, factory=PooledConnection
+        )
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute("PRAGMA query_only = ON")
+        conn._signature = signature
+        conn._pool = self
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """
+        Obtiene una conexión del pool (o abre una nueva).
+
+        Returns:
+            Conexión de solo lectura; ``close()`` la devuelve al pool.
+
+        Raises:
+            FileNotFoundError: Si la base de datos no existe.
+        """
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Base de datos no encontrada: {self.db_path}")
+        signature = self._file_signature()
+        stale: List[PooledConnection] = []
+        conn: Optional[PooledConnection] = None
+        with self._lock:
+            if signature != self._signature:
+                if self._signature is not None:
+                    logger.info("Base de datos modificada, renovando conexiones: %s", self.db_path)
+                stale, self._idle = self._idle, []
+                self._signature = signature
+            if self._idle:
+                conn = self._idle.pop()
+        for old in stale:
+            old._close()
+        if conn is None:
+            conn = self._open(signature)
+        conn._in_pool = False
+        return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        """Devuelve una conexión al pool (la cierra si está obsoleta o sobra)."""
+        with self._lock:
+            keep = conn._signature == self._signature and len(self._idle) < self.max_idle
+            if keep:
+                conn._in_pool = True
+                self._idle.append(conn)
+        if not keep:
+            conn._close()
+
+    def close_all(self) -> None:
+        """Cierra todas las conexiones inactivas."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._signature = None
+        for conn in idle:
+            conn._close()
+
+    @property
+    def idle_count(self) -> int:
+        """Número de conexiones inactivas en el pool."""
+        return len(self._idle)
+
+
+_POOLS: Dict[Path, ReadOnlyConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_path: Optional[Path] = None) -> ReadOnlyConnectionPool:
+    """
+    Devuelve el pool compartido de una base de datos.
+
+    Args:
+        db_path: Ruta de la base de datos (por defecto ``data/processed/database.db``).
+
+    Returns:
+        Pool de conexiones de solo lectura (uno por ruta).
+    """
+    path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    key = path.resolve()
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ReadOnlyConnectionPool(key)
+            _POOLS[key] = pool
+    return pool
+
+
+def get_readonly_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """
+    Obtiene una conexión de solo lectura del pool compartido.
+
+    Args:
+        db_path: Ruta de la base de datos (por defecto ``data/processed/database.db``).
+
+    Returns:
+        Conexión SQLite; llamar a ``close()`` la devuelve al pool.
+
+    Raises:
+        FileNotFoundError: Si la base de datos no existe.
+    """
+    return get_pool(db_path).acquire()
+
+
+def close_all_pools() -> None:
+    """Cierra las conexiones inactivas de todos los pools (p. ej. antes de reconstruir la BD)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    for pool in pools:
+        pool.close_all()
@@ -47,6 +47,8 @@ VALID_TABLES: FrozenSet[str] = frozenset(
         "fact_accesibilidad",
         "fact_centralidad",
         "etl_runs",
+        "etl_input_fingerprints",
+        "etl_table_state",
     }
 )
 
@@ -695,6 +697,24 @@ CREATE_TABLE_STATEMENTS = (
     );
     """,
     """
+    CREATE TABLE IF NOT EXISTS etl_input_fingerprints (
+        file_path TEXT PRIMARY KEY,
+        size_bytes INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        run_id TEXT,
+        updated_at TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS etl_table_state (
+        table_name TEXT PRIMARY KEY,
+        input_fingerprint TEXT NOT NULL,
+        run_id TEXT,
+        updated_at TEXT
+    );
+    """,
+    """
     CREATE TABLE IF NOT EXISTS fact_renta_avanzada (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         barrio_id INTEGER NOT NULL,
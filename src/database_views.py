@@ -1,12 +1,41 @@
-"""Definición de vistas analíticas sobre el data warehouse SQLite."""
+"""
+Definición de vistas analíticas sobre el data warehouse SQLite.
+
+Las vistas se definen como vistas SQLite normales (``create_analytical_views``)
+y, al final de cada ETL, se materializan en tablas ``mv_*`` indexadas
+(``refresh_materialized_views``). Tras materializar, cada ``v_*`` pasa a ser un
+simple ``SELECT * FROM mv_*``: los lectores siguen consultando ``v_*`` sin
+cambios y SQLite resuelve las consultas sobre la tabla indexada (p. ej. la
+búsqueda del scorecard de un barrio es una lectura puntual por índice).
+"""
 
 from __future__ import annotations
 
 import logging
+import re
 import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Tabla con la versión (ejecución ETL) de cada vista materializada
+MATERIALIZED_VIEWS_TABLE = "materialized_views"
+
+# Vistas que se materializan: vista -> (columnas del índice, índice único)
+MATERIALIZED_VIEWS: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    "v_affordability_quarterly": (("barrio_id", "year", "quarter"), False),
+    "v_precios_evolucion_anual": (("barrio_id", "anio"), True),
+    "v_demografia_resumen": (("barrio_id", "anio"), False),
+    "v_gentrificacion_tendencias": (("barrio_id",), False),
+    "v_barrio_scorecard": (("barrio_id",), True),
+    "v_tendencias_consolidadas": (("barrio_id", "anio"), True),
+    "v_affordability_detallado": (("barrio_id", "anio"), True),
+    "v_riesgo_gentrificacion": (("barrio_id",), False),
+    "v_correlaciones_cruzadas": (("barrio_id", "anio"), True),
+}
+
 
 def create_analytical_views(conn: sqlite3.Connection) -> None:
     """
@@ -469,6 +498,188 @@ def create_analytical_views(conn: sqlite3.Connection) -> None:
     logger.info("Vistas analíticas creadas/actualizadas correctamente")
 
 
-__all__ = ["create_analytical_views"]
+def materialized_table_name(view_name: str) -> str:
+    """Nombre de la tabla materializada de una vista (``v_x`` -> ``mv_x``)."""
+    return f"mv_{view_name[2:]}" if view_name.startswith("v_") else f"mv_{view_name}"
+
+
+def _view_sql(conn: sqlite3.Connection, view_name: str) -> Optional[str]:
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = ?", (view_name,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _refresh_order(conn: sqlite3.Connection, views: Sequence[str]) -> List[str]:
+    """
+    Ordena las vistas para que cada una se materialice después de las vistas
+    que consulta (dependencias leídas de su SQL en ``sqlite_master``).
+
+    Raises:
+        ValueError: Si hay dependencias circulares entre vistas.
+    """
+    pending = list(views)
+    dependencies = {}
+    for view in pending:
+        sql = _view_sql(conn, view) or ""
+        referenced = set(re.findall(r"\bv_\w+\b", sql)) - {view}
+        dependencies[view] = referenced & set(pending)
+
+    ordered: List[str] = []
+    while pending:
+        ready = [view for view in pending if not dependencies[view] - set(ordered)]
+        if not ready:
+            raise ValueError(f"Dependencias circulares entre vistas: {sorted(pending)}")
+        for view in ready:
+            ordered.append(view)
+            pending.remove(view)
+    return ordered
+
+
+def _ensure_materialized_views_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {MATERIALIZED_VIEWS_TABLE} (
+            view_name TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            etl_run_id TEXT,
+            refreshed_at TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            seconds REAL
+        )
+        """
+    )
+    conn.commit()
+
+
+def _materialize_view(
+    conn: sqlite3.Connection,
+    view_name: str,
+    index_columns: Tuple[str, ...],
+    unique: bool,
+    run_id: Optional[str],
+) -> int:
+    """Materializa una vista en una transacción y la redirige a su tabla."""
+    table = materialized_table_name(view_name)
+    start = time.perf_counter()
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"CREATE TABLE {table} AS SELECT * FROM {view_name}")
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if index_columns and set(index_columns) <= columns:
+            key = " || '|' || ".join(f"COALESCE({col}, '')" for col in index_columns)
+            row_count, distinct = conn.execute(
+                f"SELECT COUNT(*), COUNT(DISTINCT {key}) FROM {table}"
+            ).fetchone()
+            # Solo índice único si los datos lo permiten (p. ej. claves nulas)
+            kind = "UNIQUE INDEX" if unique and row_count == distinct else "INDEX"
+            conn.execute(
+                f"CREATE {kind} idx_{table}_{'_'.join(index_columns)} "
+                f"ON {table} ({', '.join(index_columns)})"
+            )
+        else:
+            row_count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        conn.execute(f"DROP VIEW {view_name}")
+        conn.execute(f"CREATE VIEW {view_name} AS SELECT * FROM {table}")
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO {MATERIALIZED_VIEWS_TABLE}
+                (view_name, table_name, etl_run_id, refreshed_at, row_count, seconds)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                view_name,
+                table,
+                run_id,
+                datetime.utcnow().isoformat(),
+                row_count,
+                round(time.perf_counter() - start, 3),
+            ),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return row_count
+
+
+def refresh_materialized_views(
+    conn: sqlite3.Connection,
+    run_id: Optional[str] = None,
+    views: Optional[Sequence[str]] = None,
+) -> Dict[str, int]:
+    """
+    Recrea las vistas analíticas y las materializa en tablas ``mv_*`` indexadas.
+
+    Primero se redefinen las vistas originales (``create_analytical_views``) y
+    después cada vista, en orden de dependencias, se copia a su tabla ``mv_*``
+    con su índice y se redefine como ``SELECT * FROM mv_*``. Cada vista se
+    materializa en su propia transacción: si falla (p. ej. falta una tabla de
+    hechos) se mantiene la vista original y se continúa con las demás.
+
+    Args:
+        conn: Conexión SQLite con permisos de escritura.
+        run_id: Identificador de la ejecución ETL con el que se versiona cada copia.
+        views: Vistas a materializar (por defecto ``MATERIALIZED_VIEWS``).
+
+    Returns:
+        Diccionario ``{vista: filas materializadas}`` de las vistas refrescadas.
+    """
+    create_analytical_views(conn)
+    _ensure_materialized_views_table(conn)
+
+    selected = list(views) if views is not None else list(MATERIALIZED_VIEWS)
+    refreshed: Dict[str, int] = {}
+    for view_name in _refresh_order(conn, selected):
+        if _view_sql(conn, view_name) is None:
+            logger.warning("Vista %s no existe, no se materializa", view_name)
+            continue
+        index_columns, unique = MATERIALIZED_VIEWS.get(view_name, ((), False))
+        try:
+            refreshed[view_name] = _materialize_view(
+                conn, view_name, index_columns, unique, run_id
+            )
+        except sqlite3.Error as exc:
+            logger.warning("No se pudo materializar %s (se mantiene la vista): %s", view_name, exc)
+
+    logger.info(
+        "Vistas materializadas: %s de %s (run_id=%s)", len(refreshed), len(selected), run_id
+    )
+    return refreshed
+
+
+def get_materialized_views_info(conn: sqlite3.Connection) -> List[Dict[str, object]]:
+    """
+    Devuelve la versión de cada vista materializada.
+
+    Args:
+        conn: Conexión SQLite.
+
+    Returns:
+        Lista de diccionarios con ``view_name``, ``table_name``, ``etl_run_id``,
+        ``refreshed_at``, ``row_count`` y ``seconds`` (vacía si no hay ninguna).
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (MATERIALIZED_VIEWS_TABLE,),
+    ).fetchone()
+    if not exists:
+        return []
+    cursor = conn.execute(
+        f"SELECT view_name, table_name, etl_run_id, refreshed_at, row_count, seconds "
+        f"FROM {MATERIALIZED_VIEWS_TABLE} ORDER BY view_name"
+    )
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+__all__ = [
+    "MATERIALIZED_VIEWS",
+    "create_analytical_views",
+    "get_materialized_views_info",
+    "materialized_table_name",
+    "refresh_materialized_views",
+]
 
 
@@ -1,16 +1,212 @@
 """
 Batch processing utilities for memory-efficient ETL operations.
+
+Bulk loading into SQLite goes through ``bulk_insert_dataframe``: each frame is
+converted once to column-ordered Python values and written with a prepared
+``executemany`` inside a single transaction, with load-time PRAGMAs and
+secondary indexes rebuilt after the load.
 """
 import gc
 import logging
-from typing import Optional
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 10000  # Process 10k rows at a time
 
+# Page cache used while bulk loading (negative value = KiB, ~256 MB)
+BULK_CACHE_SIZE_KIB = 256 * 1024
+
+
+@contextmanager
+def bulk_load_pragmas(
+    conn: sqlite3.Connection,
+    cache_size_kib: int = BULK_CACHE_SIZE_KIB,
+) -> Iterator[None]:
+    """
+    Temporarily tune a SQLite connection for bulk loading.
+
+    Switches the database to WAL (persistent, also benefits concurrent readers),
+    and for the duration of the block disables ``synchronous`` and foreign key
+    checks and enlarges the page cache. Previous values are restored on exit.
+
+    Args:
+        conn: SQLite connection (must not be inside an open transaction;
+            pending changes are committed first).
+        cache_size_kib: Page cache size in KiB during the load.
+    """
+    conn.commit()
+    previous_sync = conn.execute("PRAGMA synchronous").fetchone()[0]
+    previous_cache = conn.execute("PRAGMA cache_size").fetchone()[0]
+    previous_fk = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(f"PRAGMA cache_size=-{int(cache_size_kib)}")
+    conn.execute("PRAGMA foreign_keys=OFF")
+    try:
+        yield
+    finally:
+        conn.commit()
+        conn.execute(f"PRAGMA synchronous={int(previous_sync)}")
+        conn.execute(f"PRAGMA cache_size={int(previous_cache)}")
+        conn.execute(f"PRAGMA foreign_keys={int(previous_fk)}")
+
+
+def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)
+    ).fetchone() is not None
+
+
+def _drop_secondary_indexes(
+    conn: sqlite3.Connection, table_name: str
+) -> List[Tuple[str, str]]:
+    """
+    Drop the explicit indexes of a table and return their definitions.
+
+    Implicit indexes (PRIMARY KEY / UNIQUE constraints) have no SQL and are kept,
+    so uniqueness is still enforced during the load.
+    """
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+        (table_name,),
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+    return indexes
+
+
+def _column_values(series: pd.Series) -> np.ndarray:
+    """Convert a column to an object array of SQLite-compatible Python values."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return np.array(
+            [None if pd.isna(v) else str(v.to_pydatetime()) for v in series.astype(object)],
+            dtype=object,
+        )
+    values = series.to_numpy(dtype=object, na_value=None)
+    if series.dtype == object:
+        # Object columns may still hold NaN/NA scalars
+        mask = pd.isna(values)
+        if mask.any():
+            values[mask] = None
+    return values
+
+
+def dataframe_to_records(df: pd.DataFrame) -> List[tuple]:
+    """
+    Convert a DataFrame to a list of column-ordered tuples for ``executemany``.
+
+    Conversion is done column by column (vectorized), with missing values as
+    ``None`` and timestamps as ``'YYYY-MM-DD HH:MM:SS'`` strings, matching what
+    ``DataFrame.to_sql`` writes.
+
+    Args:
+        df: DataFrame to convert.
+
+    Returns:
+        List of row tuples in ``df.columns`` order.
+    """
+    if df.empty:
+        return []
+    columns = [_column_values(df.iloc[:, i]) for i in range(df.shape[1])]
+    return list(zip(*columns))
+
+
+def bulk_insert_dataframe(
+    df: pd.DataFrame,
+    table_name: str,
+    conn: sqlite3.Connection,
+    batch_size: int = 50000,
+    if_exists: str = "append",
+    clear_first: bool = False,
+    defer_indexes: bool = True,
+) -> int:
+    """
+    Bulk-load a DataFrame into SQLite with prepared ``executemany`` statements.
+
+    The whole load (optional clear + all batches) runs in a single transaction
+    under ``bulk_load_pragmas``. Secondary indexes are dropped before the load and
+    recreated afterwards (also if the load fails).
+
+    Args:
+        df: DataFrame to insert.
+        table_name: Target table name.
+        conn: SQLite connection.
+        batch_size: Rows converted and sent per ``executemany`` call.
+        if_exists: 'append' inserts into the existing table (created from the
+            DataFrame if missing); 'replace' recreates the table from the
+            DataFrame columns, like ``DataFrame.to_sql``.
+        clear_first: If True, delete all rows before inserting.
+        defer_indexes: If True, rebuild secondary indexes after the load.
+
+    Returns:
+        Total number of rows inserted.
+
+    Raises:
+        ValueError: If ``if_exists`` is not 'append' or 'replace'.
+    """
+    if if_exists not in ("append", "replace"):
+        raise ValueError(f"if_exists must be 'append' or 'replace', got {if_exists!r}")
+    if df is None or df.empty:
+        logger.debug(f"Skipping {table_name}: empty or None")
+        return 0
+
+    total_rows = len(df)
+    logger.info(f"Bulk loading {total_rows:,} rows into {table_name}")
+
+    with bulk_load_pragmas(conn):
+        if if_exists == "replace" or not _table_exists(conn, table_name):
+            # Same table definition DataFrame.to_sql would create
+            df.head(0).to_sql(table_name, conn, if_exists=if_exists, index=False)
+
+        columns = ", ".join(f'"{col}"' for col in df.columns)
+        placeholders = ", ".join("?" for _ in df.columns)
+        sql = f'INSERT INTO "{table_name}" ({columns}) VALUES ({placeholders})'
+
+        indexes: Sequence[Tuple[str, str]] = []
+        rows_inserted = 0
+        try:
+            if clear_first:
+                conn.execute(f'DELETE FROM "{table_name}"')
+                logger.debug(f"Cleared existing data from {table_name}")
+            if defer_indexes:
+                indexes = _drop_secondary_indexes(conn, table_name)
+
+            for i in range(0, total_rows, batch_size):
+                records = dataframe_to_records(df.iloc[i:i + batch_size])
+                conn.executemany(sql, records)
+                rows_inserted += len(records)
+                if (i + batch_size) % (batch_size * 5) == 0 or rows_inserted >= total_rows:
+                    logger.info(
+                        f"  Progress: {rows_inserted:,}/{total_rows:,} rows "
+                        f"({100 * rows_inserted / total_rows:.1f}%)"
+                    )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error bulk loading {table_name}: {e}")
+            raise
+        finally:
+            # After a rollback the dropped indexes may already be back
+            for index_name, index_sql in indexes:
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='index' AND name=?",
+                    (index_name,),
+                ).fetchone()
+                if exists is None:
+                    conn.execute(index_sql)
+            conn.commit()
+
+    logger.info(f"✓ Completed {table_name}: {rows_inserted:,} rows inserted")
+    return rows_inserted
+
 
 def insert_dataframe_in_batches(
     df: pd.DataFrame,
@@ -22,6 +218,8 @@ def insert_dataframe_in_batches(
 ) -> int:
     """
     Insert a DataFrame into SQLite in batches to avoid memory issues.
+
+    Thin wrapper around ``bulk_insert_dataframe`` kept for existing callers.
     
     Args:
         df: DataFrame to insert
@@ -34,94 +232,14 @@ def insert_dataframe_in_batches(
     Returns:
         Total number of rows inserted
     """
-    if df is None or df.empty:
-        logger.debug(f"Skipping {table_name}: empty or None")
-        return 0
-    
-    total_rows = len(df)
-    logger.info(f"Inserting {total_rows:,} rows into {table_name} in batches of {batch_size:,}")
-    
-    # Disable foreign key checks temporarily
-    conn.execute("PRAGMA foreign_keys=OFF")
-    
-    # Clear table if requested
-    if clear_first:
-        try:
-            conn.execute(f"DELETE FROM {table_name}")
-            logger.debug(f"Cleared existing data from {table_name}")
-        except Exception as e:
-            logger.warning(f"Could not clear {table_name}: {e}")
-    
-    # Process in batches
-    rows_inserted = 0
-    for i in range(0, total_rows, batch_size):
-        batch = df.iloc[i:i + batch_size]
-        
-        # Use append for all batches after the first (if if_exists='replace')
-        batch_if_exists = if_exists if i == 0 else "append"
-        
-        try:
-            batch.to_sql(
-                table_name,
-                conn,
-                if_exists=batch_if_exists,
-                index=False,
-                method='multi',  # Use multi-row INSERT for better performance
-                chunksize=1000   # SQLite chunk size
-            )
-            rows_inserted += len(batch)
-            
-            # Log progress
-            if (i + batch_size) % (batch_size * 5) == 0 or (i + batch_size) >= total_rows:
-                logger.info(f"  Progress: {rows_inserted:,}/{total_rows:,} rows ({100*rows_inserted/total_rows:.1f}%)")
-            
-            # Clear batch from memory
-            del batch
-            gc.collect()
-            
-        except Exception as e:
-            logger.error(f"Error inserting batch {i}-{i+batch_size} into {table_name}: {e}")
-            raise
-    
-    # Re-enable foreign key checks
-    conn.execute("PRAGMA foreign_keys=ON")
-    
-    logger.info(f"✓ Completed {table_name}: {rows_inserted:,} rows inserted")
-    return rows_inserted
-    
-    # Process in batches
-    rows_inserted = 0
-    for i in range(0, total_rows, batch_size):
-        batch = df.iloc[i:i + batch_size]
-        
-        # Use append for all batches after the first (if if_exists='replace')
-        batch_if_exists = if_exists if i == 0 else "append"
-        
-        try:
-            batch.to_sql(
-                table_name,
-                conn,
-                if_exists=batch_if_exists,
-                index=False,
-                method='multi',  # Use multi-row INSERT for better performance
-                chunksize=1000   # SQLite chunk size
-            )
-            rows_inserted += len(batch)
-            
-            # Log progress
-            if (i + batch_size) % (batch_size * 5) == 0 or (i + batch_size) >= total_rows:
-                logger.info(f"  Progress: {rows_inserted:,}/{total_rows:,} rows ({100*rows_inserted/total_rows:.1f}%)")
-            
-            # Clear batch from memory
-            del batch
-            gc.collect()
-            
-        except Exception as e:
-            logger.error(f"Error inserting batch {i}-{i+batch_size} into {table_name}: {e}")
-            raise
-    
-    logger.info(f"✓ Completed {table_name}: {rows_inserted:,} rows inserted")
-    return rows_inserted
+    return bulk_insert_dataframe(
+        df,
+        table_name,
+        conn,
+        batch_size=batch_size,
+        if_exists=if_exists,
+        clear_first=clear_first,
+    )
 
 
 def process_large_csv_in_chunks(
@@ -0,0 +1,364 @@
+"""
+Modo incremental del ETL basado en huellas (fingerprints) de los archivos de entrada.
+
+Cada archivo raw descubierto por ``run_etl`` se identifica por su tamaño, su
+``mtime`` y un hash SHA-256 de su contenido. Con esas huellas se calcula una
+huella por tabla de hechos (archivos de entrada + contenido de ``dim_barrios``)
+que se persiste en ``etl_table_state`` al final de cada ejecución correcta.
+En la siguiente ejecución incremental solo se recalculan y recargan las tablas
+cuya huella ha cambiado.
+
+Uso típico:
+    from src.etl.incremental import IncrementalPlan
+
+    plan = IncrementalPlan.build(
+        conn=state_conn,
+        table_inputs={"fact_precios": [venta_path, alquiler_path]},
+        dim_barrios=dim_barrios,
+    )
+    if plan.needs_rebuild("fact_precios"):
+        ...
+    plan.save(conn, run_id)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de bloque para el hash de contenido (1 MiB)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Columnas de dim_barrios que cambian en cada ejecución y no forman parte de la huella
+_DIM_BARRIOS_VOLATILE_COLUMNS = ("etl_created_at", "etl_updated_at")
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """Huella de un archivo de entrada."""
+
+    path: str
+    size_bytes: int
+    mtime_ns: int
+    sha256: str
+
+
+def _hash_file(path: Path) -> str:
+    """Calcula el SHA-256 del contenido de un archivo leyendo por bloques."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint_file(
+    path: Path,
+    known: Optional[Mapping[str, FileFingerprint]] = None,
+) -> FileFingerprint:
+    """
+    Calcula la huella de un archivo.
+
+    Si ``known`` contiene una huella previa con el mismo tamaño y ``mtime``,
+    se reutiliza su hash y se evita releer el archivo completo.
+
+    Args:
+        path: Ruta al archivo.
+        known: Huellas calculadas en ejecuciones anteriores, indexadas por ruta.
+
+    Returns:
+        FileFingerprint del archivo.
+    """
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    key = str(resolved)
+
+    previous = (known or {}).get(key)
+    if (
+        previous is not None
+        and previous.size_bytes == stat.st_size
+        and previous.mtime_ns == stat.st_mtime_ns
+    ):
+        return previous
+
+    return FileFingerprint(
+        path=key,
+        size_bytes=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        sha256=_hash_file(resolved),
+    )
+
+
+def _expand_inputs(inputs: Iterable[Optional[Path]]) -> List[Path]:
+    """Expande directorios a la lista ordenada de archivos que contienen."""
+    files: List[Path] = []
+    for item in inputs:
+        if item is None:
+            continue
+        item = Path(item)
+        if item.is_dir():
+            files.extend(sorted(p for p in item.rglob("*") if p.is_file()))
+        elif item.is_file():
+            files.append(item)
+    # Eliminar duplicados preservando el orden
+    seen: Set[Path] = set()
+    unique: List[Path] = []
+    for file in files:
+        resolved = file.resolve()
+        if resolved not in seen:
+            seen.add(resolved)
+            unique.append(resolved)
+    return unique
+
+
+def fingerprint_dataframe(df: Optional[pd.DataFrame]) -> str:
+    """
+    Calcula una huella estable del contenido de un DataFrame.
+
+    Las columnas de auditoría ``etl_created_at``/``etl_updated_at`` se excluyen
+    porque cambian en cada ejecución aunque los datos sean idénticos.
+
+    Args:
+        df: DataFrame a resumir.
+
+    Returns:
+        Hash SHA-256 en hexadecimal (de la cadena vacía si ``df`` es ``None``).
+    """
+    digest = hashlib.sha256()
+    if df is None or df.empty:
+        return digest.hexdigest()
+
+    stable = df.drop(columns=[c for c in _DIM_BARRIOS_VOLATILE_COLUMNS if c in df.columns])
+    stable = stable.reindex(sorted(stable.columns), axis=1)
+    digest.update(",".join(stable.columns).encode("utf-8"))
+    row_hashes = pd.util.hash_pandas_object(stable.astype(str), index=False)
+    digest.update(row_hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _combine(fingerprints: Iterable[FileFingerprint], extra: str) -> str:
+    """Combina huellas de archivos y una huella adicional en un único hash."""
+    payload = {
+        "files": sorted((fp.path, fp.sha256) for fp in fingerprints),
+        "extra": extra,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def load_file_fingerprints(conn: sqlite3.Connection) -> Dict[str, FileFingerprint]:
+    """
+    Carga las huellas de archivos registradas en ejecuciones anteriores.
+
+    Args:
+        conn: Conexión SQLite activa.
+
+    Returns:
+        Diccionario ``{ruta: FileFingerprint}`` (vacío si la tabla no existe).
+    """
+    try:
+        rows = conn.execute(
+            "SELECT file_path, size_bytes, mtime_ns, sha256 FROM etl_input_fingerprints"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {
+        row[0]: FileFingerprint(path=row[0], size_bytes=row[1], mtime_ns=row[2], sha256=row[3])
+        for row in rows
+    }
+
+
+def load_table_states(conn: sqlite3.Connection) -> Dict[str, str]:
+    """
+    Carga la última huella de entrada registrada para cada tabla de hechos.
+
+    Args:
+        conn: Conexión SQLite activa.
+
+    Returns:
+        Diccionario ``{tabla: huella}`` (vacío si la tabla de estado no existe).
+    """
+    try:
+        rows = conn.execute(
+            "SELECT table_name, input_fingerprint FROM etl_table_state"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {row[0]: row[1] for row in rows}
+
+
+def load_poblacion_snapshot(conn: sqlite3.Connection) -> Optional[pd.DataFrame]:
+    """
+    Lee la población por barrio y año ya cargada en ``fact_demografia``.
+
+    Se usa cuando la demografía no se recalcula pero otras tablas (seguridad,
+    ruido) necesitan la población para calcular tasas.
+
+    Args:
+        conn: Conexión SQLite activa.
+
+    Returns:
+        DataFrame con ``barrio_id``, ``anio`` y ``poblacion_total`` o ``None``.
+    """
+    try:
+        df = pd.read_sql_query(
+            "SELECT barrio_id, anio, poblacion_total FROM fact_demografia",
+            conn,
+        )
+    except (sqlite3.Error, pd.errors.DatabaseError) as exc:
+        logger.debug("No se pudo leer población previa de fact_demografia: %s", exc)
+        return None
+    return df if not df.empty else None
+
+
+@dataclass
+class IncrementalPlan:
+    """
+    Plan de recálculo de tablas de hechos para una ejecución del ETL.
+
+    Attributes:
+        enabled: Si es False, todas las tablas se consideran desactualizadas.
+        table_fingerprints: Huella actual de entradas por tabla.
+        previous_fingerprints: Huella registrada en la ejecución anterior.
+        files: Huellas de todos los archivos de entrada considerados.
+        dim_barrios_fingerprint: Huella del contenido de ``dim_barrios``.
+    """
+
+    enabled: bool
+    table_fingerprints: Dict[str, str] = field(default_factory=dict)
+    previous_fingerprints: Dict[str, str] = field(default_factory=dict)
+    files: Dict[str, FileFingerprint] = field(default_factory=dict)
+    dim_barrios_fingerprint: str = ""
+
+    @classmethod
+    def build(
+        cls,
+        conn: Optional[sqlite3.Connection],
+        table_inputs: Mapping[str, Iterable[Optional[Path]]],
+        dim_barrios: Optional[pd.DataFrame],
+        enabled: bool = True,
+    ) -> "IncrementalPlan":
+        """
+        Calcula las huellas actuales y las compara con el estado persistido.
+
+        Args:
+            conn: Conexión a la base de datos existente (``None`` si no existe).
+            table_inputs: Archivos o directorios de entrada de cada tabla.
+            dim_barrios: Dimensión de barrios preparada en esta ejecución.
+            enabled: Si es False se calcula el plan pero se reconstruye todo.
+
+        Returns:
+            IncrementalPlan listo para consultar con ``needs_rebuild``.
+        """
+        known = load_file_fingerprints(conn) if conn is not None else {}
+        previous = load_table_states(conn) if conn is not None else {}
+        dim_fp = fingerprint_dataframe(dim_barrios)
+
+        files: Dict[str, FileFingerprint] = {}
+        table_fps: Dict[str, str] = {}
+        for table_name, inputs in table_inputs.items():
+            table_files = []
+            for path in _expand_inputs(inputs):
+                key = str(path)
+                if key not in files:
+                    files[key] = fingerprint_file(path, known)
+                table_files.append(files[key])
+            table_fps[table_name] = _combine(table_files, dim_fp)
+
+        plan = cls(
+            enabled=enabled,
+            table_fingerprints=table_fps,
+            previous_fingerprints=previous,
+            files=files,
+            dim_barrios_fingerprint=dim_fp,
+        )
+        if enabled:
+            logger.info(
+                "Modo incremental: %s/%s tablas a recalcular (%s)",
+                len(plan.stale_tables),
+                len(table_fps),
+                ", ".join(sorted(plan.stale_tables)) or "ninguna",
+            )
+        return plan
+
+    def needs_rebuild(self, table_name: str) -> bool:
+        """Indica si la tabla debe recalcularse y recargarse en esta ejecución."""
+        if not self.enabled:
+            return True
+        current = self.table_fingerprints.get(table_name)
+        if current is None:
+            return True
+        return self.previous_fingerprints.get(table_name) != current
+
+    @property
+    def stale_tables(self) -> Set[str]:
+        """Tablas cuya huella ha cambiado (o no tienen estado previo)."""
+        return {t for t in self.table_fingerprints if self.needs_rebuild(t)}
+
+    @property
+    def skipped_tables(self) -> Set[str]:
+        """Tablas que se mantienen sin cambios en esta ejecución."""
+        return set(self.table_fingerprints) - self.stale_tables
+
+    def summary(self) -> Dict[str, object]:
+        """Resumen serializable para ``etl_runs.parameters``."""
+        return {
+            "enabled": self.enabled,
+            "dim_barrios_fingerprint": self.dim_barrios_fingerprint,
+            "rebuilt_tables": sorted(self.stale_tables),
+            "skipped_tables": sorted(self.skipped_tables),
+            "input_files": len(self.files),
+        }
+
+    def save(
+        self,
+        conn: sqlite3.Connection,
+        run_id: str,
+        tables: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Persiste las huellas de archivos y tablas tras una carga correcta.
+
+        Args:
+            conn: Conexión SQLite activa.
+            run_id: Identificador de la ejecución ETL.
+            tables: Tablas cuyo estado se actualiza (por defecto todas).
+        """
+        now = datetime.utcnow().isoformat()
+        selected = set(self.table_fingerprints if tables is None else tables)
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO etl_input_fingerprints
+                    (file_path, size_bytes, mtime_ns, sha256, run_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?);
+                """,
+                [
+                    (fp.path, fp.size_bytes, fp.mtime_ns, fp.sha256, run_id, now)
+                    for fp in self.files.values()
+                ],
+            )
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO etl_table_state
+                    (table_name, input_fingerprint, run_id, updated_at)
+                VALUES (?, ?, ?, ?);
+                """,
+                [
+                    (table, fingerprint, run_id, now)
+                    for table, fingerprint in self.table_fingerprints.items()
+                    if table in selected
+                ],
+            )
+        logger.debug("Estado incremental guardado para %s tablas", len(selected))
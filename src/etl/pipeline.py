@@ -7,7 +7,7 @@ import sqlite3
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 
@@ -20,7 +20,9 @@ from ..database_setup import (
     register_etl_run,
     truncate_tables,
 )
-from ..database_views import create_analytical_views
+from ..database_views import create_analytical_views, refresh_materialized_views
+from .incremental import IncrementalPlan, load_poblacion_snapshot
+from .stages import Stage, resolve_max_workers, run_stage_graph, stage_timings
 from .migrations import migrate_dim_barrios_if_needed
 from ..data_processing import (
     prepare_fact_renta_avanzada,
@@ -33,6 +35,7 @@ from .validators import (
     handle_source_error,
     validate_all_fact_tables,
 )
+from ..extraction.columnar import read_tabular
 from ..extraction.opendata import OpenDataBCNExtractor
 
 logger = logging.getLogger(__name__)
@@ -41,6 +44,14 @@ RAW_OPENDATABCN_DIR = Path("data/raw/opendatabcn")
 RAW_METADATA_GLOB = "extraction_metadata_*.json"
 PROCESSED_DIR = Path("data/processed")
 
+# Tabla de hechos generada por cada grupo de datasets avanzados
+ADVANCED_GROUP_TABLES: Dict[str, str] = {
+    "renta": "fact_renta_avanzada",
+    "catastro": "fact_catastro_avanzado",
+    "hogares": "fact_hogares_avanzado",
+    "turismo": "fact_turismo_intensidad",
+}
+
 
 def _find_latest_file(directory: Path, pattern: str) -> Optional[Path]:
     files = sorted(directory.glob(pattern), key=lambda p: p.stat().st_mtime)
@@ -128,10 +139,11 @@ def _get_latest_file_from_manifest(
 
 
 def _safe_read_csv(path: Path) -> pd.DataFrame:
+    """Lee un CSV raw, usando su copia Parquet tipada si existe y está al día."""
     if not path or not path.exists():
         raise FileNotFoundError(f"El archivo requerido no existe: {path}")
     logger.info("Leyendo archivo %s", path.name)
-    return pd.read_csv(path)
+    return read_tabular(path)
 
 
 def _convert_to_json_serializable(obj):
@@ -168,12 +180,159 @@ def _convert_to_json_serializable(obj):
         return obj
 
 
+def _stage_demografia(
+    dem_df: pd.DataFrame,
+    dim_barrios: pd.DataFrame,
+    dataset_id: str,
+    reference_time: datetime,
+    raw_base_dir: Path,
+    ampliada: bool,
+) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """
+    Etapa de demografía del grafo de ``run_etl``.
+
+    Usa el procesamiento ampliado (edad quinquenal y nacionalidad) si el dataset
+    lo soporta y, si no está disponible o falla, el procesamiento estándar.
+
+    Returns:
+        Tupla ``(fact_demografia, fact_demografia_ampliada)``; solo una de las dos
+        es distinta de ``None``.
+    """
+    if ampliada:
+        logger.info("Procesando demografía ampliada (edad quinquenal y nacionalidad)...")
+        try:
+            fact_ampliada = data_processing.prepare_demografia_ampliada(
+                dem_df,
+                dim_barrios,
+                dataset_id=dataset_id,
+                reference_time=reference_time,
+                source="opendatabcn",
+            )
+            logger.info("✓ Demografía ampliada procesada: %s registros", len(fact_ampliada))
+            return None, fact_ampliada
+        except Exception as e:
+            logger.warning("Error procesando demografía ampliada, usando procesamiento estándar: %s", e)
+            logger.debug(traceback.format_exc())
+
+    logger.info("Procesando demografía estándar...")
+    fact_demografia = data_processing.prepare_fact_demografia(
+        dem_df,
+        dim_barrios,
+        dataset_id=dataset_id,
+        reference_time=reference_time,
+        source="opendatabcn",
+    )
+    fact_demografia = data_processing.enrich_fact_demografia(
+        fact_demografia,
+        dim_barrios,
+        raw_base_dir=raw_base_dir,
+        reference_time=reference_time,
+    )
+    return fact_demografia, None
+
+
+def _stage_precios(
+    prepare,
+    venta_df: pd.DataFrame,
+    dim_barrios: pd.DataFrame,
+    dataset_id_venta: str,
+    reference_time: datetime,
+    alquiler: Optional[pd.DataFrame],
+    dataset_id_alquiler: Optional[str],
+    portaldades: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """Etapa de ``fact_precios``: combina Open Data BCN con el Portal de Dades (si lo hay)."""
+    portaldades_venta, portaldades_alquiler = (
+        portaldades if portaldades is not None else (pd.DataFrame(), pd.DataFrame())
+    )
+    return prepare(
+        venta_df,
+        dim_barrios,
+        dataset_id_venta=dataset_id_venta,
+        reference_time=reference_time,
+        alquiler=alquiler,
+        dataset_id_alquiler=dataset_id_alquiler,
+        portaldades_venta=portaldades_venta,
+        portaldades_alquiler=portaldades_alquiler,
+    )
+
+
+def _poblacion_from_stage(
+    demografia: Optional[Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]],
+    poblacion_df: Optional[pd.DataFrame],
+) -> Optional[pd.DataFrame]:
+    """Población por barrio y año a partir de la etapa de demografía o del snapshot previo."""
+    if demografia is not None:
+        fact_demografia = demografia[0]
+        if fact_demografia is not None and not fact_demografia.empty:
+            poblacion = fact_demografia[["barrio_id", "anio", "poblacion_total"]].copy()
+            logger.info("Datos de población cargados para cálculo de tasas: %s registros", len(poblacion))
+            return poblacion
+        return None
+    return poblacion_df
+
+
+def _stage_seguridad(
+    raw_data_path: Path,
+    barrios_df: pd.DataFrame,
+    demografia: Optional[Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]] = None,
+    poblacion_df: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Etapa de ``fact_seguridad`` (ICGC) con tasas por población."""
+    from ..processing.prepare_seguridad import prepare_seguridad  # noqa: WPS433
+
+    return prepare_seguridad(
+        raw_data_path=raw_data_path,
+        barrios_df=barrios_df,
+        poblacion_df=_poblacion_from_stage(demografia, poblacion_df),
+    )
+
+
+def _stage_ruido(
+    raw_data_path: Path,
+    barrios_df: pd.DataFrame,
+    demografia: Optional[Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]] = None,
+    poblacion_df: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Etapa de ``fact_ruido`` con porcentaje de población expuesta."""
+    from ..processing.prepare_ruido import prepare_ruido  # noqa: WPS433
+
+    return prepare_ruido(
+        raw_data_path=raw_data_path,
+        barrios_df=barrios_df,
+        poblacion_df=_poblacion_from_stage(demografia, poblacion_df),
+    )
+
+
 def run_etl(
     raw_base_dir: Path = Path("data/raw"),
     processed_dir: Path = PROCESSED_DIR,
     db_path: Optional[Path] = None,
+    incremental: bool = False,
+    max_workers: Optional[int] = None,
+    materialize_views: bool = True,
 ) -> Path:
-    """Execute the transformation (T) and load (L) stages into SQLite."""
+    """
+    Execute the transformation (T) and load (L) stages into SQLite.
+
+    Args:
+        raw_base_dir: Directorio base con los datos raw extraídos.
+        processed_dir: Directorio donde se guarda la base de datos.
+        db_path: Ruta opcional del archivo SQLite.
+        incremental: Si es True, solo se recalculan y recargan las tablas de
+            hechos cuyos archivos de entrada (o ``dim_barrios``) han cambiado
+            desde la última ejecución correcta (ver ``src.etl.incremental``).
+        max_workers: Procesos para ejecutar en paralelo las etapas de
+            preparación independientes (ver ``src.etl.stages``). ``None`` usa
+            la variable de entorno ``ETL_MAX_WORKERS`` o 1 (secuencial);
+            ``0`` usa todas las CPUs.
+        materialize_views: Si es True, las vistas analíticas se materializan
+            en tablas ``mv_*`` indexadas versionadas con el ``run_id`` del ETL
+            (ver ``src.database_views.refresh_materialized_views``).
+
+    Returns:
+        Ruta a la base de datos generada.
+    """
 
     # #region agent log
     import json
@@ -209,9 +368,11 @@ def run_etl(
     params: Dict[str, object] = {
         "raw_base_dir": str(raw_base_dir.resolve()),
         "processed_dir": str(processed_dir.resolve()),
+        "mode": "incremental" if incremental else "full",
     }
     error_message: Optional[str] = None
     conn: Optional[sqlite3.Connection] = None
+    state_conn: Optional[sqlite3.Connection] = None
 
     try:
         opendata_dir = raw_base_dir / "opendatabcn"
@@ -328,11 +489,13 @@ def run_etl(
                 portaldades_dir, "*b37xv8wcjh*.csv"
             )
 
-        # Descubrimiento de archivos avanzados
+        # Descubrimiento de archivos avanzados (la lectura se difiere hasta saber
+        # qué tablas hay que recalcular)
         renta_avanzada_files = {}
         catastro_avanzado_files = {}
         hogares_avanzado_files = {}
         turismo_intensidad_files = {}
+        advanced_paths: Dict[str, Dict[str, Path]] = {}
         
         # Mapeo de grupos a sus keys
         advanced_groups = {
@@ -352,7 +515,7 @@ def run_etl(
         datasets_mapping = OpenDataBCNExtractor.DATASETS
         
         for group_name, keys in advanced_groups.items():
-            target_dict = group_to_target[group_name]
+            group_paths = advanced_paths.setdefault(group_name, {})
             for key in keys:
                 dataset_id = datasets_mapping.get(key)
                 if not dataset_id:
@@ -367,8 +530,7 @@ def run_etl(
                     path = _find_latest_file(RAW_OPENDATABCN_DIR, f"*{dataset_id}*.csv")
                 
                 if path:
-                    logger.info(f"Cargando dataset avanzado '{key}' desde: {path.name}")
-                    target_dict[key] = _safe_read_csv(path)
+                    group_paths[key] = path
                 else:
                     logger.debug(f"No se encontró archivo para dataset avanzado '{key}' (ID: {dataset_id})")
         
@@ -385,19 +547,6 @@ def run_etl(
         params["metadata_file"] = _find_latest_file(raw_base_dir, RAW_METADATA_GLOB).name if _find_latest_file(raw_base_dir, RAW_METADATA_GLOB) else None
 
         dem_df = _safe_read_csv(demographics_path)
-        venta_df = _safe_read_csv(venta_path) if venta_path else pd.DataFrame()
-        alquiler_df = (
-            _safe_read_csv(alquiler_path) if alquiler_path else pd.DataFrame()
-        )
-        
-        # Cargar datos de renta si están disponibles (fuente opcional)
-        renta_df = None
-        if renta_path:
-            try:
-                renta_df = _safe_read_csv(renta_path)
-                logger.info("✓ Datos de renta cargados: %s", renta_path.name)
-            except Exception as e:
-                handle_source_error("renta", e, context="carga CSV")
 
         # Determinar dataset IDs
         dataset_dem = metadata.get("coverage_by_source", {}).get(
@@ -438,384 +587,266 @@ def run_etl(
             geojson_path=geojson_path
         )
 
-        # Procesar demografía: usar función ampliada si el dataset lo soporta
-        fact_demografia = None
-        fact_demografia_ampliada = None
-        
-        if is_demographics_ampliada:
-            # Usar procesamiento ampliado para datos con edad quinquenal y nacionalidad
-            logger.info("Procesando demografía ampliada (edad quinquenal y nacionalidad)...")
-            try:
-                fact_demografia_ampliada = data_processing.prepare_demografia_ampliada(
-                    dem_df,
-                    dim_barrios,
-                    dataset_id=dataset_dem_id,
-                    reference_time=reference_time,
-                    source="opendatabcn",
-                )
-                logger.info("✓ Demografía ampliada procesada: %s registros", len(fact_demografia_ampliada))
-            except Exception as e:
-                logger.warning("Error procesando demografía ampliada, usando procesamiento estándar: %s", e)
-                logger.debug(traceback.format_exc())
-                fact_demografia_ampliada = None
-        
-        # Si no se procesó ampliada o falló, usar procesamiento estándar
-        if fact_demografia_ampliada is None:
-            logger.info("Procesando demografía estándar...")
-            fact_demografia = data_processing.prepare_fact_demografia(
-                dem_df,
-                dim_barrios,
-                dataset_id=dataset_dem_id,
-                reference_time=reference_time,
-                source="opendatabcn",
-            )
+        # Directorios de las fuentes que se procesan por carpeta
+        if regulacion_dir.exists():
+            regulacion_data_dir = regulacion_dir
+        elif portaldades_dir.exists():
+            regulacion_data_dir = portaldades_dir
+        else:
+            # Fallback: usar raw_base_dir directamente (prepare_regulacion buscará recursivamente)
+            regulacion_data_dir = raw_base_dir
 
-            fact_demografia = data_processing.enrich_fact_demografia(
-                fact_demografia,
-                dim_barrios,
-                raw_base_dir=raw_base_dir,
-                reference_time=reference_time,
+        airbnb_data_dir = raw_base_dir / "airbnb"
+        if not airbnb_data_dir.exists():
+            airbnb_data_dir = raw_base_dir / "insideairbnb"
+
+        icgc_data_dir = raw_base_dir / "icgc"
+        if not icgc_data_dir.exists():
+            icgc_data_dir = raw_base_dir / "seguridad"
+
+        ruido_data_dir = raw_base_dir / "ruido"
+        if not ruido_data_dir.exists():
+            ruido_data_dir = raw_base_dir / "opendatabcn" / "ruido"
+
+        # === PLAN INCREMENTAL ===
+        # Las huellas se calculan siempre para que una ejecución completa deje el
+        # estado listo para la siguiente incremental; los hashes se reutilizan
+        # mientras tamaño y mtime no cambien.
+        database_path = ensure_database_path(db_path, processed_dir)
+        if database_path.exists():
+            state_conn = create_connection(database_path)
+
+        demografia_inputs = [
+            demographics_path,
+            portaldades_dir,
+            _find_latest_file(opendata_dir, "opendatabcn_pad_mdb_*edat-q_sexe_*.csv"),
+        ]
+        table_inputs: Dict[str, List[Optional[Path]]] = {
+            "fact_demografia": demografia_inputs,
+            "fact_demografia_ampliada": demografia_inputs,
+            "fact_precios": [venta_path, alquiler_path, portaldades_dir],
+            "fact_regulacion": [regulacion_data_dir],
+            "fact_presion_turistica": [airbnb_data_dir],
+            "fact_seguridad": [icgc_data_dir, *demografia_inputs],
+            "fact_ruido": [ruido_data_dir, *demografia_inputs],
+            "fact_renta": [renta_path],
+            "fact_oferta_idealista": [idealista_venta_path, idealista_rent_path],
+        }
+        for group_name, table_name in ADVANCED_GROUP_TABLES.items():
+            table_inputs[table_name] = list(advanced_paths.get(group_name, {}).values())
+
+        plan = IncrementalPlan.build(
+            state_conn, table_inputs, dim_barrios, enabled=incremental
+        )
+        params["incremental"] = plan.summary()
+        # Tablas cuyo recálculo falló: no se marca su estado como actualizado
+        failed_tables: set = set()
+
+        rebuild_demografia = plan.needs_rebuild("fact_demografia") or plan.needs_rebuild(
+            "fact_demografia_ampliada"
+        )
+        rebuild_precios = plan.needs_rebuild("fact_precios")
+
+        venta_df = pd.DataFrame()
+        alquiler_df = pd.DataFrame()
+        if rebuild_precios:
+            venta_df = _safe_read_csv(venta_path) if venta_path else pd.DataFrame()
+            alquiler_df = (
+                _safe_read_csv(alquiler_path) if alquiler_path else pd.DataFrame()
             )
 
-        # Procesar datos del Portal de Dades
-        portaldades_dir = raw_base_dir / "portaldades"
-        portaldades_venta_df = pd.DataFrame()
-        portaldades_alquiler_df = pd.DataFrame()
-        
-        if portaldades_dir.exists():
-            logger.info("=== Procesando datos del Portal de Dades ===")
-            metadata_file = portaldades_dir / "indicadores_habitatge.csv"
+        # Cargar datos de renta si están disponibles (fuente opcional)
+        renta_df = None
+        if renta_path and plan.needs_rebuild("fact_renta"):
             try:
-                portaldades_venta_df, portaldades_alquiler_df = (
-                    data_processing.prepare_portaldades_precios(
-                        portaldades_dir,
-                        dim_barrios,
-                        reference_time,
-                        metadata_file=metadata_file if metadata_file.exists() else None,
-                    )
-                )
-                params["portaldades_venta_rows"] = int(len(portaldades_venta_df))
-                params["portaldades_alquiler_rows"] = int(len(portaldades_alquiler_df))
-                
-                if not portaldades_venta_df.empty:
-                    logger.info(
-                        f"✓ Portal de Dades - Venta: {len(portaldades_venta_df):,} registros "
-                        f"(años {portaldades_venta_df['anio'].min()}-{portaldades_venta_df['anio'].max()})"
-                    )
-                if not portaldades_alquiler_df.empty:
-                    logger.info(
-                        f"✓ Portal de Dades - Alquiler: {len(portaldades_alquiler_df):,} registros "
-                        f"(años {portaldades_alquiler_df['anio'].min()}-{portaldades_alquiler_df['anio'].max()})"
-                    )
+                renta_df = _safe_read_csv(renta_path)
+                logger.info("✓ Datos de renta cargados: %s", renta_path.name)
             except Exception as e:
-                handle_source_error("portaldades", e, context="procesamiento precios")
-        else:
-            logger.info("Directorio del Portal de Dades no encontrado, omitiendo")
+                handle_source_error("renta", e, context="carga CSV")
+                failed_tables.add("fact_renta")
 
-        fact_precios = data_processing.prepare_fact_precios(
-            venta_df,
-            dim_barrios,
-            dataset_id_venta=dataset_venta_id,
-            reference_time=reference_time,
-            alquiler=alquiler_df,
-            dataset_id_alquiler=dataset_alquiler_id,
-            portaldades_venta=portaldades_venta_df,
-            portaldades_alquiler=portaldades_alquiler_df,
-        )
+        for group_name, group_paths in advanced_paths.items():
+            if not plan.needs_rebuild(ADVANCED_GROUP_TABLES[group_name]):
+                continue
+            target_dict = group_to_target[group_name]
+            for key, path in group_paths.items():
+                logger.info(f"Cargando dataset avanzado '{key}' desde: {path.name}")
+                target_dict[key] = _safe_read_csv(path)
 
-        # Procesar datos de regulación (Portal de Dades + Open Data BCN)
+        # === ETAPAS DE PREPARACIÓN (grafo de dependencias) ===
+        # Todas las etapas dependen solo de dim_barrios (y seguridad/ruido de la
+        # población calculada en demografía), por lo que se ejecutan en paralelo
+        # cuando max_workers > 1.
         from ..processing.prepare_regulacion import prepare_regulacion  # noqa: WPS433
         from ..processing.prepare_presion_turistica import prepare_presion_turistica  # noqa: WPS433
-        from ..processing.prepare_seguridad import prepare_seguridad  # noqa: WPS433
-        from ..processing.prepare_ruido import prepare_ruido  # noqa: WPS433
 
+        fact_demografia = None
+        fact_demografia_ampliada = None
+        fact_precios = None
         fact_regulacion = None
         fact_presion_turistica = None
         fact_seguridad = None
         fact_ruido = None
+        fact_renta = None
+        fact_oferta_idealista = None
         fact_educacion = None
         fact_movilidad = None
         fact_vivienda_publica = None
-        # Intentar primero regulacion_dir, luego portaldades_dir, luego raw_base_dir
-        regulacion_data_dir = None
-        
-        # #region agent log
-        import json
-        import time as time_module
-        from pathlib import Path as PathLib
-        debug_log_path = PathLib(__file__).parent.parent.parent / ".cursor" / "debug.log"
-        try:
-            debug_log_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(debug_log_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps({
-                    "sessionId": "debug-session",
-                    "runId": "run1",
-                    "hypothesisId": "A",
-                    "location": "pipeline.py:412",
-                    "message": "Checking regulacion directories",
-                    "data": {
-                        "regulacion_dir": str(regulacion_dir),
-                        "regulacion_dir_exists": regulacion_dir.exists(),
-                        "portaldades_dir": str(portaldades_dir),
-                        "portaldades_dir_exists": portaldades_dir.exists(),
-                        "raw_base_dir": str(raw_base_dir),
-                        "debug_log_path": str(debug_log_path),
-                    },
-                    "timestamp": int(time_module.time() * 1000)
-                }) + "\n")
-        except Exception as log_err:
-            logger.debug("Debug log write failed: %s", log_err)
-        # #endregion
-        
-        if regulacion_dir.exists():
-            regulacion_data_dir = regulacion_dir
-        elif portaldades_dir.exists():
-            regulacion_data_dir = portaldades_dir
-        else:
-            # Fallback: usar raw_base_dir directamente (prepare_regulacion buscará recursivamente)
-            regulacion_data_dir = raw_base_dir
-        
-        # #region agent log
-        try:
-            with open(debug_log_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps({
-                    "sessionId": "debug-session",
-                    "runId": "run1",
-                    "hypothesisId": "A",
-                    "location": "pipeline.py:420",
-                    "message": "Selected regulacion_data_dir",
-                    "data": {
-                        "regulacion_data_dir": str(regulacion_data_dir),
-                        "regulacion_data_dir_exists": regulacion_data_dir.exists() if regulacion_data_dir else False,
+        stages: List[Stage] = []
+
+        if rebuild_demografia:
+            stages.append(
+                Stage(
+                    "demografia",
+                    _stage_demografia,
+                    kwargs={
+                        "dem_df": dem_df,
+                        "dim_barrios": dim_barrios,
+                        "dataset_id": dataset_dem_id,
+                        "reference_time": reference_time,
+                        "raw_base_dir": raw_base_dir,
+                        "ampliada": is_demographics_ampliada,
                     },
-                    "timestamp": int(time_module.time() * 1000)
-                }) + "\n")
-        except Exception as log_err:
-            logger.debug("Debug log write failed: %s", log_err)
-        # #endregion
-        
-        logger.info("Buscando datos de regulación en: %s", regulacion_data_dir)
-        try:
-            # #region agent log
-            try:
-                with open(debug_log_path, "a", encoding="utf-8") as f:
-                    f.write(json.dumps({
-                        "sessionId": "debug-session",
-                        "runId": "run1",
-                        "hypothesisId": "B",
-                        "location": "pipeline.py:424",
-                        "message": "Calling prepare_regulacion",
-                        "data": {
-                            "raw_data_path": str(regulacion_data_dir),
-                            "barrios_df_rows": len(dim_barrios),
-                        },
-                        "timestamp": int(time_module.time() * 1000)
-                    }) + "\n")
-            except Exception as log_err:
-                logger.debug("Debug log write failed: %s", log_err)
-            # #endregion
-            
-            fact_regulacion = prepare_regulacion(
-                raw_data_path=regulacion_data_dir,
-                barrios_df=dim_barrios,
+                    critical=True,
+                )
             )
-            
-            # #region agent log
-            try:
-                with open(debug_log_path, "a", encoding="utf-8") as f:
-                    f.write(json.dumps({
-                        "sessionId": "debug-session",
-                        "runId": "run1",
-                        "hypothesisId": "D",
-                        "location": "pipeline.py:428",
-                        "message": "prepare_regulacion returned",
-                        "data": {
-                            "fact_regulacion_is_none": fact_regulacion is None,
-                            "fact_regulacion_empty": fact_regulacion.empty if fact_regulacion is not None else None,
-                            "fact_regulacion_rows": len(fact_regulacion) if fact_regulacion is not None else 0,
+        else:
+            logger.info("Modo incremental: demografía sin cambios, se omite")
+
+        # Población para tasas de seguridad/ruido: de la etapa de demografía o,
+        # si se omite en modo incremental, de la tabla ya cargada.
+        population_dependency = {"demografia": "demografia"} if rebuild_demografia else {}
+        poblacion_snapshot = None
+        if not rebuild_demografia and state_conn is not None:
+            poblacion_snapshot = load_poblacion_snapshot(state_conn)
+
+        if rebuild_precios:
+            precios_dependency = {}
+            if portaldades_dir.exists():
+                logger.info("=== Procesando datos del Portal de Dades ===")
+                metadata_file = portaldades_dir / "indicadores_habitatge.csv"
+                stages.append(
+                    Stage(
+                        "portaldades",
+                        data_processing.prepare_portaldades_precios,
+                        kwargs={
+                            "portaldades_dir": portaldades_dir,
+                            "dim_barrios": dim_barrios,
+                            "reference_time": reference_time,
+                            "metadata_file": metadata_file if metadata_file.exists() else None,
                         },
-                        "timestamp": int(time_module.time() * 1000)
-                    }) + "\n")
-            except Exception as log_err:
-                logger.debug("Debug log write failed: %s", log_err)
-            # #endregion
-            
-            if fact_regulacion is not None and not fact_regulacion.empty:
-                logger.info(
-                    "✓ Regulación procesada: %s registros (años %s-%s)",
-                    len(fact_regulacion),
-                    fact_regulacion["anio"].min() if not fact_regulacion.empty else None,
-                    fact_regulacion["anio"].max() if not fact_regulacion.empty else None,
+                    )
                 )
+                precios_dependency = {"portaldades": "portaldades"}
             else:
-                logger.warning(
-                    "No se encontraron datos de regulación procesables en %s. "
-                    "Verifica que existan archivos CSV con 'b37xv8wcjh' en el nombre.",
-                    regulacion_data_dir
+                logger.info("Directorio del Portal de Dades no encontrado, omitiendo")
+            stages.append(
+                Stage(
+                    "precios",
+                    _stage_precios,
+                    kwargs={
+                        "prepare": data_processing.prepare_fact_precios,
+                        "venta_df": venta_df,
+                        "dim_barrios": dim_barrios,
+                        "dataset_id_venta": dataset_venta_id,
+                        "reference_time": reference_time,
+                        "alquiler": alquiler_df,
+                        "dataset_id_alquiler": dataset_alquiler_id,
+                    },
+                    depends_on=precios_dependency,
                 )
-        except Exception as e:
-            # #region agent log
-            try:
-                with open(debug_log_path, "a", encoding="utf-8") as f:
-                    f.write(json.dumps({
-                        "sessionId": "debug-session",
-                        "runId": "run1",
-                        "hypothesisId": "C",
-                        "location": "pipeline.py:441",
-                        "message": "Exception in prepare_regulacion",
-                        "data": {
-                            "error_type": type(e).__name__,
-                            "error_message": str(e),
-                        },
-                        "timestamp": int(time_module.time() * 1000)
-                    }) + "\n")
-            except Exception as log_err:
-                logger.debug("Debug log write failed: %s", log_err)
-            # #endregion
-            handle_source_error("regulacion", e, context="procesamiento")
-            fact_regulacion = None
-        
-        # Procesar datos de presión turística (Inside Airbnb)
-        airbnb_data_dir = raw_base_dir / "airbnb"
-        if not airbnb_data_dir.exists():
-            airbnb_data_dir = raw_base_dir / "insideairbnb"
-        
-        if airbnb_data_dir.exists():
+            )
+        else:
+            logger.info("Modo incremental: fact_precios sin cambios, se omite")
+
+        if not plan.needs_rebuild("fact_regulacion"):
+            logger.info("Modo incremental: fact_regulacion sin cambios, se omite")
+        else:
+            logger.info("Buscando datos de regulación en: %s", regulacion_data_dir)
+            stages.append(
+                Stage(
+                    "regulacion",
+                    prepare_regulacion,
+                    kwargs={"raw_data_path": regulacion_data_dir, "barrios_df": dim_barrios},
+                )
+            )
+
+        if not plan.needs_rebuild("fact_presion_turistica"):
+            logger.info("Modo incremental: fact_presion_turistica sin cambios, se omite")
+        elif airbnb_data_dir.exists():
             logger.info("=== Procesando datos de presión turística (Inside Airbnb) ===")
-            try:
-                fact_presion_turistica = prepare_presion_turistica(
-                    raw_data_path=airbnb_data_dir,
-                    barrios_df=dim_barrios,
+            stages.append(
+                Stage(
+                    "presion_turistica",
+                    prepare_presion_turistica,
+                    kwargs={"raw_data_path": airbnb_data_dir, "barrios_df": dim_barrios},
                 )
-                
-                if fact_presion_turistica is not None and not fact_presion_turistica.empty:
-                    logger.info(
-                        "✓ Presión turística procesada: %s registros (años %s-%s)",
-                        len(fact_presion_turistica),
-                        fact_presion_turistica["anio"].min() if not fact_presion_turistica.empty else None,
-                        fact_presion_turistica["anio"].max() if not fact_presion_turistica.empty else None,
-                    )
-                    params["presion_turistica_rows"] = int(len(fact_presion_turistica))
-                    params["presion_turistica_barrios"] = int(fact_presion_turistica["barrio_id"].nunique())
-                else:
-                    logger.warning(
-                        "No se encontraron datos de presión turística procesables en %s. "
-                        "Verifica que existan archivos CSV de listings, calendar y reviews.",
-                        airbnb_data_dir
-                    )
-            except Exception as e:
-                handle_source_error("presion_turistica", e, context="procesamiento")
-                fact_presion_turistica = None
+            )
         else:
             logger.info("Directorio de datos de Airbnb no encontrado, omitiendo presión turística")
-            fact_presion_turistica = None
-        
-        # Procesar datos de seguridad y criminalidad (ICGC)
-        icgc_data_dir = raw_base_dir / "icgc"
-        if not icgc_data_dir.exists():
-            icgc_data_dir = raw_base_dir / "seguridad"
-        
-        if icgc_data_dir.exists():
+
+        if not plan.needs_rebuild("fact_seguridad"):
+            logger.info("Modo incremental: fact_seguridad sin cambios, se omite")
+        elif icgc_data_dir.exists():
             logger.info("=== Procesando datos de seguridad y criminalidad (ICGC) ===")
-            try:
-                # Cargar datos de población para calcular tasas
-                poblacion_df = None
-                if fact_demografia is not None and not fact_demografia.empty:
-                    poblacion_df = fact_demografia[["barrio_id", "anio", "poblacion_total"]].copy()
-                    logger.info("Datos de población cargados para cálculo de tasas: %s registros", len(poblacion_df))
-                
-                fact_seguridad = prepare_seguridad(
-                    raw_data_path=icgc_data_dir,
-                    barrios_df=dim_barrios,
-                    poblacion_df=poblacion_df,
+            stages.append(
+                Stage(
+                    "seguridad",
+                    _stage_seguridad,
+                    kwargs={
+                        "raw_data_path": icgc_data_dir,
+                        "barrios_df": dim_barrios,
+                        "poblacion_df": poblacion_snapshot,
+                    },
+                    depends_on=population_dependency,
                 )
-                
-                if fact_seguridad is not None and not fact_seguridad.empty:
-                    logger.info(
-                        "✓ Seguridad procesada: %s registros (años %s-%s)",
-                        len(fact_seguridad),
-                        fact_seguridad["anio"].min() if not fact_seguridad.empty else None,
-                        fact_seguridad["anio"].max() if not fact_seguridad.empty else None,
-                    )
-                    params["seguridad_rows"] = int(len(fact_seguridad))
-                    params["seguridad_barrios"] = int(fact_seguridad["barrio_id"].nunique())
-                else:
-                    logger.warning(
-                        "No se encontraron datos de seguridad procesables en %s. "
-                        "Verifica que existan archivos CSV de criminalidad.",
-                        icgc_data_dir
-                    )
-            except Exception as e:
-                handle_source_error("seguridad", e, context="procesamiento")
-                fact_seguridad = None
+            )
         else:
             logger.info("Directorio de datos de ICGC no encontrado, omitiendo seguridad")
-            fact_seguridad = None
-        
-        # Procesar datos de contaminación acústica (ruido)
-        ruido_data_dir = raw_base_dir / "ruido"
-        if not ruido_data_dir.exists():
-            ruido_data_dir = raw_base_dir / "opendatabcn" / "ruido"
-        
-        if ruido_data_dir.exists() or (raw_base_dir / "ruido").exists():
+
+        if not plan.needs_rebuild("fact_ruido"):
+            logger.info("Modo incremental: fact_ruido sin cambios, se omite")
+        elif ruido_data_dir.exists() or (raw_base_dir / "ruido").exists():
             logger.info("=== Procesando datos de contaminación acústica (ruido) ===")
-            try:
-                # Cargar datos de población para calcular porcentaje expuesto
-                poblacion_df = None
-                if fact_demografia is not None and not fact_demografia.empty:
-                    poblacion_df = fact_demografia[["barrio_id", "anio", "poblacion_total"]].copy()
-                    logger.info("Datos de población cargados para cálculo de exposición: %s registros", len(poblacion_df))
-                
-                fact_ruido = prepare_ruido(
-                    raw_data_path=ruido_data_dir if ruido_data_dir.exists() else raw_base_dir,
-                    barrios_df=dim_barrios,
-                    poblacion_df=poblacion_df,
+            stages.append(
+                Stage(
+                    "ruido",
+                    _stage_ruido,
+                    kwargs={
+                        "raw_data_path": ruido_data_dir if ruido_data_dir.exists() else raw_base_dir,
+                        "barrios_df": dim_barrios,
+                        "poblacion_df": poblacion_snapshot,
+                    },
+                    depends_on=population_dependency,
                 )
-                
-                if fact_ruido is not None and not fact_ruido.empty:
-                    logger.info(
-                        "✓ Ruido procesado: %s registros (años %s-%s)",
-                        len(fact_ruido),
-                        fact_ruido["anio"].min() if not fact_ruido.empty else None,
-                        fact_ruido["anio"].max() if not fact_ruido.empty else None,
-                    )
-                    params["ruido_rows"] = int(len(fact_ruido))
-                    params["ruido_barrios"] = int(fact_ruido["barrio_id"].nunique())
-                else:
-                    logger.warning(
-                        "No se encontraron datos de ruido procesables. "
-                        "Verifica que existan archivos CSV de ruido o mapas ráster."
-                    )
-            except Exception as e:
-                handle_source_error("ruido", e, context="procesamiento")
-                fact_ruido = None
+            )
         else:
             logger.info("Directorio de datos de ruido no encontrado, omitiendo contaminación acústica")
-            fact_ruido = None
-        
-        # Procesar renta si está disponible
-        fact_renta = None
+
         if renta_df is not None and not renta_df.empty:
             logger.info("Procesando datos de renta...")
-            try:
-                fact_renta = data_processing.prepare_renta_barrio(
-                    renta_df,
-                    dim_barrios,
-                    dataset_id=dataset_renta_id,
-                    reference_time=reference_time,
-                    source="opendatabcn",
-                    metric="mean",
+            stages.append(
+                Stage(
+                    "renta",
+                    data_processing.prepare_renta_barrio,
+                    kwargs={
+                        "renta_df": renta_df,
+                        "dim_barrios": dim_barrios,
+                        "dataset_id": dataset_renta_id,
+                        "reference_time": reference_time,
+                        "source": "opendatabcn",
+                        "metric": "mean",
+                    },
                 )
-                logger.info("✓ Renta procesada: %s registros", len(fact_renta))
-            except Exception as e:
-                handle_source_error("renta", e, context="procesamiento")
-                fact_renta = None
-        
-        # Procesar datos de Idealista si están disponibles
-        fact_oferta_idealista = None
+            )
+
+        # Datos de Idealista: la lectura (pequeña) se hace aquí, el procesamiento en su etapa
         idealista_data_combined = []
+        rebuild_idealista = plan.needs_rebuild("fact_oferta_idealista")
+        if not rebuild_idealista:
+            logger.info("Modo incremental: fact_oferta_idealista sin cambios, se omite")
         
-        if idealista_venta_path and idealista_venta_path.exists():
+        if rebuild_idealista and idealista_venta_path and idealista_venta_path.exists():
             try:
                 logger.info("Cargando datos de oferta de venta de Idealista...")
                 idealista_venta_df = _safe_read_csv(idealista_venta_path)
@@ -824,8 +855,9 @@ def run_etl(
                     logger.info("✓ Datos de venta Idealista cargados: %s", idealista_venta_path.name)
             except Exception as e:
                 handle_source_error("idealista", e, context="carga venta CSV")
+                failed_tables.add("fact_oferta_idealista")
         
-        if idealista_rent_path and idealista_rent_path.exists():
+        if rebuild_idealista and idealista_rent_path and idealista_rent_path.exists():
             try:
                 logger.info("Cargando datos de oferta de alquiler de Idealista...")
                 idealista_rent_df = _safe_read_csv(idealista_rent_path)
@@ -834,32 +866,195 @@ def run_etl(
                     logger.info("✓ Datos de alquiler Idealista cargados: %s", idealista_rent_path.name)
             except Exception as e:
                 handle_source_error("idealista", e, context="carga alquiler CSV")
+                failed_tables.add("fact_oferta_idealista")
         
         if idealista_data_combined:
             logger.info("Procesando datos de oferta de Idealista...")
-            try:
-                idealista_df = pd.concat(idealista_data_combined, ignore_index=True)
-                
-                fact_oferta_idealista = data_processing.prepare_idealista_oferta(
-                    idealista_df,
-                    dim_barrios,
-                    dataset_id="idealista_api",
-                    reference_time=reference_time,
-                    source="idealista_api",
+            stages.append(
+                Stage(
+                    "idealista",
+                    data_processing.prepare_idealista_oferta,
+                    kwargs={
+                        "idealista_df": pd.concat(idealista_data_combined, ignore_index=True),
+                        "dim_barrios": dim_barrios,
+                        "dataset_id": "idealista_api",
+                        "reference_time": reference_time,
+                        "source": "idealista_api",
+                    },
                 )
-                logger.info("✓ Oferta Idealista procesada: %s registros", len(fact_oferta_idealista))
-            except Exception as e:
-                handle_source_error("idealista", e, context="procesamiento oferta")
-                fact_oferta_idealista = None
-        else:
+            )
+        elif rebuild_idealista:
             logger.debug("No se encontraron datos de Idealista (opcional, requiere API credentials)")
 
-        # Procesar datasets avanzados
+        # Datasets avanzados
         logger.info("Procesando datasets avanzados...")
-        fact_renta_avanzada = prepare_fact_renta_avanzada(renta_avanzada_files, dim_barrios, reference_time) if renta_avanzada_files else None
-        fact_catastro_avanzado = prepare_fact_catastro_avanzado(catastro_avanzado_files, dim_barrios, reference_time) if catastro_avanzado_files else None
-        fact_hogares_avanzado = prepare_fact_hogares_avanzado(hogares_avanzado_files, dim_barrios, reference_time) if hogares_avanzado_files else None
-        fact_turismo_intensidad = prepare_fact_turismo_intensidad(turismo_intensidad_files, dim_barrios, reference_time) if turismo_intensidad_files else None
+        advanced_stages = (
+            ("renta_avanzada", prepare_fact_renta_avanzada, renta_avanzada_files),
+            ("catastro_avanzado", prepare_fact_catastro_avanzado, catastro_avanzado_files),
+            ("hogares_avanzado", prepare_fact_hogares_avanzado, hogares_avanzado_files),
+            ("turismo_intensidad", prepare_fact_turismo_intensidad, turismo_intensidad_files),
+        )
+        for stage_name, prepare_func, files in advanced_stages:
+            if files:
+                stages.append(
+                    Stage(
+                        stage_name,
+                        prepare_func,
+                        kwargs={
+                            "dfs": files,
+                            "dim_barrios": dim_barrios,
+                            "reference_time": reference_time,
+                        },
+                    )
+                )
+
+        stage_results = run_stage_graph(stages, max_workers=max_workers)
+        params["max_workers"] = resolve_max_workers(max_workers)
+        params["stage_timings"] = stage_timings(stage_results)
+
+        # Errores por etapa: la demografía es crítica; el resto, opcional
+        demografia_result = stage_results.get("demografia")
+        if demografia_result is not None and demografia_result.error is not None:
+            raise demografia_result.error
+
+        def _stage_output(stage_name: str, source: str, context: str, table: str):
+            result = stage_results.get(stage_name)
+            if result is None:
+                return None
+            if result.error is not None:
+                handle_source_error(source, result.error, context=context)
+                failed_tables.add(table)
+                return None
+            return result.value
+
+        if demografia_result is not None:
+            fact_demografia, fact_demografia_ampliada = demografia_result.value
+
+        portaldades_result = stage_results.get("portaldades")
+        if portaldades_result is not None:
+            if portaldades_result.error is not None:
+                handle_source_error(
+                    "portaldades", portaldades_result.error, context="procesamiento precios"
+                )
+                failed_tables.add("fact_precios")
+            else:
+                portaldades_venta_df, portaldades_alquiler_df = portaldades_result.value
+                params["portaldades_venta_rows"] = int(len(portaldades_venta_df))
+                params["portaldades_alquiler_rows"] = int(len(portaldades_alquiler_df))
+                if not portaldades_venta_df.empty:
+                    logger.info(
+                        f"✓ Portal de Dades - Venta: {len(portaldades_venta_df):,} registros "
+                        f"(años {portaldades_venta_df['anio'].min()}-{portaldades_venta_df['anio'].max()})"
+                    )
+                if not portaldades_alquiler_df.empty:
+                    logger.info(
+                        f"✓ Portal de Dades - Alquiler: {len(portaldades_alquiler_df):,} registros "
+                        f"(años {portaldades_alquiler_df['anio'].min()}-{portaldades_alquiler_df['anio'].max()})"
+                    )
+
+        if "precios" in stage_results:
+            precios_result = stage_results["precios"]
+            if precios_result.error is not None:
+                raise precios_result.error
+            fact_precios = precios_result.value
+
+        fact_regulacion = _stage_output(
+            "regulacion", "regulacion", "procesamiento", "fact_regulacion"
+        )
+        if "regulacion" in stage_results and stage_results["regulacion"].ok:
+            if fact_regulacion is not None and not fact_regulacion.empty:
+                logger.info(
+                    "✓ Regulación procesada: %s registros (años %s-%s)",
+                    len(fact_regulacion),
+                    fact_regulacion["anio"].min(),
+                    fact_regulacion["anio"].max(),
+                )
+            else:
+                logger.warning(
+                    "No se encontraron datos de regulación procesables en %s. "
+                    "Verifica que existan archivos CSV con 'b37xv8wcjh' en el nombre.",
+                    regulacion_data_dir
+                )
+
+        fact_presion_turistica = _stage_output(
+            "presion_turistica", "presion_turistica", "procesamiento", "fact_presion_turistica"
+        )
+        if "presion_turistica" in stage_results and stage_results["presion_turistica"].ok:
+            if fact_presion_turistica is not None and not fact_presion_turistica.empty:
+                logger.info(
+                    "✓ Presión turística procesada: %s registros (años %s-%s)",
+                    len(fact_presion_turistica),
+                    fact_presion_turistica["anio"].min(),
+                    fact_presion_turistica["anio"].max(),
+                )
+                params["presion_turistica_rows"] = int(len(fact_presion_turistica))
+                params["presion_turistica_barrios"] = int(fact_presion_turistica["barrio_id"].nunique())
+            else:
+                logger.warning(
+                    "No se encontraron datos de presión turística procesables en %s. "
+                    "Verifica que existan archivos CSV de listings, calendar y reviews.",
+                    airbnb_data_dir
+                )
+
+        fact_seguridad = _stage_output("seguridad", "seguridad", "procesamiento", "fact_seguridad")
+        if "seguridad" in stage_results and stage_results["seguridad"].ok:
+            if fact_seguridad is not None and not fact_seguridad.empty:
+                logger.info(
+                    "✓ Seguridad procesada: %s registros (años %s-%s)",
+                    len(fact_seguridad),
+                    fact_seguridad["anio"].min(),
+                    fact_seguridad["anio"].max(),
+                )
+                params["seguridad_rows"] = int(len(fact_seguridad))
+                params["seguridad_barrios"] = int(fact_seguridad["barrio_id"].nunique())
+            else:
+                logger.warning(
+                    "No se encontraron datos de seguridad procesables en %s. "
+                    "Verifica que existan archivos CSV de criminalidad.",
+                    icgc_data_dir
+                )
+
+        fact_ruido = _stage_output("ruido", "ruido", "procesamiento", "fact_ruido")
+        if "ruido" in stage_results and stage_results["ruido"].ok:
+            if fact_ruido is not None and not fact_ruido.empty:
+                logger.info(
+                    "✓ Ruido procesado: %s registros (años %s-%s)",
+                    len(fact_ruido),
+                    fact_ruido["anio"].min(),
+                    fact_ruido["anio"].max(),
+                )
+                params["ruido_rows"] = int(len(fact_ruido))
+                params["ruido_barrios"] = int(fact_ruido["barrio_id"].nunique())
+            else:
+                logger.warning(
+                    "No se encontraron datos de ruido procesables. "
+                    "Verifica que existan archivos CSV de ruido o mapas ráster."
+                )
+
+        fact_renta = _stage_output("renta", "renta", "procesamiento", "fact_renta")
+        if fact_renta is not None:
+            logger.info("✓ Renta procesada: %s registros", len(fact_renta))
+
+        fact_oferta_idealista = _stage_output(
+            "idealista", "idealista", "procesamiento oferta", "fact_oferta_idealista"
+        )
+        if fact_oferta_idealista is not None:
+            logger.info("✓ Oferta Idealista procesada: %s registros", len(fact_oferta_idealista))
+
+        advanced_outputs = {}
+        for stage_name, _, _ in advanced_stages:
+            result = stage_results.get(stage_name)
+            if result is not None and result.error is not None:
+                raise result.error
+            advanced_outputs[stage_name] = result.value if result is not None else None
+        fact_renta_avanzada = advanced_outputs["renta_avanzada"]
+        fact_catastro_avanzado = advanced_outputs["catastro_avanzado"]
+        fact_hogares_avanzado = advanced_outputs["hogares_avanzado"]
+        fact_turismo_intensidad = advanced_outputs["turismo_intensidad"]
+
+        if state_conn is not None:
+            state_conn.close()
+            state_conn = None
 
         # === VALIDACIÓN DE INTEGRIDAD REFERENCIAL ===
         # Validar todas las fact tables antes de insertar en SQLite
@@ -947,14 +1142,13 @@ def run_etl(
                 "dim_barrios_rows": int(len(dim_barrios)),
                 "fact_demografia_rows": int(len(fact_demografia)) if fact_demografia is not None else 0,
                 "fact_demografia_ampliada_rows": int(len(fact_demografia_ampliada)) if fact_demografia_ampliada is not None else 0,
-                "fact_precios_rows": int(len(fact_precios)),
+                "fact_precios_rows": int(len(fact_precios)) if fact_precios is not None else 0,
                 "fact_renta_rows": int(len(fact_renta)) if fact_renta is not None else 0,
                 "fact_oferta_idealista_rows": int(len(fact_oferta_idealista)) if fact_oferta_idealista is not None else 0,
                 "fact_regulacion_rows": int(len(fact_regulacion)) if fact_regulacion is not None else 0,
             }
         )
 
-        database_path = ensure_database_path(db_path, processed_dir)
         params["database_path"] = str(database_path.resolve())
 
         conn = create_connection(database_path)
@@ -972,7 +1166,8 @@ def run_etl(
             tables_to_truncate.append("fact_oferta_idealista")
         if fact_regulacion is not None:
             tables_to_truncate.append("fact_regulacion")
-        tables_to_truncate.append("fact_precios")
+        if fact_precios is not None:
+            tables_to_truncate.append("fact_precios")
         if fact_renta_avanzada is not None:
             tables_to_truncate.append("fact_renta_avanzada")
         if fact_catastro_avanzado is not None:
@@ -1020,10 +1215,10 @@ def run_etl(
             )
             del fact_demografia
             gc.collect()
-        else:
+        elif rebuild_demografia:
             logger.warning("No se cargaron datos demográficos")
 
-        if not fact_precios.empty:
+        if fact_precios is not None and not fact_precios.empty:
             logger.info("Cargando tabla de hechos de precios")
             fact_precios = optimize_dataframe_memory(fact_precios)
             insert_dataframe_in_batches(
@@ -1032,18 +1227,16 @@ def run_etl(
             )
             del fact_precios
             gc.collect()
-        else:
+        elif fact_precios is not None:
             logger.warning(
                 "No se cargaron datos en fact_precios (dataframe vacío)"
             )
         
         if fact_renta is not None and not fact_renta.empty:
             logger.info("Cargando tabla de hechos de renta")
-            fact_renta.to_sql(
-                "fact_renta",
-                conn,
-                if_exists="append",
-                index=False,
+            insert_dataframe_in_batches(
+                fact_renta, "fact_renta", conn,
+                batch_size=10000, if_exists="append"
             )
         else:
             logger.debug("No se cargaron datos en fact_renta (no disponible o vacío)")
@@ -1051,11 +1244,9 @@ def run_etl(
         if fact_regulacion is not None and not fact_regulacion.empty:
             logger.info("Cargando tabla de hechos de regulación")
             # Usar replace para evitar errores de UNIQUE constraint si hay datos previos
-            fact_regulacion.to_sql(
-                "fact_regulacion",
-                conn,
-                if_exists="replace",
-                index=False,
+            insert_dataframe_in_batches(
+                fact_regulacion, "fact_regulacion", conn,
+                batch_size=10000, if_exists="replace"
             )
         else:
             logger.debug(
@@ -1064,11 +1255,9 @@ def run_etl(
 
         if fact_presion_turistica is not None and not fact_presion_turistica.empty:
             logger.info("Cargando tabla de hechos de presión turística")
-            fact_presion_turistica.to_sql(
-                "fact_presion_turistica",
-                conn,
-                if_exists="replace",
-                index=False,
+            insert_dataframe_in_batches(
+                fact_presion_turistica, "fact_presion_turistica", conn,
+                batch_size=10000, if_exists="replace"
             )
         else:
             logger.debug(
@@ -1077,11 +1266,9 @@ def run_etl(
 
         if fact_seguridad is not None and not fact_seguridad.empty:
             logger.info("Cargando tabla de hechos de seguridad")
-            fact_seguridad.to_sql(
-                "fact_seguridad",
-                conn,
-                if_exists="replace",
-                index=False,
+            insert_dataframe_in_batches(
+                fact_seguridad, "fact_seguridad", conn,
+                batch_size=10000, if_exists="replace"
             )
         else:
             logger.debug(
@@ -1090,11 +1277,9 @@ def run_etl(
 
         if fact_ruido is not None and not fact_ruido.empty:
             logger.info("Cargando tabla de hechos de ruido")
-            fact_ruido.to_sql(
-                "fact_ruido",
-                conn,
-                if_exists="replace",
-                index=False,
+            insert_dataframe_in_batches(
+                fact_ruido, "fact_ruido", conn,
+                batch_size=10000, if_exists="replace"
             )
         else:
             logger.debug(
@@ -1103,11 +1288,9 @@ def run_etl(
 
         if fact_oferta_idealista is not None and not fact_oferta_idealista.empty:
             logger.info("Cargando tabla de hechos de oferta Idealista")
-            fact_oferta_idealista.to_sql(
-                "fact_oferta_idealista",
-                conn,
-                if_exists="append",
-                index=False,
+            insert_dataframe_in_batches(
+                fact_oferta_idealista, "fact_oferta_idealista", conn,
+                batch_size=10000, if_exists="append"
             )
         else:
             logger.debug("No se cargaron datos en fact_oferta_idealista (no disponible o vacío)")
@@ -1152,7 +1335,11 @@ def run_etl(
 
         # Crear vistas analíticas después de cargar los datos
         try:
-            create_analytical_views(conn)
+            if materialize_views:
+                refreshed_views = refresh_materialized_views(conn, run_id=run_id)
+                params["materialized_views"] = refreshed_views
+            else:
+                create_analytical_views(conn)
             logger.info("Vistas analíticas creadas/actualizadas tras la carga de datos")
         except Exception as exc:  # noqa: BLE001
             logger.warning(
@@ -1160,12 +1347,27 @@ def run_etl(
                 exc,
             )
 
+        # Persistir huellas de entrada para la próxima ejecución incremental
+        try:
+            plan.save(
+                conn,
+                run_id,
+                tables=set(plan.table_fingerprints) - failed_tables,
+            )
+        except sqlite3.Error as exc:
+            logger.warning(
+                "No se pudo guardar el estado incremental (se recalculará todo): %s",
+                exc,
+            )
+
     except Exception as exc:  # noqa: BLE001
         status = "FAILED"
         error_message = str(exc)
         logger.exception("Error durante la ejecución del ETL: %s", exc)
         raise
     finally:
+        if state_conn is not None:
+            state_conn.close()
         finished_at = datetime.utcnow()
         params["finished_at"] = finished_at.isoformat()
         if error_message:
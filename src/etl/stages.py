@@ -0,0 +1,250 @@
+"""
+Ejecutor de etapas del ETL como grafo de dependencias (DAG).
+
+Cada etapa declara la función que la implementa, sus argumentos estáticos y
+las etapas de las que depende (cuyo resultado recibe como argumento). Las
+etapas independientes se ejecutan en paralelo en un ``ProcessPoolExecutor``;
+con ``max_workers <= 1`` se ejecutan en el proceso actual en orden
+topológico, que es el comportamiento por defecto del pipeline.
+
+Las funciones de etapa deben ser funciones de módulo (serializables con
+``pickle``) y sus argumentos/resultados, objetos serializables como
+DataFrames. Los errores no detienen el grafo: se devuelven en
+``StageResult.error`` para que el pipeline los trate con
+``handle_source_error`` en el proceso principal. Si falla una etapa marcada
+como ``critical`` no se lanzan más etapas.
+
+Uso típico:
+    from src.etl.stages import Stage, run_stage_graph
+
+    results = run_stage_graph(
+        [
+            Stage("demografia", prepare_demografia, kwargs={...}, critical=True),
+            Stage("seguridad", prepare_seguridad, depends_on={"demografia": "demografia"}),
+        ],
+        max_workers=4,
+    )
+    results["seguridad"].value
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Variable de entorno para fijar el número de workers por defecto
+ETL_WORKERS_ENV = "ETL_MAX_WORKERS"
+
+
+@dataclass
+class Stage:
+    """
+    Etapa del grafo de ejecución.
+
+    Attributes:
+        name: Nombre único de la etapa (se usa también como clave del resultado).
+        func: Función de módulo que implementa la etapa.
+        kwargs: Argumentos estáticos de la función.
+        depends_on: Mapeo ``{nombre_argumento: etapa}``; el resultado de cada
+            etapa se pasa a ``func`` con ese nombre de argumento.
+        critical: Si falla, no se lanzan nuevas etapas.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    depends_on: Dict[str, str] = field(default_factory=dict)
+    critical: bool = False
+
+
+@dataclass
+class StageResult:
+    """Resultado de una etapa: valor devuelto, error y tiempo de ejecución."""
+
+    name: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """True si la etapa se ejecutó sin errores."""
+        return self.error is None and not self.skipped
+
+
+def resolve_max_workers(max_workers: Optional[int] = None) -> int:
+    """
+    Determina el número de workers a usar.
+
+    Args:
+        max_workers: Valor explícito. Si es ``None`` se usa la variable de entorno
+            ``ETL_MAX_WORKERS`` y, en su defecto, 1 (ejecución secuencial).
+            Un valor ``0`` significa "tantos como CPUs".
+
+    Returns:
+        Número de workers (>= 1).
+    """
+    if max_workers is None:
+        env_value = os.environ.get(ETL_WORKERS_ENV)
+        try:
+            max_workers = int(env_value) if env_value else 1
+        except ValueError:
+            logger.warning("Valor inválido en %s: %r, se usa 1", ETL_WORKERS_ENV, env_value)
+            max_workers = 1
+    if max_workers == 0:
+        max_workers = os.cpu_count() or 1
+    return max(1, max_workers)
+
+
+def _execute(func: Callable[..., Any], kwargs: Mapping[str, Any]) -> Tuple[Any, float]:
+    """Ejecuta una etapa y mide su duración (se ejecuta en el worker)."""
+    start = time.perf_counter()
+    value = func(**kwargs)
+    return value, time.perf_counter() - start
+
+
+def _validate_graph(stages: Sequence[Stage]) -> Dict[str, Stage]:
+    """Comprueba nombres únicos, dependencias existentes y ausencia de ciclos."""
+    by_name: Dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Etapa duplicada en el grafo: {stage.name}")
+        by_name[stage.name] = stage
+
+    for stage in stages:
+        missing = set(stage.depends_on.values()) - set(by_name)
+        if missing:
+            raise ValueError(
+                f"La etapa '{stage.name}' depende de etapas inexistentes: {sorted(missing)}"
+            )
+
+    # Detección de ciclos (DFS)
+    visiting: set = set()
+    done: set = set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Ciclo detectado en el grafo de etapas en '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].depends_on.values():
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in by_name:
+        visit(name)
+    return by_name
+
+
+def _build_kwargs(stage: Stage, results: Mapping[str, StageResult]) -> Dict[str, Any]:
+    """Combina argumentos estáticos con los resultados de las dependencias."""
+    kwargs = dict(stage.kwargs)
+    for arg_name, dep_name in stage.depends_on.items():
+        dep = results[dep_name]
+        kwargs[arg_name] = dep.value if dep.ok else None
+    return kwargs
+
+
+def run_stage_graph(
+    stages: Sequence[Stage],
+    max_workers: Optional[int] = None,
+) -> Dict[str, StageResult]:
+    """
+    Ejecuta un grafo de etapas respetando sus dependencias.
+
+    Args:
+        stages: Etapas a ejecutar.
+        max_workers: Número de procesos (ver ``resolve_max_workers``).
+
+    Returns:
+        Diccionario ``{nombre_etapa: StageResult}`` con una entrada por etapa.
+
+    Raises:
+        ValueError: Si el grafo tiene nombres duplicados, dependencias
+            desconocidas o ciclos.
+    """
+    by_name = _validate_graph(stages)
+    workers = resolve_max_workers(max_workers)
+    results: Dict[str, StageResult] = {}
+    pending: List[str] = [stage.name for stage in stages]
+    aborted = False
+
+    def ready(name: str) -> bool:
+        return all(dep in results for dep in by_name[name].depends_on.values())
+
+    def record(name: str, value: Any, error: Optional[BaseException], seconds: float) -> None:
+        nonlocal aborted
+        results[name] = StageResult(name=name, value=value, error=error, seconds=seconds)
+        if error is not None:
+            logger.debug("Etapa '%s' falló tras %.2fs: %s", name, seconds, error)
+            if by_name[name].critical:
+                aborted = True
+        else:
+            logger.info("Etapa '%s' completada en %.2fs", name, seconds)
+
+    def skip_remaining() -> None:
+        for name in pending:
+            results[name] = StageResult(name=name, skipped=True)
+        pending.clear()
+
+    if workers == 1:
+        while pending:
+            if aborted:
+                skip_remaining()
+                break
+            name = next(n for n in pending if ready(n))
+            pending.remove(name)
+            stage = by_name[name]
+            start = time.perf_counter()
+            try:
+                value, seconds = _execute(stage.func, _build_kwargs(stage, results))
+                record(name, value, None, seconds)
+            except Exception as exc:  # noqa: BLE001
+                record(name, None, exc, time.perf_counter() - start)
+        return results
+
+    logger.info("Ejecutando %s etapas con %s workers", len(pending), workers)
+    running: Dict[Future, Tuple[str, float]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            if not aborted:
+                for name in [n for n in pending if ready(n)]:
+                    pending.remove(name)
+                    stage = by_name[name]
+                    future = executor.submit(
+                        _execute, stage.func, _build_kwargs(stage, results)
+                    )
+                    running[future] = (name, time.perf_counter())
+            elif pending:
+                skip_remaining()
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, submitted = running.pop(future)
+                try:
+                    value, seconds = future.result()
+                    record(name, value, None, seconds)
+                except Exception as exc:  # noqa: BLE001
+                    record(name, None, exc, time.perf_counter() - submitted)
+
+    return results
+
+
+def stage_timings(results: Mapping[str, StageResult]) -> Dict[str, Optional[float]]:
+    """Resumen ``{etapa: segundos}`` serializable para ``etl_runs.parameters``."""
+    return {
+        name: None if result.skipped else round(result.seconds, 3)
+        for name, result in results.items()
+    }
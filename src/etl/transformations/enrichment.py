@@ -9,10 +9,12 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
+from src.transform.geometry import get_barrio_geometry_index
+
 from .utils import (
     _extract_year_from_temps,
     _load_portaldades_csv,
-    _map_territorio_to_barrio_id,
+    get_barrio_resolver,
     logger,
 )
 
@@ -72,6 +74,7 @@ def prepare_portaldades_precios(
     }
 
     logger.info("Procesando %s archivos del Portal de Dades...", len(csv_files))
+    resolver = get_barrio_resolver(dim_barrios)
 
     for csv_file in csv_files:
         file_id = csv_file.stem.split("_")[-1]
@@ -110,13 +113,9 @@ def prepare_portaldades_precios(
             df["anio"] = df["Dim-00:TEMPS"].apply(_extract_year_from_temps)
             df = df.dropna(subset=["anio", "VALUE"])
 
-            df["barrio_id"] = df.apply(
-                lambda row: _map_territorio_to_barrio_id(
-                    row["Dim-01:TERRITORI"],
-                    row["Dim-01:TERRITORI (type)"],
-                    dim_barrios,
-                ),
-                axis=1,
+            df["barrio_id"] = resolver.resolve_many(
+                df["Dim-01:TERRITORI"],
+                df["Dim-01:TERRITORI (type)"],
             )
 
             df = df.dropna(subset=["barrio_id"])
@@ -218,14 +217,28 @@ def prepare_idealista_oferta(
 
     logger.info("Mapeando barrios de Idealista usando columna '%s'...", barrio_col)
 
-    df["barrio_id"] = df[barrio_col].apply(
-        lambda value: (
-            _map_territorio_to_barrio_id(str(value), "Barri", dim_barrios)
-            if pd.notna(value)
-            else None
-        ),
+    df["barrio_id"] = get_barrio_resolver(dim_barrios).resolve_many(
+        df[barrio_col].map(lambda value: str(value) if pd.notna(value) else None),
+        "Barri",
     )
 
+    # Anuncios sin barrio reconocible: usar sus coordenadas si las hay
+    unresolved = df["barrio_id"].isna()
+    if (
+        unresolved.any()
+        and {"latitud", "longitud"}.issubset(df.columns)
+        and "geometry_json" in dim_barrios.columns
+    ):
+        geometry_index = get_barrio_geometry_index(dim_barrios)
+        if len(geometry_index):
+            df.loc[unresolved, "barrio_id"] = geometry_index.assign_points(
+                df.loc[unresolved, "longitud"], df.loc[unresolved, "latitud"]
+            )
+            logger.info(
+                "%s anuncios de Idealista asignados por coordenadas",
+                int(df.loc[unresolved, "barrio_id"].notna().sum()),
+            )
+
     df = df.dropna(subset=["barrio_id"])
 
     if df.empty:
@@ -5,7 +5,7 @@ Centraliza utilidades que se usan en varios módulos de transformaciones:
 - Parsing de tamaños de hogar
 - Carga de CSV del Portal de Dades con detección de encoding
 - Búsqueda de ficheros e interpretación de timestamps de Portal de Dades
-- Normalización y mapeo de territorios a ``barrio_id``
+- Normalización y mapeo de territorios a ``barrio_id`` (``BarrioResolver``)
 - Helpers de edad y nacionalidad
 """
 
@@ -18,6 +18,7 @@ import re
 import unicodedata
 from datetime import datetime
 from difflib import get_close_matches
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -120,91 +121,123 @@ def _extract_year_from_temps(temps_str: str) -> Optional[int]:
         return None
 
 
-def _map_territorio_to_barrio_id(
-    territorio: str,
-    territorio_type: str,
-    dim_barrios: pd.DataFrame,
-) -> Optional[int]:
+class BarrioResolver:
     """
-    Mapea un nombre de territorio del Portal de Dades a un ``barrio_id``.
+    Resolución memoizada de nombres de territorio a ``barrio_id``.
 
-    Args:
-        territorio: Nombre del territorio (barrio, distrito, municipio).
-        territorio_type: Tipo de territorio (\"Barri\", \"Districte\", \"Municipi\").
-        dim_barrios: DataFrame con la dimensión de barrios.
+    Se construye una vez a partir de ``dim_barrios`` y precalcula las tablas de
+    búsqueda de la cascada de ``_map_territorio_to_barrio_id`` (alias, nombre
+    normalizado, nombre en minúsculas, subcadenas, tokens y coincidencia
+    aproximada). Cada valor distinto se resuelve una sola vez.
 
-    Returns:
-        ``barrio_id`` si se encuentra, ``None`` si no.
+    Uso típico:
+        resolver = get_barrio_resolver(dim_barrios)
+        df["barrio_id"] = resolver.resolve_many(
+            df["Dim-01:TERRITORI"], df["Dim-01:TERRITORI (type)"]
+        )
     """
-    if territorio_type == "Barri":
-        territorio_normalizado = cleaner.normalize_neighborhoods(territorio)
-
-        alias_target = cleaner.barrio_alias_overrides.get(territorio_normalizado)
-        if alias_target:
-            match = dim_barrios[
-                dim_barrios["barrio_nombre_normalizado"] == alias_target
-            ]
-            if not match.empty:
-                return int(match.iloc[0]["barrio_id"])
 
-        match = dim_barrios[
-            dim_barrios["barrio_nombre_normalizado"] == territorio_normalizado
+    def __init__(self, dim_barrios: pd.DataFrame, fuzzy_cache_size: int = 4096) -> None:
+        """
+        Args:
+            dim_barrios: DataFrame con ``barrio_id``, ``barrio_nombre`` y
+                ``barrio_nombre_normalizado``.
+            fuzzy_cache_size: Número máximo de resultados de coincidencia
+                aproximada que se conservan en caché.
+        """
+        ids = [int(value) for value in dim_barrios["barrio_id"]]
+        nombres = [
+            value if isinstance(value, str) else ""
+            for value in dim_barrios["barrio_nombre"]
         ]
-        if not match.empty:
-            return int(match.iloc[0]["barrio_id"])
-
-        match = dim_barrios[
-            dim_barrios["barrio_nombre"]
-            .str.strip()
-            .str.lower()
-            == territorio.strip().lower()
+        normalizados = [
+            value if isinstance(value, str) else None
+            for value in dim_barrios["barrio_nombre_normalizado"]
         ]
-        if not match.empty:
-            return int(match.iloc[0]["barrio_id"])
 
-        match = dim_barrios[
-            dim_barrios["barrio_nombre"].str.contains(
+        # Primer barrio_id por nombre normalizado y por nombre en minúsculas
+        self._by_normalized: Dict[str, int] = {}
+        self._by_lower: Dict[str, int] = {}
+        for barrio_id, nombre, normalizado in zip(ids, nombres, normalizados):
+            if normalizado is not None:
+                self._by_normalized.setdefault(normalizado, barrio_id)
+            self._by_lower.setdefault(nombre.strip().lower(), barrio_id)
+
+        # Alias del cleaner resueltos contra la dimensión
+        self._aliases: Dict[str, int] = {
+            alias: self._by_normalized[target]
+            for alias, target in cleaner.barrio_alias_overrides.items()
+            if target in self._by_normalized
+        }
+
+        # Candidatos ordenados por longitud del nombre (el más corto gana)
+        order = sorted(range(len(ids)), key=lambda i: len(nombres[i]))
+        self._by_length: List[Tuple[str, Optional[str], int]] = [
+            (nombres[i].upper(), normalizados[i], ids[i]) for i in order
+        ]
+
+        # Índice de tokens: token -> barrio con nombre normalizado más corto que lo contiene
+        self._token_index: Dict[str, Optional[int]] = {}
+        for normalizado in self._by_normalized:
+            for token in normalizado.split():
+                if len(token) > 3 and token not in self._token_index:
+                    self._token_index[token] = self._scan_normalized(token)
+
+        self._nombre_by_id: Dict[int, str] = {}
+        for barrio_id, nombre in zip(ids, nombres):
+            self._nombre_by_id.setdefault(barrio_id, nombre)
+
+        self._fuzzy_candidates: List[str] = list(self._by_normalized)
+        self._fuzzy = lru_cache(maxsize=fuzzy_cache_size)(self._fuzzy_lookup)
+        self._cache: Dict[Tuple[str, str], Optional[int]] = {}
+
+    def _scan_normalized(self, part: str) -> Optional[int]:
+        for _, normalizado, barrio_id in self._by_length:
+            if normalizado is not None and part in normalizado:
+                return barrio_id
+        return None
+
+    def _fuzzy_lookup(self, normalizado: str) -> Optional[str]:
+        close = get_close_matches(normalizado, self._fuzzy_candidates, n=1, cutoff=0.8)
+        return close[0] if close else None
+
+    def _resolve_barri(self, territorio: str) -> Optional[int]:
+        territorio_normalizado = cleaner.normalize_neighborhoods(territorio)
+
+        barrio_id = self._aliases.get(territorio_normalizado)
+        if barrio_id is None:
+            barrio_id = self._by_normalized.get(territorio_normalizado)
+        if barrio_id is None:
+            barrio_id = self._by_lower.get(territorio.strip().lower())
+        if barrio_id is None:
+            needle = territorio.upper()
+            barrio_id = next(
+                (bid for nombre, _, bid in self._by_length if needle in nombre),
+                None,
+            )
+        if barrio_id is None:
+            territorio_parts = territorio_normalizado.split()
+            if len(territorio_parts) > 1:
+                for part in territorio_parts:
+                    if len(part) <= 3:
+                        continue
+                    if part not in self._token_index:
+                        self._token_index[part] = self._scan_normalized(part)
+                    barrio_id = self._token_index[part]
+                    if barrio_id is not None:
+                        break
+        if barrio_id is not None:
+            return barrio_id
+
+        close = self._fuzzy(territorio_normalizado)
+        if close is not None:
+            barrio_id = self._by_normalized[close]
+            logger.info(
+                "Fuzzy match: '%s' -> '%s'",
                 territorio,
-                case=False,
-                na=False,
-                regex=False,
+                self._nombre_by_id.get(barrio_id, close),
             )
-        ]
-        if not match.empty:
-            match = match.sort_values("barrio_nombre", key=lambda series: series.str.len())
-            return int(match.iloc[0]["barrio_id"])
-
-        territorio_parts = territorio_normalizado.split()
-        if len(territorio_parts) > 1:
-            for part in territorio_parts:
-                if len(part) > 3:
-                    match = dim_barrios[
-                        dim_barrios["barrio_nombre_normalizado"].str.contains(
-                            part,
-                            na=False,
-                            regex=False,
-                        )
-                    ]
-                    if not match.empty:
-                        match = match.sort_values(
-                            "barrio_nombre",
-                            key=lambda series: series.str.len(),
-                        )
-                        return int(match.iloc[0]["barrio_id"])
-
-        candidates = dim_barrios["barrio_nombre_normalizado"].dropna().unique().tolist()
-        close = get_close_matches(territorio_normalizado, candidates, n=1, cutoff=0.8)
-        if close:
-            match = dim_barrios[
-                dim_barrios["barrio_nombre_normalizado"] == close[0]
-            ]
-            if not match.empty:
-                logger.info(
-                    "Fuzzy match: '%s' -> '%s'",
-                    territorio,
-                    match.iloc[0]["barrio_nombre"],
-                )
-                return int(match.iloc[0]["barrio_id"])
+            return barrio_id
 
         logger.warning(
             "No se pudo mapear el territorio '%s' (normalizado: '%s') a ningún barrio "
@@ -214,12 +247,115 @@ def _map_territorio_to_barrio_id(
         )
         return None
 
-    if territorio_type == "Districte":
-        # No asignamos distritos directamente a un solo barrio para evitar sesgos.
-        return None
+    def resolve(self, territorio: str, territorio_type: str = "Barri") -> Optional[int]:
+        """
+        Resuelve un territorio a ``barrio_id`` (memoizado por valor y tipo).
+
+        Args:
+            territorio: Nombre del territorio.
+            territorio_type: Tipo de territorio (\"Barri\", \"Districte\", \"Municipi\").
+                Solo los barrios se mapean; los niveles agregados devuelven ``None``.
+
+        Returns:
+            ``barrio_id`` si se encuentra, ``None`` si no.
+        """
+        if territorio_type != "Barri":
+            # No asignamos distritos ni municipios a un solo barrio para evitar sesgos.
+            return None
+        key = (territorio, territorio_type)
+        if key not in self._cache:
+            self._cache[key] = self._resolve_barri(territorio)
+        return self._cache[key]
+
+    def resolve_many(
+        self,
+        series: pd.Series,
+        types: Optional[object] = None,
+    ) -> pd.Series:
+        """
+        Resuelve una serie de territorios mapeando cada valor distinto una vez.
+
+        Args:
+            series: Nombres de territorio.
+            types: Tipo de territorio: una serie alineada con ``series``, un valor
+                escalar o ``None`` (equivale a \"Barri\").
+
+        Returns:
+            Serie ``Int64`` con el ``barrio_id`` (``<NA>`` si no se pudo mapear),
+            con el mismo índice que ``series``.
+        """
+        territorios = pd.Series(series)
+        if types is None or isinstance(types, str):
+            tipos = pd.Series(types or "Barri", index=territorios.index)
+        else:
+            tipos = pd.Series(types, index=territorios.index)
+
+        result = pd.Series(np.nan, index=territorios.index, dtype="float64")
+        valid = (territorios.notna() & tipos.notna()).to_numpy()
+        if valid.any():
+            pairs = pd.MultiIndex.from_arrays(
+                [territorios[valid].astype(str), tipos[valid].astype(str)]
+            )
+            codes, uniques = pd.factorize(pairs)
+            mapped = np.array(
+                [
+                    np.nan if (barrio_id := self.resolve(terr, tipo)) is None else barrio_id
+                    for terr, tipo in uniques
+                ],
+                dtype="float64",
+            )
+            result[valid] = mapped[codes]
+        return result.astype("Int64")
 
-    # Para municipio u otros niveles agregados, no mapeamos.
-    return None
+
+_RESOLVER_CACHE: Dict[Tuple, BarrioResolver] = {}
+
+
+def get_barrio_resolver(dim_barrios: pd.DataFrame) -> BarrioResolver:
+    """
+    Devuelve un ``BarrioResolver`` reutilizable para ``dim_barrios``.
+
+    El resolver se cachea por el contenido relevante de la dimensión, de forma que
+    todas las transformaciones de una ejecución comparten la misma memoización.
+
+    Args:
+        dim_barrios: DataFrame con la dimensión de barrios.
+
+    Returns:
+        BarrioResolver construido (o reutilizado) para esa dimensión.
+    """
+    key = tuple(
+        dim_barrios[["barrio_id", "barrio_nombre", "barrio_nombre_normalizado"]]
+        .astype(str)
+        .itertuples(index=False, name=None)
+    )
+    resolver = _RESOLVER_CACHE.get(key)
+    if resolver is None:
+        _RESOLVER_CACHE.clear()
+        resolver = BarrioResolver(dim_barrios)
+        _RESOLVER_CACHE[key] = resolver
+    return resolver
+
+
+def _map_territorio_to_barrio_id(
+    territorio: str,
+    territorio_type: str,
+    dim_barrios: pd.DataFrame,
+) -> Optional[int]:
+    """
+    Mapea un nombre de territorio del Portal de Dades a un ``barrio_id``.
+
+    Para series completas usar ``get_barrio_resolver(dim_barrios).resolve_many``.
+
+    Args:
+        territorio: Nombre del territorio (barrio, distrito, municipio).
+        territorio_type: Tipo de territorio (\"Barri\", \"Districte\", \"Municipi\").
+        dim_barrios: DataFrame con la dimensión de barrios.
+
+    Returns:
+        ``barrio_id`` si se encuentra, ``None`` si no.
+    """
+    return get_barrio_resolver(dim_barrios).resolve(territorio, territorio_type)
 
 
 def _edad_quinquenal_to_range(edad_q: int) -> Tuple[int, int]:
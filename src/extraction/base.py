@@ -7,9 +7,11 @@ Este módulo proporciona:
 - Constantes de directorio
 """
 
+import io
 import json
 import logging
 import logging.handlers
+import threading
 import time
 import traceback
 from datetime import datetime
@@ -21,6 +23,9 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .columnar import mirror_path_for, write_parquet_mirror
+from .raw_cache import HASH_CHUNK_SIZE, CachedFetch, RawCache
+
 # Configuración de directorios
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_RAW_DIR = BASE_DIR / "data" / "raw"
@@ -105,7 +110,9 @@ class BaseExtractor:
         self.rate_limit_delay = rate_limit_delay
         self.output_dir = output_dir or DATA_RAW_DIR
         self.session = self._create_session()
+        self.raw_cache = RawCache(self.output_dir)
         self.last_request_time = 0
+        self._rate_limit_lock = threading.Lock()
         
     def _create_session(self) -> requests.Session:
         """Crea una sesión HTTP con retry strategy."""
@@ -122,12 +129,79 @@ class BaseExtractor:
         return session
     
     def _rate_limit(self):
-        """Implementa rate limiting entre peticiones."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        """Implementa rate limiting entre peticiones (seguro entre hilos)."""
+        with self._rate_limit_lock:
+            current_time = time.time()
+            time_since_last = current_time - self.last_request_time
+            if time_since_last < self.rate_limit_delay:
+                time.sleep(self.rate_limit_delay - time_since_last)
+            self.last_request_time = time.time()
+    
+    def _fetch_cached(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: int = 60,
+        suffix: str = ""
+    ) -> Optional[CachedFetch]:
+        """
+        Descarga una URL con petición condicional y guarda el cuerpo en la caché raw.
+        
+        Si hay validadores (``ETag``/``Last-Modified``) de una descarga anterior se
+        envían ``If-None-Match``/``If-Modified-Since``; ante un 304 se reutiliza el
+        blob existente sin transferir el cuerpo. Una respuesta 200 se escribe en la
+        caché por bloques y, si su hash ya existía, también se marca como sin cambios.
+        
+        Args:
+            url: URL a descargar
+            params: Parámetros de query string
+            timeout: Timeout de la petición (segundos)
+            suffix: Extensión del blob (ej. '.csv')
+            
+        Returns:
+            CachedFetch con la ruta del blob, o None si la respuesta no es válida
+        """
+        cache_key = requests.Request("GET", url, params=params).prepare().url
+        validators = self.raw_cache.get_validators(cache_key)
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        
+        response = self.session.get(
+            url, params=params, timeout=timeout, stream=True, headers=headers or None
+        )
+        try:
+            if response.status_code == 304 and validators:
+                logger.info(f"Sin cambios (304): {cache_key}")
+                return CachedFetch(
+                    url=cache_key,
+                    path=self.raw_cache.blob_path(validators["sha256"], validators.get("suffix", "")),
+                    sha256=validators["sha256"],
+                    status_code=304,
+                    unchanged=True,
+                )
+            if not self._validate_response(response):
+                return None
+            sha256, blob, is_new = self.raw_cache.store_chunks(
+                response.iter_content(chunk_size=HASH_CHUNK_SIZE), suffix
+            )
+            self.raw_cache.set_validators(
+                cache_key,
+                sha256,
+                suffix,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            if not is_new:
+                logger.info(f"Sin cambios (mismo sha256): {cache_key}")
+            return CachedFetch(
+                url=cache_key, path=blob, sha256=sha256, status_code=response.status_code, unchanged=not is_new
+            )
+        finally:
+            response.close()
     
     def _save_raw_data(
         self,
@@ -143,6 +217,12 @@ class BaseExtractor:
         
         También registra el archivo en manifest.json para facilitar el descubrimiento
         de archivos durante el ETL (evita depender de patrones de nombre de archivo).
+        Los CSV se acompañan de una copia Parquet tipada que el ETL lee en lugar
+        del CSV cuando está disponible (ver ``src.extraction.columnar``).
+        
+        El contenido se guarda una sola vez por sha256 (ver ``src.extraction.raw_cache``):
+        si ya existe un blob idéntico no se escribe un archivo nuevo y se registra el
+        blob existente en el manifest.
         
         Args:
             data: Datos a guardar
@@ -154,7 +234,7 @@ class BaseExtractor:
                        para clasificación en el manifest
             
         Returns:
-            Path del archivo guardado
+            Path del archivo guardado (o del blob existente si el contenido no cambió)
         """
         source_dir = self.output_dir / self.source_name.lower().replace(' ', '_')
         source_dir.mkdir(parents=True, exist_ok=True)
@@ -170,21 +250,18 @@ class BaseExtractor:
             filepath = source_dir / f"{filename}_{timestamp}.{format}"
         
         try:
-            if format == 'json':
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-            elif format == 'csv':
-                if isinstance(data, pd.DataFrame):
-                    data.to_csv(filepath, index=False, encoding='utf-8')
-                else:
-                    raise ValueError("Para formato CSV, data debe ser un DataFrame")
-            elif format == 'xlsx':
-                if isinstance(data, pd.DataFrame):
-                    data.to_excel(filepath, index=False)
-                else:
-                    raise ValueError("Para formato XLSX, data debe ser un DataFrame")
-            
-            logger.info(f"Datos guardados en: {filepath}")
+            payload = self._serialize_raw_data(data, format)
+            sha256, blob, is_new = self.raw_cache.store_bytes(payload, f".{format}")
+            if is_new:
+                self.raw_cache.link(blob, filepath)
+                if format == 'csv':
+                    write_parquet_mirror(filepath)
+                    if mirror_path_for(filepath).exists():
+                        self.raw_cache.link(mirror_path_for(filepath), mirror_path_for(blob))
+                logger.info(f"Datos guardados en: {filepath}")
+            else:
+                filepath = blob
+                logger.info(f"Contenido sin cambios (sha256 {sha256[:12]}), se registra {filepath}")
             
             # Registrar en manifest.json
             self._append_to_manifest(
@@ -193,6 +270,7 @@ class BaseExtractor:
                 data_type=data_type or self._infer_data_type(filename),
                 year_start=year_start,
                 year_end=year_end,
+                sha256=sha256,
             )
             
             return filepath
@@ -201,6 +279,21 @@ class BaseExtractor:
             logger.error(traceback.format_exc())
             raise
     
+    @staticmethod
+    def _serialize_raw_data(data: Any, format: str) -> bytes:
+        """Serializa los datos raw al contenido exacto del archivo."""
+        if format == 'json':
+            return json.dumps(data, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError(f"Para formato {format.upper()}, data debe ser un DataFrame")
+        if format == 'csv':
+            return data.to_csv(index=False).encode('utf-8')
+        if format == 'xlsx':
+            buffer = io.BytesIO()
+            data.to_excel(buffer, index=False)
+            return buffer.getvalue()
+        raise ValueError(f"Formato no soportado: {format}")
+    
     def _append_to_manifest(
         self,
         file_path: Path,
@@ -208,6 +301,7 @@ class BaseExtractor:
         data_type: str,
         year_start: Optional[int] = None,
         year_end: Optional[int] = None,
+        sha256: Optional[str] = None,
     ) -> None:
         """
         Registra un archivo en el manifest.json centralizado.
@@ -218,6 +312,7 @@ class BaseExtractor:
             data_type: Tipo de datos (ej. 'demographics', 'prices_venta')
             year_start: Año inicial de los datos
             year_end: Año final de los datos
+            sha256: Hash del contenido del archivo
         """
         manifest_path = self.output_dir / "manifest.json"
         
@@ -239,6 +334,7 @@ class BaseExtractor:
             "timestamp": datetime.now().isoformat(),
             "year_start": year_start,
             "year_end": year_end,
+            "sha256": sha256,
         }
         
         manifest.append(entry)
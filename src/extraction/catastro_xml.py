@@ -0,0 +1,378 @@
+"""
+Lectura en streaming de los XML de consulta masiva del Catastro (Sede Electrónica).
+
+Las exportaciones de ciudad completa ocupan varios GB, así que no se puede
+construir el árbol del documento (``ET.parse``) ni acumular todos los inmuebles
+en una lista:
+
+- ``iter_catastro_records`` recorre el XML con ``iterparse`` y, al cerrar cada
+  bloque de inmueble (``BIE``), extrae sus campos, lo vacía y lo desengancha de
+  su padre; los elementos fuera de un inmueble se liberan igual. La memoria no
+  crece con el tamaño del archivo.
+- ``iter_catastro_batches`` agrupa los inmuebles en DataFrames tipados de
+  tamaño fijo (``CATASTRO_DTYPES``).
+- ``export_catastro_xml`` escribe los lotes a Parquet (esquema fijo) o CSV, y
+  ``load_catastro_xml_to_sqlite`` los inserta en ``fact_catastro_inmuebles``.
+
+El progreso (inmuebles, MB leídos, inmuebles/s y MB/s) se registra cada
+``log_interval`` segundos.
+
+Uso típico:
+    from src.extraction.catastro_xml import export_catastro_xml
+
+    stats = export_catastro_xml(xml_path, Path("catastro.parquet"))
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:  # pragma: no cover - depende del entorno
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - depende del entorno
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+# Etiquetas que delimitan un inmueble (DS -> LDS -> DSA -> LBI -> BIE)
+RECORD_TAGS = frozenset({"BIE", "INMUEBLE", "inmueble"})
+
+# Etiquetas de origen de cada campo, por prioridad
+FIELD_TAGS: Dict[str, Tuple[str, ...]] = {
+    "referencia_catastral": ("PCA", "RC", "RefCat", "ref_catastral"),
+    "direccion_normalizada": ("DTR", "DIRECCION", "ldt"),
+    "superficie_m2": ("SUP",),
+    "ano_construccion": ("ACO",),
+    "plantas": ("PLA", "PLANTAS", "planta"),
+}
+
+CATASTRO_DTYPES: Dict[str, str] = {
+    "referencia_catastral": "string",
+    "direccion_normalizada": "string",
+    "superficie_m2": "Float64",
+    "ano_construccion": "Int64",
+    "plantas": "Int64",
+}
+
+CATASTRO_TABLE = "fact_catastro_inmuebles"
+
+DEFAULT_BATCH_SIZE = 50_000
+DEFAULT_LOG_INTERVAL = 10.0
+
+_SQLITE_TYPES = {"string": "TEXT", "Float64": "REAL", "Int64": "INTEGER"}
+
+
+def _strip_ns(tag: str) -> str:
+    """Elimina el namespace de una etiqueta ElementTree."""
+    return tag.split("}", 1)[1] if "}" in tag else tag
+
+
+class ParseProgress:
+    """
+    Contador de progreso y throughput de un parseo en streaming.
+
+    Attributes:
+        total_bytes: Tamaño del archivo (para el porcentaje).
+        records: Inmuebles procesados.
+        bytes_read: Bytes consumidos del archivo.
+    """
+
+    def __init__(self, total_bytes: int = 0, log_interval: float = DEFAULT_LOG_INTERVAL) -> None:
+        self.total_bytes = total_bytes
+        self.log_interval = log_interval
+        self.records = 0
+        self.bytes_read = 0
+        self._start = time.perf_counter()
+        self._last_log = self._start
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def update(self, records: int, bytes_read: int) -> None:
+        """Actualiza contadores y registra el progreso si toca."""
+        self.records = records
+        self.bytes_read = bytes_read
+        now = time.perf_counter()
+        if self.log_interval and now - self._last_log >= self.log_interval:
+            self._last_log = now
+            logger.info("Catastro XML: %s", self.summary_line())
+
+    def summary(self) -> Dict[str, Any]:
+        """Métricas finales del parseo."""
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            "records": self.records,
+            "bytes_read": self.bytes_read,
+            "seconds": round(elapsed, 3),
+            "records_per_second": round(self.records / elapsed, 1),
+            "mb_per_second": round(self.bytes_read / 1e6 / elapsed, 2),
+        }
+
+    def summary_line(self) -> str:
+        stats = self.summary()
+        pct = f" ({100 * self.bytes_read / self.total_bytes:.1f}%)" if self.total_bytes else ""
+        return (
+            f"{stats['records']:,} inmuebles, {self.bytes_read / 1e6:,.1f} MB{pct} "
+            f"- {stats['records_per_second']:,.0f} inmuebles/s, {stats['mb_per_second']} MB/s"
+        )
+
+
+def _record_fields(record: ET.Element) -> Dict[str, Optional[str]]:
+    """
+    Extrae los campos de un inmueble a partir de sus descendientes.
+
+    Se toma el primer texto no vacío de cada etiqueta, salvo ``PCA`` (referencia
+    catastral), donde prevalece el último.
+    """
+    text_by_tag: Dict[str, str] = {}
+    for descendant in record.iter():
+        text = descendant.text
+        if not text or not text.strip():
+            continue
+        tag = _strip_ns(descendant.tag)
+        if tag == "PCA" or tag not in text_by_tag:
+            text_by_tag[tag] = text.strip()
+    return {
+        field: next((text_by_tag[tag] for tag in tags if tag in text_by_tag), None)
+        for field, tags in FIELD_TAGS.items()
+    }
+
+
+def iter_catastro_records(
+    xml_path: Path,
+    limit: int = 0,
+    record_tags: Iterable[str] = RECORD_TAGS,
+    progress: Optional[ParseProgress] = None,
+) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Recorre el XML y devuelve un diccionario (textos sin convertir) por inmueble.
+
+    Solo se devuelven inmuebles con referencia catastral.
+
+    Args:
+        xml_path: Ruta al XML de salida de la consulta masiva.
+        limit: Máximo de inmuebles (0 = sin límite).
+        record_tags: Etiquetas (sin namespace) que delimitan un inmueble.
+        progress: Contador de progreso opcional.
+
+    Yields:
+        Diccionario con las claves de ``FIELD_TAGS``.
+
+    Raises:
+        FileNotFoundError: Si el XML no existe.
+    """
+    xml_path = Path(xml_path)
+    if not xml_path.exists():
+        raise FileNotFoundError(f"XML no encontrado: {xml_path}")
+    record_tags = frozenset(record_tags)
+
+    emitted = 0
+    with xml_path.open("rb") as handle:
+        stack: List[ET.Element] = []
+        record_depth = 0  # > 0 mientras estamos dentro de un inmueble
+        for event, elem in ET.iterparse(handle, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                if _strip_ns(elem.tag) in record_tags:
+                    record_depth += 1
+                continue
+
+            stack.pop()
+            is_record = _strip_ns(elem.tag) in record_tags
+            if is_record:
+                record_depth -= 1
+            elif record_depth:
+                continue  # se libera junto con su inmueble
+
+            if is_record and record_depth == 0:
+                fields = _record_fields(elem)
+                if fields["referencia_catastral"]:
+                    emitted += 1
+                    if progress is not None:
+                        progress.update(emitted, handle.tell())
+                    yield fields
+
+            # Liberar el elemento y desengancharlo del padre (memoria constante)
+            elem.clear()
+            if stack and record_depth == 0:
+                stack[-1].remove(elem)
+            if limit and emitted >= limit:
+                break
+        if progress is not None:
+            progress.update(emitted, handle.tell())
+
+
+def records_to_frame(records: List[Dict[str, Optional[str]]]) -> pd.DataFrame:
+    """Convierte inmuebles en texto a un DataFrame con ``CATASTRO_DTYPES``."""
+    df = pd.DataFrame.from_records(records, columns=list(CATASTRO_DTYPES))
+    for column, dtype in CATASTRO_DTYPES.items():
+        if dtype == "string":
+            df[column] = df[column].astype("string")
+        else:
+            numeric = pd.to_numeric(df[column], errors="coerce")
+            if dtype == "Int64":
+                numeric = numeric.where(numeric == numeric.round())
+            df[column] = numeric.astype(dtype)
+    return df
+
+
+def iter_catastro_batches(
+    xml_path: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: int = 0,
+    progress: Optional[ParseProgress] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Recorre el XML en lotes tipados de ``batch_size`` inmuebles.
+
+    Args:
+        xml_path: Ruta al XML de salida de la consulta masiva.
+        batch_size: Inmuebles por lote.
+        limit: Máximo de inmuebles (0 = sin límite).
+        progress: Contador de progreso opcional.
+
+    Yields:
+        DataFrames con las columnas de ``CATASTRO_DTYPES``.
+    """
+    batch: List[Dict[str, Optional[str]]] = []
+    for record in iter_catastro_records(xml_path, limit=limit, progress=progress):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield records_to_frame(batch)
+            batch = []
+    if batch:
+        yield records_to_frame(batch)
+
+
+def _arrow_schema():
+    types = {"string": pa.string(), "Float64": pa.float64(), "Int64": pa.int64()}
+    return pa.schema([(column, types[dtype]) for column, dtype in CATASTRO_DTYPES.items()])
+
+
+def export_catastro_xml(
+    xml_path: Path,
+    out_path: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: int = 0,
+    log_interval: float = DEFAULT_LOG_INTERVAL,
+) -> Dict[str, Any]:
+    """
+    Convierte el XML a Parquet (``.parquet``) o CSV (cualquier otra extensión) por lotes.
+
+    El archivo se escribe primero con extensión ``.tmp`` y se renombra al
+    terminar, de modo que un parseo interrumpido no deja una salida parcial.
+
+    Args:
+        xml_path: Ruta al XML de salida de la consulta masiva.
+        out_path: Archivo de salida.
+        batch_size: Inmuebles por lote (grupo de filas en Parquet).
+        limit: Máximo de inmuebles (0 = sin límite).
+        log_interval: Segundos entre mensajes de progreso.
+
+    Returns:
+        Métricas del parseo (``ParseProgress.summary``) más ``output``.
+
+    Raises:
+        ImportError: Si se pide Parquet y pyarrow no está instalado.
+    """
+    xml_path = Path(xml_path)
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    as_parquet = out_path.suffix.lower() == ".parquet"
+    if as_parquet and not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow es necesario para exportar a Parquet")
+
+    progress = ParseProgress(xml_path.stat().st_size, log_interval)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    batches = iter_catastro_batches(xml_path, batch_size=batch_size, limit=limit, progress=progress)
+    if as_parquet:
+        schema = _arrow_schema()
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+    else:
+        with tmp_path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(CATASTRO_DTYPES)
+            for batch in batches:
+                batch.to_csv(handle, header=False, index=False)
+    tmp_path.replace(out_path)
+
+    stats = progress.summary()
+    stats["output"] = str(out_path)
+    logger.info("Catastro XML → %s: %s", out_path.name, progress.summary_line())
+    return stats
+
+
+def load_catastro_xml_to_sqlite(
+    xml_path: Path,
+    conn: sqlite3.Connection,
+    table: str = CATASTRO_TABLE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: int = 0,
+    replace: bool = True,
+    log_interval: float = DEFAULT_LOG_INTERVAL,
+) -> Dict[str, Any]:
+    """
+    Carga el XML en una tabla SQLite por lotes (una transacción por lote).
+
+    Args:
+        xml_path: Ruta al XML de salida de la consulta masiva.
+        conn: Conexión SQLite con permisos de escritura.
+        table: Tabla destino (se crea si no existe, con índice por referencia).
+        batch_size: Inmuebles por lote.
+        limit: Máximo de inmuebles (0 = sin límite).
+        replace: Si es True, vacía la tabla antes de cargar.
+        log_interval: Segundos entre mensajes de progreso.
+
+    Returns:
+        Métricas del parseo (``ParseProgress.summary``) más ``table``.
+    """
+    xml_path = Path(xml_path)
+    columns = list(CATASTRO_DTYPES)
+    column_defs = ", ".join(f"{column} {_SQLITE_TYPES[dtype]}" for column, dtype in CATASTRO_DTYPES.items())
+    with conn:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs})")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_referencia ON {table} (referencia_catastral)"
+        )
+        if replace:
+            conn.execute(f"DELETE FROM {table}")
+
+    insert_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    progress = ParseProgress(xml_path.stat().st_size, log_interval)
+    for batch in iter_catastro_batches(xml_path, batch_size=batch_size, limit=limit, progress=progress):
+        rows = batch.astype(object).where(batch.notna(), None).itertuples(index=False, name=None)
+        with conn:
+            conn.executemany(insert_sql, rows)
+
+    stats = progress.summary()
+    stats["table"] = table
+    logger.info("Catastro XML → %s: %s", table, progress.summary_line())
+    return stats
+
+
+__all__ = [
+    "CATASTRO_DTYPES",
+    "CATASTRO_TABLE",
+    "ParseProgress",
+    "export_catastro_xml",
+    "iter_catastro_batches",
+    "iter_catastro_records",
+    "load_catastro_xml_to_sqlite",
+    "records_to_frame",
+]
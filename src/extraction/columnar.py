@@ -0,0 +1,171 @@
+"""
+Copia columnar (Parquet) de los archivos raw tabulares.
+
+Los extractores guardan los datos raw en CSV; junto a cada CSV se puede escribir
+una copia Parquet (``<nombre>.parquet``) con esquema explícito para que el ETL
+no tenga que volver a inferir tipos en cada ejecución:
+
+- La copia se genera a partir del propio CSV releído con ``pd.read_csv``, de
+  modo que los tipos son exactamente los que vería el ETL leyendo el CSV.
+- Las columnas de texto de baja cardinalidad se guardan como categóricas con
+  categorías ordenadas (diccionario estable entre ejecuciones).
+- Los metadatos del archivo registran el tamaño del CSV de origen; la copia solo
+  se usa si coincide y no es más antigua que el CSV.
+
+La copia es opcional: se desactiva con ``RAW_PARQUET_MIRROR=0`` y cualquier error
+al escribirla se registra sin interrumpir la extracción.
+
+Uso típico:
+    from src.extraction.columnar import read_tabular
+
+    df = read_tabular(csv_path)  # Parquet si hay copia válida, CSV si no
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PARQUET_MIRROR_ENV = "RAW_PARQUET_MIRROR"
+PARQUET_METADATA_KEY = b"bcn_raw_mirror"
+
+# Columnas de texto con menos de este ratio de valores únicos se guardan como categóricas
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+try:  # pragma: no cover - depende del entorno
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - depende del entorno
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+
+def parquet_mirror_enabled() -> bool:
+    """Indica si se deben escribir copias Parquet (pyarrow disponible y no desactivado)."""
+    if not PYARROW_AVAILABLE:
+        return False
+    return os.environ.get(PARQUET_MIRROR_ENV, "1").strip().lower() not in {"0", "false", "no"}
+
+
+def mirror_path_for(path: Path) -> Path:
+    """Ruta de la copia Parquet de un archivo raw (mismo nombre, extensión ``.parquet``)."""
+    return Path(path).with_suffix(".parquet")
+
+
+def _stabilize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepara un DataFrame leído de CSV para guardarlo en Parquet.
+
+    Las columnas ``object`` de baja cardinalidad pasan a categóricas con categorías
+    ordenadas.
+
+    Raises:
+        ValueError: Si una columna mezcla texto con otros tipos (no se puede
+            representar en Parquet sin cambiar los valores que vería el ETL).
+    """
+    result = df.copy()
+    for column in result.columns:
+        series = result[column]
+        if series.dtype != object:
+            continue
+        non_null = series.dropna()
+        if not non_null.map(type).eq(str).all():
+            raise ValueError(f"columna con tipos mixtos: {column}")
+        n_unique = non_null.nunique()
+        if len(non_null) and n_unique / len(non_null) < CATEGORICAL_MAX_UNIQUE_RATIO:
+            categories = sorted(series.dropna().unique())
+            series = pd.Categorical(series, categories=categories)
+        result[column] = series
+    return result
+
+
+def write_parquet_mirror(csv_path: Path) -> Optional[Path]:
+    """
+    Escribe la copia Parquet de un CSV raw.
+
+    Args:
+        csv_path: Ruta al CSV ya guardado.
+
+    Returns:
+        Ruta de la copia Parquet o ``None`` si no se pudo (o no se debe) escribir.
+    """
+    if not parquet_mirror_enabled():
+        return None
+    csv_path = Path(csv_path)
+    target = mirror_path_for(csv_path)
+    try:
+        df = _stabilize_dtypes(pd.read_csv(csv_path))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[PARQUET_METADATA_KEY] = json.dumps(
+            {"source_file": csv_path.name, "source_size": csv_path.stat().st_size}
+        ).encode("utf-8")
+        tmp_path = target.with_suffix(".parquet.tmp")
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        tmp_path.replace(target)
+        logger.debug("Copia Parquet escrita: %s", target)
+        return target
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("No se pudo escribir la copia Parquet de %s: %s", csv_path.name, exc)
+        return None
+
+
+def find_parquet_mirror(csv_path: Path) -> Optional[Path]:
+    """
+    Devuelve la copia Parquet de un CSV si existe y corresponde a su contenido actual.
+
+    Args:
+        csv_path: Ruta al CSV raw.
+
+    Returns:
+        Ruta de la copia válida o ``None``.
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+    csv_path = Path(csv_path)
+    target = mirror_path_for(csv_path)
+    if not target.exists() or not csv_path.exists():
+        return None
+    csv_stat = csv_path.stat()
+    if target.stat().st_mtime_ns < csv_stat.st_mtime_ns:
+        return None
+    try:
+        metadata = pq.read_schema(target).metadata or {}
+        info = json.loads(metadata.get(PARQUET_METADATA_KEY, b"{}"))
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Copia Parquet ilegible %s: %s", target, exc)
+        return None
+    if info.get("source_size") != csv_stat.st_size:
+        return None
+    return target
+
+
+def read_tabular(path: Path, keep_categories: bool = False) -> pd.DataFrame:
+    """
+    Lee un archivo raw tabular usando la copia Parquet cuando es válida.
+
+    Args:
+        path: Ruta al CSV raw.
+        keep_categories: Si es False (por defecto) las columnas categóricas de la
+            copia se devuelven como ``object``, igual que con ``pd.read_csv``.
+
+    Returns:
+        DataFrame con el contenido del archivo.
+    """
+    mirror = find_parquet_mirror(path)
+    if mirror is None:
+        return pd.read_csv(path)
+    df = pd.read_parquet(mirror)
+    if not keep_categories:
+        for column in df.columns:
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype(object)
+    return df
@@ -3,16 +3,62 @@ OpenData BCN Extractor Module - Extracción de datos de Open Data Barcelona.
 """
 
 import io
+import json
+import os
 import re
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import chardet
 import pandas as pd
 
 from .base import BaseExtractor, logger
 
+# Descargas simultáneas por host en las descargas históricas
+DEFAULT_MAX_CONCURRENCY = 4
+
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_semaphore(url: str, limit: int) -> threading.BoundedSemaphore:
+    """
+    Semáforo compartido por proceso que limita las descargas simultáneas a un host.
+    
+    El límite lo fija la primera descarga que usa el host; así varias llamadas o
+    extractores concurrentes no multiplican las conexiones contra el mismo servidor.
+    """
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(max(1, limit))
+        return _host_semaphores[host]
+
+
+def _read_resource_file(path: Path, format_type: str) -> pd.DataFrame:
+    """
+    Parsea un recurso descargado a disco según su formato.
+    
+    Args:
+        path: Archivo descargado
+        format_type: Formato CKAN del recurso en minúsculas
+        
+    Returns:
+        DataFrame con el contenido del recurso
+    """
+    if 'csv' in format_type:
+        return pd.read_csv(path, encoding='utf-8')
+    if 'json' in format_type:
+        with open(path, 'r', encoding='utf-8') as f:
+            return pd.json_normalize(json.load(f))
+    if 'xlsx' in format_type or 'excel' in format_type:
+        return pd.read_excel(path)
+    raise ValueError(f"Formato {format_type} no soportado")
+
 
 class OpenDataBCNExtractor(BaseExtractor):
     """Extractor para datos de Open Data Barcelona."""
@@ -156,18 +202,19 @@ class OpenDataBCNExtractor(BaseExtractor):
             
             self._rate_limit()
             
-            # Descargar datos
-            response = self.session.get(download_url, timeout=60)
-            if not self._validate_response(response):
+            # Descargar datos (petición condicional + caché raw)
+            fetched = self._fetch_cached(download_url, timeout=60)
+            if fetched is None:
                 coverage_metadata["error"] = "Error en respuesta HTTP"
                 return None, coverage_metadata
+            coverage_metadata["unchanged"] = fetched.unchanged
+            raw_data = fetched.content
             
             # Parsear según formato
             format_type = resource.get('format', '').lower()
             
             if 'csv' in format_type:
                 # Detectar encoding del CSV (puede ser UTF-16, UTF-8, etc.)
-                raw_data = response.content
                 detected = chardet.detect(raw_data)
                 detected_encoding = detected.get('encoding', 'utf-8')
                 logger.debug(f"Encoding detectado para CSV: {detected_encoding} (confianza: {detected.get('confidence', 0):.2f})")
@@ -212,20 +259,20 @@ class OpenDataBCNExtractor(BaseExtractor):
                         logger.error(f"Error final leyendo CSV: {e}")
                         raise
             elif 'json' in format_type:
-                df = pd.json_normalize(response.json())
+                df = pd.json_normalize(json.loads(raw_data))
             elif 'xlsx' in format_type or 'excel' in format_type:
-                df = pd.read_excel(io.BytesIO(response.content))
+                df = pd.read_excel(io.BytesIO(raw_data))
             else:
                 logger.warning(f"Formato {format_type} no soportado, intentando CSV")
                 try:
                     df = pd.read_csv(
-                        io.StringIO(response.text),
+                        io.BytesIO(raw_data),
                         encoding='utf-8',
                         on_bad_lines='skip',
                         engine='python'
                     )
                 except TypeError:
-                    df = pd.read_csv(io.StringIO(response.text), encoding='utf-8')
+                    df = pd.read_csv(io.BytesIO(raw_data), encoding='utf-8')
             
             # Filtrar por años si se especifica
             original_count = len(df)
@@ -278,7 +325,8 @@ class OpenDataBCNExtractor(BaseExtractor):
         Descarga un dataset histórico descargando todos los recursos por año.
         
         Detecta recursos con años en el nombre (ej: '2023_atles_renda_bruta_llar.csv')
-        y los descarga todos para crear una serie temporal completa.
+        y los descarga todos para crear una serie temporal completa. Los recursos
+        se descargan en paralelo (ver ``download_datasets_historical``).
         
         Args:
             dataset_id: ID del dataset
@@ -289,83 +337,198 @@ class OpenDataBCNExtractor(BaseExtractor):
         Returns:
             Tupla con (DataFrame combinado con todos los años, metadata)
         """
-        logger.info(f"Descargando dataset histórico {dataset_id} ({year_start}-{year_end})...")
+        return self.download_datasets_historical(
+            [dataset_id], year_start, year_end, resource_format=resource_format
+        )[dataset_id]
+    
+    def download_datasets_historical(
+        self,
+        dataset_ids: List[str],
+        year_start: int,
+        year_end: int,
+        resource_format: str = 'csv',
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        parse_workers: Optional[int] = None
+    ) -> Dict[str, Tuple[Optional[pd.DataFrame], Dict[str, Any]]]:
+        """
+        Descarga en paralelo los recursos por año de varios datasets históricos.
         
-        coverage_metadata = {
-            "dataset_id": dataset_id,
-            "requested_range": {"start": year_start, "end": year_end},
-            "success": False,
-            "resources_downloaded": []
+        Todos los recursos de todos los datasets se descargan a la vez, con un
+        límite de conexiones simultáneas por host compartido por todo el proceso.
+        Los cuerpos de respuesta se escriben a la caché raw por bloques (sin mantener
+        ``response.text`` en memoria, con peticiones condicionales) y se parsean en un pool de workers a medida
+        que terminan. El resultado de cada dataset es independiente del orden de
+        finalización: los años se combinan en el orden de los recursos en CKAN.
+        
+        Args:
+            dataset_ids: IDs de los datasets
+            year_start: Año inicial
+            year_end: Año final
+            resource_format: Formato preferido ('csv', 'json', 'xlsx')
+            max_concurrency: Descargas simultáneas máximas por host
+            parse_workers: Hilos para parsear (None = min(4, nº de CPUs))
+            
+        Returns:
+            Diccionario dataset_id -> (DataFrame combinado o None, metadata)
+        """
+        dataset_ids = list(dict.fromkeys(dataset_ids))
+        requested_years = set(range(year_start, year_end + 1))
+        metadata = {
+            dataset_id: {
+                "dataset_id": dataset_id,
+                "requested_range": {"start": year_start, "end": year_end},
+                "success": False,
+                "resources_downloaded": []
+            }
+            for dataset_id in dataset_ids
         }
+        logger.info(
+            f"Descargando {len(dataset_ids)} datasets históricos ({year_start}-{year_end}), "
+            f"hasta {max_concurrency} descargas simultáneas por host..."
+        )
         
-        try:
-            dataset_info = self.get_dataset_info(dataset_id)
-            if not dataset_info:
-                logger.error(f"Dataset {dataset_id} no encontrado")
-                coverage_metadata["error"] = "Dataset no encontrado"
-                return None, coverage_metadata
+        frames: Dict[Tuple[str, int], Tuple[int, str, pd.DataFrame]] = {}
+        parse_workers = parse_workers or min(4, os.cpu_count() or 1)
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as download_pool, \
+                ThreadPoolExecutor(max_workers=parse_workers) as parse_pool:
+            # 1. Metadata CKAN (respeta el rate limit del extractor)
+            info_futures = {
+                download_pool.submit(self.get_dataset_info, dataset_id): dataset_id
+                for dataset_id in dataset_ids
+            }
+            download_futures = {}
+            for future in as_completed(info_futures):
+                dataset_id = info_futures[future]
+                try:
+                    dataset_info = future.result()
+                except Exception as e:
+                    dataset_info = None
+                    metadata[dataset_id]["error"] = str(e)
+                if not dataset_info:
+                    logger.error(f"Dataset {dataset_id} no encontrado")
+                    metadata[dataset_id].setdefault("error", "Dataset no encontrado")
+                    continue
+                
+                # 2. Descarga en streaming de cada recurso anual
+                selected = self._select_historical_resources(
+                    dataset_info.get('resources', []), resource_format, requested_years
+                )
+                for position, (resource, resource_year) in enumerate(selected):
+                    future = download_pool.submit(
+                        self._stream_resource, resource['url'], max_concurrency
+                    )
+                    download_futures[future] = (dataset_id, position, resource, resource_year)
             
-            resources = dataset_info.get('resources', [])
+            # 3. Parseo en el pool de workers según van terminando las descargas
+            parse_futures = {}
+            for future in as_completed(download_futures):
+                dataset_id, position, resource, resource_year = download_futures[future]
+                try:
+                    path = future.result()
+                except Exception as e:
+                    logger.warning(f"Error descargando recurso {resource.get('name', '')}: {e}")
+                    continue
+                parse_future = parse_pool.submit(
+                    _read_resource_file, path, resource.get('format', '').lower()
+                )
+                parse_futures[parse_future] = download_futures[future]
             
-            # Filtrar recursos que coincidan con el formato y tengan años en el nombre
-            import re
+            for future in as_completed(parse_futures):
+                dataset_id, position, resource, resource_year = parse_futures[future]
+                resource_name = resource.get('name', '')
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logger.warning(f"Error parseando recurso {resource_name}: {e}")
+                    continue
+                frames[(dataset_id, position)] = (resource_year, resource_name, df)
+        
+        results: Dict[str, Tuple[Optional[pd.DataFrame], Dict[str, Any]]] = {}
+        for dataset_id in dataset_ids:
+            parsed = [frames[key] for key in sorted(frames) if key[0] == dataset_id]
+            results[dataset_id] = self._combine_historical(
+                dataset_id, parsed, requested_years, metadata[dataset_id]
+            )
+        return results
+    
+    @staticmethod
+    def _select_historical_resources(
+        resources: List[Dict[str, Any]],
+        resource_format: str,
+        requested_years: set
+    ) -> List[Tuple[Dict[str, Any], int]]:
+        """Recursos del formato pedido con un año del rango en el nombre."""
+        selected = []
+        for resource in resources:
+            if resource_format.lower() not in resource.get('format', '').lower():
+                continue
+            if not resource.get('url'):
+                continue
+            year_match = re.search(r'(\d{4})', resource.get('name', ''))
+            if year_match and int(year_match.group(1)) in requested_years:
+                selected.append((resource, int(year_match.group(1))))
+        return selected
+    
+    def _stream_resource(self, url: str, max_concurrency: int) -> Path:
+        """
+        Descarga un recurso a la caché raw por bloques respetando el límite por host.
+        
+        Usa petición condicional: si el recurso no cambió se reutiliza el blob.
+        
+        Args:
+            url: URL del recurso
+            max_concurrency: Descargas simultáneas máximas por host
+            
+        Returns:
+            Path del blob descargado
+        """
+        with _host_semaphore(url, max_concurrency):
+            fetched = self._fetch_cached(url, timeout=60, suffix=Path(urlparse(url).path).suffix)
+        if fetched is None:
+            raise IOError(f"Error HTTP descargando {url}")
+        return fetched.path
+    
+    def _combine_historical(
+        self,
+        dataset_id: str,
+        parsed: List[Tuple[int, str, pd.DataFrame]],
+        requested_years: set,
+        coverage_metadata: Dict[str, Any]
+    ) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        """
+        Combina los recursos anuales de un dataset, calcula cobertura y guarda el raw.
+        
+        Args:
+            dataset_id: ID del dataset
+            parsed: Lista (año, nombre del recurso, DataFrame) en orden de recursos
+            requested_years: Años solicitados
+            coverage_metadata: Metadata del dataset (se actualiza)
+            
+        Returns:
+            Tupla con (DataFrame combinado con todos los años, metadata)
+        """
+        if "error" in coverage_metadata:
+            return None, coverage_metadata
+        
+        try:
             all_data = []
-            requested_years = set(range(year_start, year_end + 1))
             found_years = set()
-            
-            for resource in resources:
-                # Verificar formato
-                if resource_format.lower() not in resource.get('format', '').lower():
-                    continue
-                
-                # Buscar año en el nombre del recurso
-                resource_name = resource.get('name', '')
-                year_match = re.search(r'(\d{4})', resource_name)
+            for resource_year, resource_name, df in parsed:
+                # Añadir columna de año si no existe
+                year_cols = [col for col in df.columns 
+                           if any(kw in col.lower() for kw in ['any', 'año', 'year', 'anio'])]
+                if not year_cols:
+                    df['Any'] = resource_year
                 
-                if year_match:
-                    resource_year = int(year_match.group(1))
-                    
-                    # Si el año está en el rango solicitado
-                    if resource_year in requested_years:
-                        try:
-                            download_url = resource.get('url')
-                            if not download_url:
-                                continue
-                            
-                            self._rate_limit()
-                            response = self.session.get(download_url, timeout=60)
-                            
-                            if self._validate_response(response):
-                                # Parsear según formato
-                                format_type = resource.get('format', '').lower()
-                                
-                                if 'csv' in format_type:
-                                    df = pd.read_csv(io.StringIO(response.text), encoding='utf-8')
-                                elif 'json' in format_type:
-                                    df = pd.json_normalize(response.json())
-                                elif 'xlsx' in format_type or 'excel' in format_type:
-                                    df = pd.read_excel(io.BytesIO(response.content))
-                                else:
-                                    continue
-                                
-                                # Añadir columna de año si no existe
-                                year_cols = [col for col in df.columns 
-                                           if any(kw in col.lower() for kw in ['any', 'año', 'year', 'anio'])]
-                                if not year_cols:
-                                    df['Any'] = resource_year
-                                
-                                all_data.append(df)
-                                found_years.add(resource_year)
-                                coverage_metadata["resources_downloaded"].append({
-                                    "year": resource_year,
-                                    "name": resource_name,
-                                    "records": len(df)
-                                })
-                                
-                                logger.debug(f"  ✓ {resource_year}: {len(df)} registros")
-                        except Exception as e:
-                            logger.warning(f"Error descargando recurso {resource_name}: {e}")
-                            continue
+                all_data.append(df)
+                found_years.add(resource_year)
+                coverage_metadata["resources_downloaded"].append({
+                    "year": resource_year,
+                    "name": resource_name,
+                    "records": len(df)
+                })
+                logger.debug(f"  ✓ {resource_year}: {len(df)} registros")
             
             if not all_data:
                 logger.warning(f"No se encontraron recursos históricos para {dataset_id}")
@@ -392,10 +555,11 @@ class OpenDataBCNExtractor(BaseExtractor):
                 df_combined,
                 f"opendatabcn_{dataset_id}",
                 'csv',
-                year_start=year_start,
-                year_end=year_end
+                year_start=min(requested_years),
+                year_end=max(requested_years)
             )
             
+            coverage_metadata["success"] = True
             logger.info(f"Dataset histórico {dataset_id} descargado y guardado: {len(df_combined)} registros, años {sorted(found_years)}")
             return df_combined, coverage_metadata
             
@@ -637,11 +801,11 @@ class OpenDataBCNExtractor(BaseExtractor):
         self._rate_limit()
         
         try:
-            response = self.session.get(url, timeout=60)
-            if not self._validate_response(response):
+            fetched = self._fetch_cached(url, timeout=60)
+            if fetched is None:
                 return pd.DataFrame()
             
-            raw_data = response.content
+            raw_data = fetched.content
             
             # Detectar encoding si no se especifica
             if encoding is None:
@@ -342,27 +342,26 @@ def extract_all_sources(
                 "tourism_intensity"
             ]
             
-            for key in advanced_keys:
-                dataset_id = bcn_extractor.DATASETS.get(key)
-                if not dataset_id:
-                    continue
+            dataset_keys = {
+                key: bcn_extractor.DATASETS[key]
+                for key in advanced_keys
+                if bcn_extractor.DATASETS.get(key)
+            }
+            logger.info(f"Extrayendo {len(dataset_keys)} datasets avanzados en paralelo")
+            historical = bcn_extractor.download_datasets_historical(
+                list(dataset_keys.values()), year_start, year_end
+            )
+            
+            for key, dataset_id in dataset_keys.items():
+                df, metadata = historical[dataset_id]
+                results[f"opendatabcn_{key}"] = df if df is not None else pd.DataFrame()
+                coverage_metadata["coverage_by_source"][f"opendatabcn_{key}"] = metadata
                 
-                logger.info(f"Extrayendo dataset avanzado: {key} ({dataset_id})")
-                try:
-                    df, metadata = bcn_extractor.download_dataset_historical(
-                        dataset_id, year_start, year_end
-                    )
-                    results[f"opendatabcn_{key}"] = df if df is not None else pd.DataFrame()
-                    coverage_metadata["coverage_by_source"][f"opendatabcn_{key}"] = metadata
-                    
-                    if df is not None and not df.empty:
-                        coverage_metadata["sources_success"].append(f"opendatabcn_{key}")
-                    else:
-                        coverage_metadata["sources_failed"].append(f"opendatabcn_{key}")
-                except Exception as e:
-                    logger.error(f"Error extrayendo {key} de Open Data BCN: {e}")
-                    results[f"opendatabcn_{key}"] = pd.DataFrame()
-                    coverage_metadata["coverage_by_source"][f"opendatabcn_{key}"] = {"error": str(e)}
+                if df is not None and not df.empty:
+                    coverage_metadata["sources_success"].append(f"opendatabcn_{key}")
+                else:
+                    if "error" in metadata:
+                        logger.error(f"Error extrayendo {key} de Open Data BCN: {metadata['error']}")
                     coverage_metadata["sources_failed"].append(f"opendatabcn_{key}")
                     
         except Exception as e:
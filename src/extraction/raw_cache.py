@@ -0,0 +1,178 @@
+"""
+Caché direccionada por contenido de los archivos raw y validadores HTTP.
+
+Los extractores guardan cada descarga con un nombre con timestamp, de modo que
+``data/raw`` crecía con copias idénticas en cada ejecución programada. Este
+módulo guarda el contenido una sola vez por hash:
+
+- ``<raw>/_cache/blobs/<aa>/<sha256><ext>``: contenido, escrito una vez y de
+  forma atómica (archivo temporal + ``os.replace``); los archivos con nombre de
+  ``data/raw`` son enlaces duros al blob.
+- ``<raw>/_cache/http/<hash de la URL>.json``: ``ETag`` y ``Last-Modified`` de la
+  última respuesta y el blob que contenía, para enviar peticiones condicionales
+  (``If-None-Match`` / ``If-Modified-Since``) y reutilizar el blob ante un 304.
+
+Todo se escribe con reemplazos atómicos, así que varios extractores (o hilos)
+pueden compartir la caché sin bloqueos.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RAW_CACHE_DIRNAME = "_cache"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Hash sha256 (hex) de un contenido en memoria."""
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class CachedFetch:
+    """Resultado de una descarga a través de la caché."""
+
+    url: str
+    path: Path
+    sha256: str
+    status_code: int
+    unchanged: bool
+
+    @property
+    def content(self) -> bytes:
+        """Contenido descargado (leído del blob)."""
+        return self.path.read_bytes()
+
+
+class RawCache:
+    """Almacén de blobs por sha256 y validadores HTTP bajo un directorio raw."""
+
+    def __init__(self, raw_dir: Path):
+        """
+        Inicializa la caché.
+
+        Args:
+            raw_dir: Directorio raw de los extractores (la caché vive en ``_cache/``).
+        """
+        self.root = Path(raw_dir) / RAW_CACHE_DIRNAME
+        self.blobs_dir = self.root / "blobs"
+        self.http_dir = self.root / "http"
+
+    def blob_path(self, sha256: str, suffix: str = "") -> Path:
+        """Ruta del blob de un hash (exista o no)."""
+        return self.blobs_dir / sha256[:2] / f"{sha256}{suffix}"
+
+    def store_bytes(self, data: bytes, suffix: str = "") -> Tuple[str, Path, bool]:
+        """
+        Guarda un contenido en memoria.
+
+        Args:
+            data: Contenido.
+            suffix: Extensión del blob (ej. ``.csv``).
+
+        Returns:
+            Tupla (sha256, ruta del blob, True si el contenido es nuevo).
+        """
+        return self.store_chunks([data], suffix)
+
+    def store_chunks(self, chunks: Iterable[bytes], suffix: str = "") -> Tuple[str, Path, bool]:
+        """
+        Guarda un contenido por bloques (sin tenerlo entero en memoria).
+
+        El hash se calcula mientras se escribe a un temporal; si el blob ya
+        existía, el temporal se descarta.
+
+        Args:
+            chunks: Bloques de bytes (ej. ``response.iter_content()``).
+            suffix: Extensión del blob.
+
+        Returns:
+            Tupla (sha256, ruta del blob, True si el contenido es nuevo).
+        """
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.blobs_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                for chunk in chunks:
+                    if chunk:
+                        digest.update(chunk)
+                        handle.write(chunk)
+            sha256 = digest.hexdigest()
+            blob = self.blob_path(sha256, suffix)
+            if blob.exists():
+                return sha256, blob, False
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, blob)
+            return sha256, blob, True
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+
+    @staticmethod
+    def link(blob: Path, dest: Path) -> None:
+        """Enlaza (o copia si no se puede) un blob a una ruta con nombre."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(blob, dest)
+        except OSError:
+            shutil.copy2(blob, dest)
+
+    def _validators_path(self, url: str) -> Path:
+        return self.http_dir / f"{sha256_bytes(url.encode('utf-8'))[:32]}.json"
+
+    def get_validators(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Validadores guardados de una URL cuyo blob sigue en disco.
+
+        Args:
+            url: URL completa (con query string).
+
+        Returns:
+            Diccionario con ``etag``, ``last_modified``, ``sha256`` y ``suffix``, o None.
+        """
+        path = self._validators_path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                validators = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not self.blob_path(validators.get("sha256", ""), validators.get("suffix", "")).exists():
+            return None
+        return validators
+
+    def set_validators(
+        self,
+        url: str,
+        sha256: str,
+        suffix: str = "",
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Guarda los validadores HTTP de una URL y el blob de su última respuesta."""
+        self.http_dir.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "url": url,
+            "sha256": sha256,
+            "suffix": suffix,
+            "etag": etag if isinstance(etag, str) else None,
+            "last_modified": last_modified if isinstance(last_modified, str) else None,
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=self.http_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False)
+        os.replace(tmp_name, self._validators_path(url))
+
+
+__all__ = ["RAW_CACHE_DIRNAME", "CachedFetch", "RawCache", "sha256_bytes"]
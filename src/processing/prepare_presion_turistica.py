@@ -11,12 +11,132 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, List, Optional
 
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Filas por bloque al leer calendar/reviews en modo streaming
+AIRBNB_CHUNKSIZE = 500_000
+
+_GROUP_COLS = ["barrio_id", "anio", "mes"]
+
+
+def _find_airbnb_files(raw_data_path: Path, kind: str) -> List[Path]:
+    """
+    Localiza los CSV (opcionalmente ``.gz``) de Inside Airbnb de un tipo.
+
+    Args:
+        raw_data_path: Directorio base donde se encuentran los datos raw.
+        kind: Tipo de archivo (``listings``, ``calendar`` o ``reviews``).
+
+    Returns:
+        Lista de rutas encontradas en los directorios de Airbnb conocidos.
+    """
+    search_paths = [
+        raw_data_path / "airbnb",
+        raw_data_path / "insideairbnb",
+        raw_data_path.parent / "airbnb",
+        raw_data_path.parent / "insideairbnb",
+    ]
+    files: List[Path] = []
+    for search_path in search_paths:
+        if search_path.exists():
+            files.extend(search_path.glob(f"*{kind}*.csv*"))
+    return files
+
+
+def _iter_airbnb_chunks(
+    paths: List[Path],
+    columns: List[str],
+    chunksize: int,
+    dtype: Optional[dict] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee archivos de Inside Airbnb por bloques, solo con las columnas indicadas.
+
+    Los archivos sin ``listing_id`` o ilegibles se registran y se omiten.
+    """
+    for path in paths:
+        try:
+            header = pd.read_csv(path, nrows=0).columns
+            if "listing_id" not in header:
+                logger.warning("Archivo %s sin columna listing_id, se omite", path.name)
+                continue
+            usecols = [col for col in columns if col in header]
+            logger.info("Procesando por bloques: %s", path)
+            reader = pd.read_csv(
+                path,
+                usecols=usecols,
+                dtype={k: v for k, v in (dtype or {}).items() if k in usecols},
+                chunksize=chunksize,
+            )
+            for chunk in reader:
+                yield chunk
+        except Exception as exc:
+            logger.warning("Error leyendo %s: %s", path, exc)
+
+
+def _add_period(frame: pd.DataFrame, listing_barrio: pd.Series) -> pd.DataFrame:
+    """Añade barrio_id (vía listing_id), anio y mes, y descarta filas sin barrio."""
+    dates = pd.to_datetime(frame["date"], errors="coerce", format="ISO8601")
+    result = pd.DataFrame(
+        {
+            "barrio_id": frame["listing_id"].map(listing_barrio),
+            "anio": dates.dt.year,
+            "mes": dates.dt.month,
+        },
+        index=frame.index,
+    )
+    return result[result["barrio_id"].notna()]
+
+
+def _occupancy_partial(frame: pd.DataFrame, listing_barrio: pd.Series) -> pd.DataFrame:
+    """Agregado parcial de ocupación: días ocupados y días totales por barrio/mes."""
+    keyed = _add_period(frame, listing_barrio)
+    available = frame.loc[keyed.index, "available"]
+    keyed["dias_ocupados"] = (available.astype(str).str.lower() == "f").astype("int64")
+    keyed["dias_totales"] = 1
+    return keyed.groupby(_GROUP_COLS, as_index=False)[["dias_ocupados", "dias_totales"]].sum()
+
+
+def _reviews_partial(frame: pd.DataFrame, listing_barrio: pd.Series) -> pd.DataFrame:
+    """Agregado parcial de reviews por barrio/mes."""
+    keyed = _add_period(frame, listing_barrio)
+    counts = keyed.groupby(_GROUP_COLS, as_index=False).size()
+    return counts.rename(columns={"size": "num_reviews_mes"})
+
+
+def _fold_partials(
+    frames: Iterator[pd.DataFrame],
+    partial: Callable[[pd.DataFrame, pd.Series], pd.DataFrame],
+    listing_barrio: pd.Series,
+) -> Optional[pd.DataFrame]:
+    """Combina agregados parciales bloque a bloque (memoria acotada por el tamaño del agregado)."""
+    accumulated: Optional[pd.DataFrame] = None
+    for frame in frames:
+        part = partial(frame, listing_barrio)
+        if accumulated is None:
+            accumulated = part
+        elif not part.empty:
+            accumulated = (
+                pd.concat([accumulated, part], ignore_index=True)
+                .groupby(_GROUP_COLS, as_index=False)
+                .sum()
+            )
+    return accumulated
+
+
+def _merge_partial(result: pd.DataFrame, partial: pd.DataFrame) -> pd.DataFrame:
+    """Une un agregado por barrio/año/mes al resultado de listings."""
+    result = result.copy()
+    partial = partial.copy()
+    for col in _GROUP_COLS:
+        result[col] = result[col].astype("float64")
+        partial[col] = partial[col].astype("float64")
+    return result.merge(partial, on=_GROUP_COLS, how="left")
+
 
 def _load_airbnb_listings(raw_data_path: Path) -> pd.DataFrame:
     """
@@ -84,33 +204,15 @@ def _load_airbnb_calendar(raw_data_path: Path) -> pd.DataFrame:
     Returns:
         DataFrame con datos de calendar de Airbnb.
     """
-    search_paths = [
-        raw_data_path / "airbnb",
-        raw_data_path / "insideairbnb",
-        raw_data_path.parent / "airbnb",
-        raw_data_path.parent / "insideairbnb",
-    ]
-    
     frames = []
-    for search_path in search_paths:
-        if not search_path.exists():
-            continue
-        
-        csv_files = list(search_path.glob("*calendar*.csv*"))
-        
-        for path in csv_files:
-            try:
-                logger.info("Cargando calendar desde: %s", path)
-                if path.suffix == ".gz":
-                    import gzip
-                    df = pd.read_csv(path, compression="gzip", low_memory=False)
-                else:
-                    df = pd.read_csv(path, low_memory=False)
-                
-                logger.info("Calendar cargado: %s registros", len(df))
-                frames.append(df)
-            except Exception as exc:
-                logger.warning("Error leyendo calendar CSV %s: %s", path, exc)
+    for path in _find_airbnb_files(raw_data_path, "calendar"):
+        try:
+            logger.info("Cargando calendar desde: %s", path)
+            df = pd.read_csv(path, low_memory=False)
+            logger.info("Calendar cargado: %s registros", len(df))
+            frames.append(df)
+        except Exception as exc:
+            logger.warning("Error leyendo calendar CSV %s: %s", path, exc)
     
     if not frames:
         logger.warning("No se pudieron cargar archivos de calendar de Airbnb")
@@ -134,33 +236,15 @@ def _load_airbnb_reviews(raw_data_path: Path) -> pd.DataFrame:
     Returns:
         DataFrame con datos de reviews de Airbnb.
     """
-    search_paths = [
-        raw_data_path / "airbnb",
-        raw_data_path / "insideairbnb",
-        raw_data_path.parent / "airbnb",
-        raw_data_path.parent / "insideairbnb",
-    ]
-    
     frames = []
-    for search_path in search_paths:
-        if not search_path.exists():
-            continue
-        
-        csv_files = list(search_path.glob("*reviews*.csv*"))
-        
-        for path in csv_files:
-            try:
-                logger.info("Cargando reviews desde: %s", path)
-                if path.suffix == ".gz":
-                    import gzip
-                    df = pd.read_csv(path, compression="gzip", low_memory=False)
-                else:
-                    df = pd.read_csv(path, low_memory=False)
-                
-                logger.info("Reviews cargados: %s registros", len(df))
-                frames.append(df)
-            except Exception as exc:
-                logger.warning("Error leyendo reviews CSV %s: %s", path, exc)
+    for path in _find_airbnb_files(raw_data_path, "reviews"):
+        try:
+            logger.info("Cargando reviews desde: %s", path)
+            df = pd.read_csv(path, low_memory=False)
+            logger.info("Reviews cargados: %s registros", len(df))
+            frames.append(df)
+        except Exception as exc:
+            logger.warning("Error leyendo reviews CSV %s: %s", path, exc)
     
     if not frames:
         logger.warning("No se pudieron cargar archivos de reviews de Airbnb")
@@ -222,8 +306,9 @@ def _map_listings_to_barrios_geocoding(
     """
     Mapea listings a barrios usando geocodificación con geometrías.
     
-    Usa las coordenadas (latitude, longitude) de los listings y las geometrías
-    de dim_barrios para determinar en qué barrio está cada listing.
+    Usa las coordenadas (latitude, longitude) de los listings y el índice
+    espacial compartido de ``src.transform.geometry`` (geometrías de dim_barrios
+    parseadas una vez) para determinar en qué barrio está cada listing.
     
     Args:
         listings_df: DataFrame con listings de Airbnb (debe tener 'latitude', 'longitude').
@@ -232,17 +317,8 @@ def _map_listings_to_barrios_geocoding(
     Returns:
         Series con barrio_id para cada listing (None si no se puede mapear).
     """
-    try:
-        import json
-        from shapely.geometry import shape, Point
-        import geopandas as gpd
-    except ImportError:
-        logger.warning(
-            "shapely o geopandas no están instalados. "
-            "Usando mapeo por nombre de neighbourhood en lugar de geocodificación."
-        )
-        return pd.Series([None] * len(listings_df), index=listings_df.index)
-    
+    from src.transform.geometry import get_barrio_geometry_index
+
     # Verificar que tenemos las columnas necesarias
     if "latitude" not in listings_df.columns or "longitude" not in listings_df.columns:
         logger.warning("Listings no tienen columnas latitude/longitude, usando mapeo por nombre")
@@ -252,69 +328,14 @@ def _map_listings_to_barrios_geocoding(
         logger.warning("Barrios no tienen geometry_json, usando mapeo por nombre")
         return pd.Series([None] * len(listings_df), index=listings_df.index)
     
-    # Filtrar barrios con geometrías válidas
-    barrios_with_geom = barrios_df[
-        barrios_df["geometry_json"].notna()
-    ].copy()
+    # Índice espacial compartido (geometrías parseadas una vez por dimensión)
+    geometry_index = get_barrio_geometry_index(barrios_df)
     
-    if barrios_with_geom.empty:
+    if not len(geometry_index):
         logger.warning("No hay barrios con geometrías válidas, usando mapeo por nombre")
         return pd.Series([None] * len(listings_df), index=listings_df.index)
     
-    # Crear GeoDataFrame de barrios
-    geometries = []
-    barrio_ids = []
-    
-    for _, row in barrios_with_geom.iterrows():
-        try:
-            geom_json = json.loads(row["geometry_json"])
-            geom = shape(geom_json)  # Convertir GeoJSON a Shapely geometry
-            geometries.append(geom)
-            barrio_ids.append(row["barrio_id"])
-        except Exception as e:
-            logger.debug("Error parseando geometría para barrio %s: %s", row["barrio_id"], e)
-            continue
-    
-    if not geometries:
-        logger.warning("No se pudieron parsear geometrías, usando mapeo por nombre")
-        return pd.Series([None] * len(listings_df), index=listings_df.index)
-    
-    barrios_gdf = gpd.GeoDataFrame(
-        {"barrio_id": barrio_ids},
-        geometry=geometries,
-        crs="EPSG:4326"
-    )
-    
-    # Crear GeoDataFrame de listings
-    listings_with_coords = listings_df[
-        listings_df["latitude"].notna() &
-        listings_df["longitude"].notna()
-    ].copy()
-    
-    if listings_with_coords.empty:
-        logger.warning("No hay listings con coordenadas válidas")
-        return pd.Series([None] * len(listings_df), index=listings_df.index)
-    
-    listings_points = gpd.GeoDataFrame(
-        listings_with_coords[["id"]],
-        geometry=gpd.points_from_xy(
-            listings_with_coords["longitude"],
-            listings_with_coords["latitude"]
-        ),
-        crs="EPSG:4326"
-    )
-    
-    # Spatial join: encontrar en qué barrio está cada punto
-    joined = gpd.sjoin(
-        listings_points,
-        barrios_gdf,
-        how="left",
-        predicate="within"
-    )
-    
-    # Crear serie de resultados
-    result = pd.Series([None] * len(listings_df), index=listings_df.index, dtype="Int64")
-    result.loc[joined.index] = joined["barrio_id"].values
+    result = geometry_index.assign_points(listings_df["longitude"], listings_df["latitude"])
     
     mapped_count = result.notna().sum()
     logger.info(
@@ -329,7 +350,8 @@ def _map_listings_to_barrios_geocoding(
 
 def prepare_presion_turistica(
     raw_data_path: Path,
-    barrios_df: pd.DataFrame
+    barrios_df: pd.DataFrame,
+    chunksize: Optional[int] = AIRBNB_CHUNKSIZE,
 ) -> pd.DataFrame:
     """
     Prepara tabla fact_presion_turistica desde datos brutos de Inside Airbnb.
@@ -338,6 +360,8 @@ def prepare_presion_turistica(
         raw_data_path: Directorio base donde se encuentran los datos raw de Airbnb.
         barrios_df: DataFrame con dimensión de barrios (debe incluir barrio_id,
             barrio_nombre_normalizado).
+        chunksize: Filas por bloque al leer calendar y reviews (modo streaming,
+            memoria acotada). ``None`` carga cada archivo completo.
     
     Returns:
         DataFrame con columnas:
@@ -506,64 +530,45 @@ def prepare_presion_turistica(
     else:
         result["pct_entire_home"] = None
     
-    # 5. Cargar calendar para calcular tasa_ocupacion
-    calendar_df = _load_airbnb_calendar(raw_data_path)
-    
-    if not calendar_df.empty and "listing_id" in calendar_df.columns:
-        # Calendar típicamente tiene: listing_id, date, available, price
-        calendar_df["date"] = pd.to_datetime(calendar_df["date"], errors="coerce")
-        calendar_df["anio"] = calendar_df["date"].dt.year
-        calendar_df["mes"] = calendar_df["date"].dt.month
-        
-        # Mapear listing_id a barrio_id
-        listings_map = listings_df.set_index("id")["barrio_id"].to_dict()
-        calendar_df["barrio_id"] = calendar_df["listing_id"].map(listings_map)
-        calendar_df = calendar_df[calendar_df["barrio_id"].notna()].copy()
-        
-        # Calcular tasa de ocupación (días no disponibles / días totales)
-        if "available" in calendar_df.columns:
-            calendar_df["is_occupied"] = (
-                calendar_df["available"].str.lower() == "f"  # 'f' = false = ocupado
-            )
-            
-            ocupacion = calendar_df.groupby(groupby_cols, as_index=False).agg({
-                "is_occupied": "mean"
-            })
-            ocupacion = ocupacion.rename(columns={"is_occupied": "tasa_ocupacion"})
-            
-            # Merge con result
-            result = result.merge(
-                ocupacion,
-                on=groupby_cols,
-                how="left"
-            )
-        else:
-            result["tasa_ocupacion"] = None
+    # 5-6. Ocupación (calendar) y reviews, agregadas por barrio/año/mes.
+    # En modo streaming los archivos se leen por bloques con solo las columnas
+    # necesarias y los agregados parciales se combinan incrementalmente.
+    listing_barrio = (
+        listings_df.drop_duplicates("id", keep="last")
+        .set_index("id")["barrio_id"]
+        .astype("float64")
+    )
+    if chunksize:
+        calendar_frames = _iter_airbnb_chunks(
+            _find_airbnb_files(raw_data_path, "calendar"),
+            columns=["listing_id", "date", "available"],
+            chunksize=chunksize,
+            dtype={"available": "category"},
+        )
+        reviews_frames = _iter_airbnb_chunks(
+            _find_airbnb_files(raw_data_path, "reviews"),
+            columns=["listing_id", "date"],
+            chunksize=chunksize,
+        )
     else:
-        result["tasa_ocupacion"] = None
-    
-    # 6. Cargar reviews para calcular num_reviews_mes
-    reviews_df = _load_airbnb_reviews(raw_data_path)
-    
-    if not reviews_df.empty and "listing_id" in reviews_df.columns:
-        reviews_df["date"] = pd.to_datetime(reviews_df["date"], errors="coerce")
-        reviews_df["anio"] = reviews_df["date"].dt.year
-        reviews_df["mes"] = reviews_df["date"].dt.month
-        
-        # Mapear listing_id a barrio_id
-        reviews_df["barrio_id"] = reviews_df["listing_id"].map(listings_map)
-        reviews_df = reviews_df[reviews_df["barrio_id"].notna()].copy()
-        
-        # Contar reviews por barrio, año y mes
-        reviews_count = reviews_df.groupby(groupby_cols, as_index=False).size()
-        reviews_count = reviews_count.rename(columns={"size": "num_reviews_mes"})
-        
-        # Merge con result
-        result = result.merge(
-            reviews_count,
-            on=groupby_cols,
-            how="left"
+        calendar_df = _load_airbnb_calendar(raw_data_path)
+        calendar_frames = iter([calendar_df] if "listing_id" in calendar_df.columns else [])
+        reviews_df = _load_airbnb_reviews(raw_data_path)
+        reviews_frames = iter([reviews_df] if "listing_id" in reviews_df.columns else [])
+
+    calendar_frames = (frame for frame in calendar_frames if "available" in frame.columns)
+    ocupacion = _fold_partials(calendar_frames, _occupancy_partial, listing_barrio)
+    if ocupacion is not None:
+        ocupacion["tasa_ocupacion"] = ocupacion["dias_ocupados"] / ocupacion["dias_totales"]
+        result = _merge_partial(
+            result, ocupacion.drop(columns=["dias_ocupados", "dias_totales"])
         )
+    else:
+        result["tasa_ocupacion"] = None
+
+    reviews_count = _fold_partials(reviews_frames, _reviews_partial, listing_barrio)
+    if reviews_count is not None:
+        result = _merge_partial(result, reviews_count)
     else:
         result["num_reviews_mes"] = None
     
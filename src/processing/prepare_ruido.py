@@ -10,9 +10,11 @@ Fuentes:
 from __future__ import annotations
 
 import logging
+import re
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -146,84 +148,128 @@ def _map_barrio_from_ruido_data(
     return merged
 
 
+# Tokens de nombre de archivo/banda que identifican cada indicador del MER
+_RASTER_INDICATORS = {
+    "lden": "nivel_lden_medio",
+    "ld": "nivel_ld_dia",
+    "lday": "nivel_ld_dia",
+    "dia": "nivel_ld_dia",
+    "day": "nivel_ld_dia",
+    "ln": "nivel_ln_noche",
+    "lnight": "nivel_ln_noche",
+    "noche": "nivel_ln_noche",
+    "nit": "nivel_ln_noche",
+    "night": "nivel_ln_noche",
+}
+RASTER_LEVEL_COLUMNS = ["nivel_lden_medio", "nivel_ld_dia", "nivel_ln_noche"]
+# Porcentaje del área del barrio con Lden > 65 dB(A) según el ráster
+RASTER_AREA_65_COLUMN = "pct_area_65db"
+
+
+def _raster_indicator(name: Optional[str]) -> Optional[str]:
+    """Columna de nivel (Lden/Ld/Ln) a la que corresponde un archivo o banda."""
+    if not name:
+        return None
+    for token in re.split(r"[^a-z0-9]+", name.lower()):
+        indicator = _RASTER_INDICATORS.get(token.rstrip("0123456789"))
+        if indicator:
+            return indicator
+    return None
+
+
+def _raster_year(name: str) -> Optional[int]:
+    """Año contenido en el nombre del ráster (p. ej. ``MER_2017_Lden.tif``)."""
+    match = re.search(r"(?<!\d)((?:19|20)\d{2})(?!\d)", name)
+    return int(match.group(1)) if match else None
+
+
 def _calculate_ruido_from_raster(
-    raster_path: Path,
-    barrios_gdf
+    raster_paths: List[Path],
+    geometry_index,
 ) -> Optional[pd.DataFrame]:
     """
-    Calcula niveles de ruido por barrio a partir de un mapa ráster.
+    Calcula niveles de ruido por barrio y año a partir de mapas ráster.
     
-    Esta función requiere rasterio y geopandas. Si no están disponibles,
-    retorna None y se usará el fallback de datos CSV.
+    Usa el motor de estadísticas zonales de ``zonal_stats``: los barrios se
+    rasterizan una vez en una malla de etiquetas compartida por todos los
+    rásteres con la misma malla y cada archivo se lee por bloques, calculando
+    todas sus bandas en una sola pasada.
+    
+    El indicador de cada banda (Lden, Ld, Ln) se deduce de la descripción de la
+    banda o del nombre del archivo, y el año del nombre del archivo. Las bandas
+    sin indicador reconocible se tratan como Lden.
+    
+    Esta función requiere rasterio. Si no está disponible, retorna None y se
+    usará el fallback de datos CSV.
     
     Args:
-        raster_path: Ruta al archivo ráster (GeoTIFF).
-        barrios_gdf: GeoDataFrame con geometrías de barrios.
+        raster_paths: Rutas a los archivos ráster (GeoTIFF).
+        geometry_index: ``BarrioGeometryIndex`` con las geometrías de barrios.
     
     Returns:
-        DataFrame con niveles de ruido por barrio, o None si no se puede procesar.
+        DataFrame con ``barrio_id``, ``anio``, niveles medios y
+        ``pct_area_65db`` (área con Lden > 65 dB), o None si no se puede procesar.
     """
     try:
         import rasterio
-        from rasterio.mask import mask
-        import geopandas as gpd
-        import numpy as np
     except ImportError:
         logger.warning(
-            "rasterio/geopandas no disponibles. No se puede procesar ráster. "
+            "rasterio no disponible. No se puede procesar ráster. "
             "Usando datos CSV como fallback."
         )
         return None
     
-    try:
-        logger.info("Procesando ráster de ruido: %s", raster_path)
+    from src.processing.zonal_stats import threshold_column, zonal_statistics_raster
+    
+    frames = []
+    for raster_path in raster_paths:
+        try:
+            logger.info("Procesando ráster de ruido: %s", raster_path)
+            with rasterio.open(raster_path) as src:
+                descriptions = list(src.descriptions)
+            stats_by_band = zonal_statistics_raster(raster_path, geometry_index)
+        except Exception as e:
+            logger.warning("Error procesando ráster %s: %s", raster_path.name, e)
+            continue
         
-        with rasterio.open(raster_path) as src:
-            # Leer el ráster completo
-            data = src.read(1)  # Leer primera banda
-            
-            # Crear máscara para cada barrio
-            results = []
-            
-            for idx, barrio in barrios_gdf.iterrows():
-                barrio_id = barrio["barrio_id"]
-                geometry = barrio["geometry"]
-                
-                try:
-                    # Extraer valores del ráster dentro de la geometría del barrio
-                    out_image, out_transform = mask(src, [geometry], crop=True)
-                    values = out_image[0]
-                    
-                    # Filtrar valores válidos (no nodata)
-                    valid_values = values[values != src.nodata]
-                    
-                    if len(valid_values) > 0:
-                        # Calcular estadísticas
-                        nivel_medio = float(np.mean(valid_values))
-                        nivel_max = float(np.max(valid_values))
-                        nivel_min = float(np.min(valid_values))
-                        
-                        results.append({
-                            "barrio_id": barrio_id,
-                            "nivel_lden_medio": nivel_medio,
-                            "nivel_ld_dia": nivel_medio,  # Aproximación si no hay bandas separadas
-                            "nivel_ln_noche": nivel_medio,  # Aproximación
-                        })
-                
-                except Exception as e:
-                    logger.debug("Error procesando barrio %s: %s", barrio_id, e)
-                    continue
-            
-            if results:
-                df = pd.DataFrame(results)
-                logger.info("✓ Ráster procesado: %s barrios", len(df))
-                return df
-            
-    except Exception as e:
-        logger.warning("Error procesando ráster: %s", e)
+        anio = _raster_year(raster_path.stem)
+        file_indicator = _raster_indicator(raster_path.stem)
+        for band, stats in stats_by_band.items():
+            if stats.empty:
+                continue
+            indicator = (
+                _raster_indicator(descriptions[band - 1])
+                or file_indicator
+                or "nivel_lden_medio"
+            )
+            frame = pd.DataFrame({"barrio_id": stats["barrio_id"], "anio": anio})
+            frame[indicator] = stats["media"].to_numpy()
+            if indicator == "nivel_lden_medio":
+                frame[RASTER_AREA_65_COLUMN] = stats[threshold_column(65.0)].to_numpy()
+            frames.append(frame)
+    
+    if not frames:
         return None
     
-    return None
+    combined = pd.concat(frames, ignore_index=True)
+    for column in RASTER_LEVEL_COLUMNS + [RASTER_AREA_65_COLUMN]:
+        if column not in combined.columns:
+            combined[column] = np.nan
+    if combined["anio"].isna().all():
+        combined = combined.drop(columns=["anio"])
+        result = combined.groupby("barrio_id", as_index=False).mean()
+    else:
+        result = combined.groupby(["barrio_id", "anio"], as_index=False).mean()
+    
+    # Aproximación si no hay bandas separadas de día/noche
+    for column in ["nivel_ld_dia", "nivel_ln_noche"]:
+        result[column] = result[column].fillna(result["nivel_lden_medio"])
+    
+    logger.info(
+        "✓ Ráster procesado: %s barrios, %s archivos", result["barrio_id"].nunique(),
+        len(raster_paths),
+    )
+    return result
 
 
 def prepare_ruido(
@@ -275,27 +321,15 @@ def prepare_ruido(
     
     raster_results = []
     if raster_files and "geometry_json" in barrios_df.columns:
-        try:
-            import geopandas as gpd
-            from shapely import wkt
-            
-            # Crear GeoDataFrame de barrios
-            barrios_gdf = barrios_df.copy()
-            barrios_gdf["geometry"] = barrios_gdf["geometry_json"].apply(
-                lambda x: wkt.loads(x) if x and pd.notna(x) else None
-            )
-            barrios_gdf = barrios_gdf[barrios_gdf["geometry"].notna()]
-            barrios_gdf = gpd.GeoDataFrame(barrios_gdf, geometry="geometry")
-            
-            for raster_file in raster_files[:1]:  # Procesar solo el primero por ahora
-                raster_df = _calculate_ruido_from_raster(raster_file, barrios_gdf)
-                if raster_df is not None:
-                    raster_results.append(raster_df)
+        from src.transform.geometry import get_barrio_geometry_index
         
-        except ImportError:
-            logger.info("geopandas/shapely no disponibles, omitiendo procesamiento de rásteres")
-        except Exception as e:
-            logger.warning("Error preparando GeoDataFrame para rásteres: %s", e)
+        geometry_index = get_barrio_geometry_index(barrios_df)
+        if len(geometry_index):
+            raster_df = _calculate_ruido_from_raster(sorted(raster_files), geometry_index)
+            if raster_df is not None:
+                raster_results.append(raster_df)
+        else:
+            logger.info("Barrios sin geometrías válidas, omitiendo procesamiento de rásteres")
     
     # 3. Si hay datos CSV, usarlos
     if not df.empty:
@@ -310,9 +344,14 @@ def prepare_ruido(
             df = df_raster
         else:
             # Merge: priorizar CSV si hay ambos
+            merge_keys = ["barrio_id"]
+            if "anio" in df.columns and "anio" in df_raster.columns:
+                merge_keys.append("anio")
+            else:
+                df_raster = df_raster.drop(columns=["anio"], errors="ignore")
             df = df.merge(
                 df_raster,
-                on="barrio_id",
+                on=merge_keys,
                 how="left",
                 suffixes=("", "_raster")
             )
@@ -395,6 +434,14 @@ def prepare_ruido(
         logger.info("No hay datos de población, pct_poblacion_expuesta_65db será None")
         df["pct_poblacion_expuesta_65db"] = None
     
+    # Con ráster, el área del barrio con Lden > 65 dB sustituye a la regla binaria
+    if RASTER_AREA_65_COLUMN in df.columns:
+        area_pct = pd.to_numeric(df[RASTER_AREA_65_COLUMN], errors="coerce")
+        df["pct_poblacion_expuesta_65db"] = area_pct.where(
+            area_pct.notna(), df["pct_poblacion_expuesta_65db"]
+        )
+        df = df.drop(columns=[RASTER_AREA_65_COLUMN])
+    
     # 8. Agregar por barrio y año (por si hay múltiples registros)
     groupby_cols = ["barrio_id", "anio"]
     agg_dict = {
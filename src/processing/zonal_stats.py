@@ -0,0 +1,335 @@
+"""
+Estadísticas zonales por barrio sobre rásteres (mapas de ruido).
+
+En lugar de recortar el ráster una vez por barrio, el cálculo se hace en una
+sola pasada:
+
+1. Los polígonos de los barrios se rasterizan una vez en una malla de
+   etiquetas alineada con el ráster (0 = fuera de la ciudad, ``k + 1`` = barrio
+   en la posición ``k`` del índice de geometrías). Un píxel pertenece al barrio
+   que contiene su centro, igual que ``rasterio.features.rasterize`` por defecto.
+   La malla se cachea por transformación, tamaño y CRS, de modo que todas las
+   bandas y años de un mismo MER la comparten.
+2. El ráster se lee por bloques de filas (memoria acotada) y cada bloque se
+   reduce con ``numpy.bincount``: número de píxeles, suma, píxeles por encima
+   de cada umbral e histograma por barrio (resolución ``HIST_STEP_DB``) para los
+   percentiles. Mínimo y máximo se acumulan con ``np.minimum.at``/``np.maximum.at``.
+
+Los percentiles (por rango, como ``np.percentile(method="inverted_cdf")``) se
+obtienen del histograma acumulado con una precisión de ``HIST_STEP_DB`` dB,
+suficiente para niveles de ruido.
+
+Uso típico:
+    from src.processing.zonal_stats import zonal_statistics_raster
+
+    stats = zonal_statistics_raster(tif_path, get_barrio_geometry_index(dim_barrios))
+    stats[1]  # DataFrame por barrio de la banda 1
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILES: Tuple[float, ...] = (10.0, 50.0, 90.0)
+DEFAULT_THRESHOLDS_DB: Tuple[float, ...] = (65.0,)
+DEFAULT_BLOCK_ROWS = 512
+
+# Histograma de niveles sonoros para percentiles: [0, 150) dB en pasos de 0,1 dB
+HIST_MIN_DB = 0.0
+HIST_MAX_DB = 150.0
+HIST_STEP_DB = 0.1
+
+# Convierte coordenadas del ráster a lon/lat (EPSG:4326)
+CoordTransform = Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+_LABEL_CACHE: Dict[Tuple, np.ndarray] = {}
+
+
+def threshold_column(threshold: float) -> str:
+    """Nombre de la columna de área por encima de un umbral (``pct_area_above_65db``)."""
+    return f"pct_area_above_{threshold:g}db".replace(".", "_")
+
+
+def rasterize_labels(
+    geometry_index,
+    transform: Sequence[float],
+    shape: Tuple[int, int],
+    to_lonlat: Optional[CoordTransform] = None,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+) -> np.ndarray:
+    """
+    Rasteriza los barrios en una malla de etiquetas alineada con un ráster.
+
+    Args:
+        geometry_index: ``BarrioGeometryIndex`` con las geometrías en EPSG:4326.
+        transform: Transformación afín del ráster ``(a, b, c, d, e, f)``
+            (acepta ``affine.Affine``): ``x = a*col + b*row + c``,
+            ``y = d*col + e*row + f``.
+        shape: ``(filas, columnas)`` del ráster.
+        to_lonlat: Conversión de coordenadas del ráster a lon/lat si el ráster
+            no está en EPSG:4326.
+        block_rows: Filas procesadas a la vez.
+
+    Returns:
+        Array ``int32`` de tamaño ``shape``: 0 fuera de los barrios y ``k + 1``
+        para el barrio en la posición ``k`` de ``geometry_index.barrio_ids``.
+    """
+    a, b, c, d, e, f = tuple(transform)[:6]
+    height, width = shape
+    labels = np.zeros((height, width), dtype=np.int32)
+    cols = np.arange(width, dtype=float) + 0.5
+    for row0 in range(0, height, block_rows):
+        rows = np.arange(row0, min(row0 + block_rows, height), dtype=float) + 0.5
+        col_grid, row_grid = np.meshgrid(cols, rows)
+        x = a * col_grid + b * row_grid + c
+        y = d * col_grid + e * row_grid + f
+        if to_lonlat is not None:
+            x, y = to_lonlat(x.ravel(), y.ravel())
+        positions = geometry_index.locate(np.ravel(x), np.ravel(y))
+        labels[row0:row0 + len(rows)] = (positions + 1).reshape(len(rows), width)
+    return labels
+
+
+def cached_labels(
+    geometry_index,
+    transform: Sequence[float],
+    shape: Tuple[int, int],
+    crs_key: str = "EPSG:4326",
+    to_lonlat: Optional[CoordTransform] = None,
+) -> np.ndarray:
+    """
+    ``rasterize_labels`` con caché por índice, transformación, tamaño y CRS.
+
+    Los MER de distintos años e indicadores comparten malla, por lo que los
+    polígonos solo se rasterizan una vez por ejecución.
+    """
+    key = (id(geometry_index), tuple(transform)[:6], tuple(shape), crs_key)
+    labels = _LABEL_CACHE.get(key)
+    if labels is None:
+        _LABEL_CACHE.clear()
+        labels = rasterize_labels(geometry_index, transform, shape, to_lonlat=to_lonlat)
+        _LABEL_CACHE[key] = labels
+    return labels
+
+
+class ZonalAccumulator:
+    """
+    Acumula estadísticas por zona a partir de bloques (etiquetas, valores).
+
+    Attributes:
+        n_zones: Número de zonas (las etiquetas válidas van de 1 a ``n_zones``).
+    """
+
+    def __init__(self, n_zones: int, thresholds: Sequence[float] = DEFAULT_THRESHOLDS_DB):
+        self.n_zones = n_zones
+        self.thresholds = tuple(thresholds)
+        size = n_zones + 1
+        self._n_bins = int(round((HIST_MAX_DB - HIST_MIN_DB) / HIST_STEP_DB))
+        self.count = np.zeros(size, dtype=np.int64)
+        self.total = np.zeros(size, dtype=np.float64)
+        self.minimum = np.full(size, np.inf)
+        self.maximum = np.full(size, -np.inf)
+        self.above = {t: np.zeros(size, dtype=np.int64) for t in self.thresholds}
+        self.histogram = np.zeros(size * self._n_bins, dtype=np.int64)
+
+    def add(self, labels: np.ndarray, values: np.ndarray, valid: np.ndarray) -> None:
+        """
+        Incorpora un bloque.
+
+        Args:
+            labels: Etiquetas de zona del bloque (0 = sin zona).
+            values: Valores del ráster, misma forma que ``labels``.
+            valid: Máscara de píxeles con dato (no ``nodata``, finitos).
+        """
+        keep = valid & (labels > 0)
+        if not keep.any():
+            return
+        zone = labels[keep].astype(np.int64)
+        vals = values[keep].astype(np.float64)
+        size = self.n_zones + 1
+
+        self.count += np.bincount(zone, minlength=size)
+        self.total += np.bincount(zone, weights=vals, minlength=size)
+        np.minimum.at(self.minimum, zone, vals)
+        np.maximum.at(self.maximum, zone, vals)
+        for threshold, counter in self.above.items():
+            counter += np.bincount(zone[vals > threshold], minlength=size)
+
+        bins = np.clip(
+            ((vals - HIST_MIN_DB) / HIST_STEP_DB).astype(np.int64), 0, self._n_bins - 1
+        )
+        self.histogram += np.bincount(
+            zone * self._n_bins + bins, minlength=size * self._n_bins
+        )
+
+    def to_frame(
+        self,
+        zone_ids: Sequence[int],
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> pd.DataFrame:
+        """
+        Estadísticas finales de las zonas con al menos un píxel válido.
+
+        Args:
+            zone_ids: Identificador de cada zona (``zone_ids[k]`` para la etiqueta ``k + 1``).
+            percentiles: Percentiles a calcular (0-100).
+
+        Returns:
+            DataFrame con ``barrio_id``, ``n_pixeles``, ``media``, ``minimo``,
+            ``maximo``, ``p<q>`` por percentil y ``pct_area_above_<umbral>db``.
+        """
+        count = self.count[1:]
+        has_data = count > 0
+        safe_count = np.where(has_data, count, 1)
+        frame = pd.DataFrame(
+            {
+                "barrio_id": np.asarray(zone_ids, dtype=np.int64),
+                "n_pixeles": count,
+                "media": self.total[1:] / safe_count,
+                "minimo": self.minimum[1:],
+                "maximo": self.maximum[1:],
+            }
+        )
+
+        cumulative = self.histogram.reshape(self.n_zones + 1, self._n_bins)[1:].cumsum(axis=1)
+        for q in percentiles:
+            target = np.maximum(np.ceil(count * q / 100.0), 1)
+            bin_index = (cumulative < target[:, None]).sum(axis=1)
+            value = HIST_MIN_DB + (bin_index + 0.5) * HIST_STEP_DB
+            frame[f"p{q:g}"] = np.clip(value, frame["minimo"], frame["maximo"])
+
+        for threshold, counter in self.above.items():
+            frame[threshold_column(threshold)] = counter[1:] / safe_count * 100.0
+
+        return frame[has_data].reset_index(drop=True)
+
+
+def _row_blocks(height: int, block_rows: int) -> Iterator[Tuple[int, int]]:
+    for row0 in range(0, height, block_rows):
+        yield row0, min(row0 + block_rows, height)
+
+
+def zonal_statistics_array(
+    data: np.ndarray,
+    labels: np.ndarray,
+    zone_ids: Sequence[int],
+    nodata: Optional[float] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    thresholds: Sequence[float] = DEFAULT_THRESHOLDS_DB,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+) -> Dict[int, pd.DataFrame]:
+    """
+    Estadísticas zonales de un array en memoria ``(bandas, filas, columnas)``.
+
+    Args:
+        data: Valores del ráster (2D para una sola banda).
+        labels: Malla de etiquetas de ``rasterize_labels``.
+        zone_ids: ``barrio_id`` por etiqueta (``geometry_index.barrio_ids``).
+        nodata: Valor sin dato del ráster.
+        percentiles: Percentiles a calcular.
+        thresholds: Umbrales (dB) para el porcentaje de área por encima.
+        block_rows: Filas por bloque.
+
+    Returns:
+        ``{banda (1..n): DataFrame}`` como en ``ZonalAccumulator.to_frame``.
+    """
+    if data.ndim == 2:
+        data = data[None, :, :]
+    if data.shape[1:] != labels.shape:
+        raise ValueError(f"Ráster {data.shape[1:]} y etiquetas {labels.shape} no coinciden")
+
+    def read_block(row0: int, row1: int) -> np.ndarray:
+        return data[:, row0:row1]
+
+    return _accumulate(read_block, labels, zone_ids, data.shape[0], nodata,
+                       percentiles, thresholds, block_rows)
+
+
+def _accumulate(
+    read_block: Callable[[int, int], np.ndarray],
+    labels: np.ndarray,
+    zone_ids: Sequence[int],
+    n_bands: int,
+    nodata: Optional[float],
+    percentiles: Sequence[float],
+    thresholds: Sequence[float],
+    block_rows: int,
+) -> Dict[int, pd.DataFrame]:
+    """Recorre el ráster por bloques acumulando todas las bandas a la vez."""
+    accumulators = [ZonalAccumulator(len(zone_ids), thresholds) for _ in range(n_bands)]
+    for row0, row1 in _row_blocks(labels.shape[0], block_rows):
+        block_labels = labels[row0:row1]
+        if not block_labels.any():
+            continue
+        block = read_block(row0, row1)
+        for band, accumulator in enumerate(accumulators):
+            values = block[band]
+            valid = np.isfinite(values)
+            if nodata is not None and not np.isnan(nodata):
+                valid &= values != nodata
+            accumulator.add(block_labels, values, valid)
+    return {
+        band + 1: accumulator.to_frame(zone_ids, percentiles)
+        for band, accumulator in enumerate(accumulators)
+    }
+
+
+def zonal_statistics_raster(
+    raster_path: Path,
+    geometry_index,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    thresholds: Sequence[float] = DEFAULT_THRESHOLDS_DB,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+) -> Dict[int, pd.DataFrame]:
+    """
+    Estadísticas zonales de todas las bandas de un GeoTIFF (requiere rasterio).
+
+    El ráster se lee por ventanas de ``block_rows`` filas; los bloques sin
+    ningún barrio no se leen. Si el CRS del ráster no es geográfico, los
+    centros de píxel se convierten a EPSG:4326 con pyproj para rasterizar.
+
+    Args:
+        raster_path: Ruta al ráster.
+        geometry_index: ``BarrioGeometryIndex`` de ``dim_barrios``.
+        percentiles: Percentiles a calcular.
+        thresholds: Umbrales (dB) para el porcentaje de área por encima.
+        block_rows: Filas por ventana de lectura.
+
+    Returns:
+        ``{banda (1..n): DataFrame}`` como en ``ZonalAccumulator.to_frame``.
+    """
+    import rasterio
+    from rasterio.windows import Window
+
+    with rasterio.open(raster_path) as src:
+        to_lonlat = _lonlat_transformer(src.crs)
+        labels = cached_labels(
+            geometry_index,
+            src.transform,
+            (src.height, src.width),
+            crs_key=str(src.crs),
+            to_lonlat=to_lonlat,
+        )
+
+        def read_block(row0: int, row1: int) -> np.ndarray:
+            return src.read(window=Window(0, row0, src.width, row1 - row0))
+
+        return _accumulate(read_block, labels, geometry_index.barrio_ids, src.count,
+                           src.nodata, percentiles, thresholds, block_rows)
+
+
+def _lonlat_transformer(crs: Any) -> Optional[CoordTransform]:
+    """Transformación de ``crs`` a EPSG:4326 (``None`` si ya es geográfico o desconocido)."""
+    if crs is None or getattr(crs, "is_geographic", False):
+        return None
+    from pyproj import Transformer
+
+    transformer = Transformer.from_crs(crs.to_wkt(), "EPSG:4326", always_xy=True)
+    return transformer.transform
@@ -15,30 +15,12 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 import pandas as pd
-import sqlite3
 
-from ..database_setup import DEFAULT_DB_NAME
+from ..database_pool import get_readonly_connection
 
 logger = logging.getLogger(__name__)
 
 
-def _get_db_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
-    """
-    Obtiene conexión a la base de datos.
-    
-    Args:
-        db_path: Ruta opcional a la base de datos.
-    
-    Returns:
-        Conexión SQLite.
-    """
-    if db_path is None:
-        project_root = Path(__file__).parent.parent.parent
-        db_path = project_root / "data" / "processed" / DEFAULT_DB_NAME
-    
-    return sqlite3.connect(str(db_path))
-
-
 def calculate_barrio_score(
     barrio_id: int,
     weights: Optional[Dict[str, float]] = None,
@@ -55,7 +37,7 @@ def calculate_barrio_score(
     Returns:
         Diccionario con scores por criterio y score total.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         # Obtener datos del barrio desde scorecard
@@ -178,7 +160,7 @@ def recommend_barrios(
     Returns:
         Lista de diccionarios con barrios recomendados y sus scores.
     """
-    conn = _get_db_connection(db_path)
+    conn = get_readonly_connection(db_path)
     
     try:
         # Obtener todos los barrios
@@ -0,0 +1,346 @@
+"""
+Geometrías de barrios compartidas y asignación de puntos a barrios.
+
+``dim_barrios.geometry_json`` se parsea una sola vez por dimensión y se reutiliza
+en todas las fuentes geocodificadas (Inside Airbnb, Idealista, equipamientos...):
+
+- Las geometrías (GeoJSON o WKT) se convierten a shapely y se preparan;
+  ``assign_points`` evalúa todos los puntos de golpe con ``contains_xy`` (sin
+  crear objetos ``Point``).
+- Prefiltro por rectángulo envolvente: primero se descartan los puntos fuera de
+  la ciudad (coordenadas nulas, (0, 0), errores de geocodificación) y después
+  cada geometría solo evalúa los puntos de su propio rectángulo. Con ~73 barrios
+  esto es más rápido que consultar un ``STRtree`` (ver
+  ``scripts/benchmark_assign_points.py``).
+- Si shapely no está instalado se usa un algoritmo de ray casting en NumPy
+  (regla par-impar, con huecos) sobre los anillos del GeoJSON.
+
+Uso típico:
+    from src.transform.geometry import get_barrio_geometry_index
+
+    index = get_barrio_geometry_index(dim_barrios)
+    df["barrio_id"] = index.assign_points(df["longitude"], df["latitude"])
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:  # pragma: no cover - depende del entorno
+    import shapely
+    from shapely import wkt as shapely_wkt
+    from shapely.geometry import shape as shapely_shape
+
+    SHAPELY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depende del entorno
+    shapely = None
+    shapely_wkt = None
+    shapely_shape = None
+    SHAPELY_AVAILABLE = False
+
+BACKEND_SHAPELY = "shapely"
+BACKEND_NUMPY = "numpy"
+
+# Máximo de celdas (puntos x aristas) evaluadas a la vez por el backend NumPy
+_NUMPY_MAX_CELLS = 4_000_000
+
+# Anillos de un polígono: exterior seguido de huecos, cada uno como array (n, 2)
+Rings = List[np.ndarray]
+
+
+def parse_geometry_json(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    Convierte el contenido de ``geometry_json`` en un diccionario GeoJSON.
+
+    Acepta GeoJSON serializado, diccionarios ya parseados y, si shapely está
+    disponible, WKT.
+
+    Args:
+        value: Valor de la columna ``geometry_json``.
+
+    Returns:
+        Geometría GeoJSON o ``None`` si el valor está vacío o no es válido.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, dict):
+        return value
+    text = str(value).strip()
+    if not text:
+        return None
+    if text.startswith("{"):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as exc:
+            logger.debug("GeoJSON inválido: %s", exc)
+            return None
+    if SHAPELY_AVAILABLE:
+        try:
+            return shapely.geometry.mapping(shapely_wkt.loads(text))
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("WKT inválido: %s", exc)
+    return None
+
+
+def _polygon_rings(geojson: Dict[str, Any]) -> List[Rings]:
+    """Extrae los anillos de cada polígono de un Polygon/MultiPolygon GeoJSON."""
+    geom_type = geojson.get("type")
+    coordinates = geojson.get("coordinates") or []
+    if geom_type == "Polygon":
+        polygons = [coordinates]
+    elif geom_type == "MultiPolygon":
+        polygons = coordinates
+    else:
+        raise ValueError(f"Tipo de geometría no soportado: {geom_type}")
+    result: List[Rings] = []
+    for polygon in polygons:
+        rings = [np.asarray(ring, dtype=float)[:, :2] for ring in polygon if len(ring) >= 3]
+        if rings:
+            result.append(rings)
+    return result
+
+
+def _points_in_rings(x: np.ndarray, y: np.ndarray, rings: Rings) -> np.ndarray:
+    """Ray casting par-impar de los puntos contra los anillos de un polígono."""
+    starts = np.concatenate(rings)
+    ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+    x1, y1 = starts[:, 0], starts[:, 1]
+    x2, y2 = ends[:, 0], ends[:, 1]
+    dy = y2 - y1
+    # Las aristas horizontales nunca cruzan el rayo; se evita dividir por cero
+    slope = np.divide(x2 - x1, dy, out=np.zeros_like(dy), where=dy != 0)
+
+    inside = np.zeros(len(x), dtype=bool)
+    step = max(1, _NUMPY_MAX_CELLS // max(1, len(starts)))
+    for begin in range(0, len(x), step):
+        px = x[begin:begin + step, None]
+        py = y[begin:begin + step, None]
+        crosses = ((y1 > py) != (y2 > py)) & (px < slope * (py - y1) + x1)
+        inside[begin:begin + step] = np.count_nonzero(crosses, axis=1) % 2 == 1
+    return inside
+
+
+def _as_float_array(values: Any) -> np.ndarray:
+    """Convierte coordenadas a ``float64``; los valores no numéricos pasan a NaN."""
+    array = np.asarray(values)
+    if array.dtype.kind in "fiu":
+        return array.astype(float, copy=False)
+    return pd.to_numeric(pd.Series(array), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+class BarrioGeometryIndex:
+    """
+    Índice espacial de las geometrías de ``dim_barrios``.
+
+    Las geometrías se parsean una vez al construir el índice. Con shapely se
+    preparan para ``contains_xy``; sin shapely se usan los anillos como arrays
+    NumPy para el backend de ray casting.
+
+    Attributes:
+        barrio_ids: ``barrio_id`` de cada geometría indexada.
+        bounds: Rectángulos envolventes ``(minx, miny, maxx, maxy)`` por geometría.
+        backend: ``"shapely"`` o ``"numpy"``.
+    """
+
+    def __init__(self, dim_barrios: pd.DataFrame, backend: Optional[str] = None) -> None:
+        """
+        Construye el índice a partir de la dimensión de barrios.
+
+        Args:
+            dim_barrios: DataFrame con ``barrio_id`` y ``geometry_json``.
+            backend: ``"shapely"``, ``"numpy"`` o ``None`` (shapely si está instalado).
+
+        Raises:
+            ValueError: Si faltan columnas o el backend no es válido.
+        """
+        missing = {"barrio_id", "geometry_json"} - set(dim_barrios.columns)
+        if missing:
+            raise ValueError(f"dim_barrios sin columnas de geometría: {sorted(missing)}")
+        if backend is None:
+            backend = BACKEND_SHAPELY if SHAPELY_AVAILABLE else BACKEND_NUMPY
+        if backend not in (BACKEND_SHAPELY, BACKEND_NUMPY):
+            raise ValueError(f"Backend de geometría desconocido: {backend}")
+        if backend == BACKEND_SHAPELY and not SHAPELY_AVAILABLE:
+            raise ValueError("El backend 'shapely' requiere shapely instalado")
+        self.backend = backend
+
+        ids: List[int] = []
+        polygons: List[List[Rings]] = []
+        geojsons: List[Dict[str, Any]] = []
+        for barrio_id, raw in zip(dim_barrios["barrio_id"], dim_barrios["geometry_json"]):
+            geojson = parse_geometry_json(raw)
+            if geojson is None or pd.isna(barrio_id):
+                continue
+            try:
+                rings = _polygon_rings(geojson)
+            except (TypeError, ValueError, IndexError) as exc:
+                logger.debug("Geometría no utilizable para barrio %s: %s", barrio_id, exc)
+                continue
+            if not rings:
+                continue
+            ids.append(int(barrio_id))
+            polygons.append(rings)
+            geojsons.append(geojson)
+
+        self.barrio_ids = np.asarray(ids, dtype=np.int64)
+        self._polygons = polygons
+        self._geometries = None
+        if backend == BACKEND_SHAPELY:
+            self._geometries = np.asarray([shapely_shape(g) for g in geojsons], dtype=object)
+            shapely.prepare(self._geometries)
+
+        self.bounds = np.empty((len(polygons), 4), dtype=float)
+        for position, rings in enumerate(polygons):
+            exteriors = np.concatenate([polygon_rings[0] for polygon_rings in rings])
+            self.bounds[position, :2] = exteriors.min(axis=0)
+            self.bounds[position, 2:] = exteriors.max(axis=0)
+
+    def __len__(self) -> int:
+        return len(self.barrio_ids)
+
+    @property
+    def total_bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """Rectángulo envolvente de todas las geometrías (``None`` si no hay)."""
+        if not len(self):
+            return None
+        return (
+            float(self.bounds[:, 0].min()),
+            float(self.bounds[:, 1].min()),
+            float(self.bounds[:, 2].max()),
+            float(self.bounds[:, 3].max()),
+        )
+
+    def geometries(self) -> Sequence[Any]:
+        """Geometrías shapely indexadas (mismo orden que ``barrio_ids``)."""
+        if self._geometries is None:
+            raise ValueError("Las geometrías shapely solo están disponibles con backend 'shapely'")
+        return self._geometries
+
+    def to_geodataframe(self):
+        """
+        Devuelve las geometrías como GeoDataFrame (requiere geopandas).
+
+        Returns:
+            GeoDataFrame con ``barrio_id`` y ``geometry`` en EPSG:4326.
+        """
+        import geopandas as gpd
+
+        return gpd.GeoDataFrame(
+            {"barrio_id": self.barrio_ids},
+            geometry=list(self.geometries()),
+            crs="EPSG:4326",
+        )
+
+    def _contains(self, position: int, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Indica qué puntos caen dentro de la geometría ``position``."""
+        if self.backend == BACKEND_SHAPELY:
+            return shapely.contains_xy(self._geometries[position], x, y)
+        hits = np.zeros(len(x), dtype=bool)
+        for polygon_rings in self._polygons[position]:
+            hits |= _points_in_rings(x, y, polygon_rings)
+        return hits
+
+    def _assign_indices(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Posición de la geometría que contiene cada punto (-1 si ninguna)."""
+        positions = np.full(len(x), -1, dtype=np.int64)
+        for position, bbox in enumerate(self.bounds):
+            # Un punto en varias geometrías (solapes) se queda con la primera
+            candidates = np.flatnonzero(
+                (positions < 0)
+                & (x >= bbox[0]) & (x <= bbox[2])
+                & (y >= bbox[1]) & (y <= bbox[3])
+            )
+            if len(candidates):
+                hits = self._contains(position, x[candidates], y[candidates])
+                positions[candidates[hits]] = position
+        return positions
+
+    def locate(self, lon: Any, lat: Any) -> np.ndarray:
+        """
+        Posición (en ``barrio_ids``) de la geometría que contiene cada punto.
+
+        Args:
+            lon: Longitudes.
+            lat: Latitudes, del mismo tamaño que ``lon``.
+
+        Returns:
+            Array ``int64`` con la posición de cada punto o -1 si no cae en
+            ningún barrio o no tiene coordenadas válidas.
+        """
+        x = _as_float_array(lon)
+        y = _as_float_array(lat)
+        if len(x) != len(y):
+            raise ValueError("lon y lat deben tener la misma longitud")
+
+        positions = np.full(len(x), -1, dtype=np.int64)
+        bbox = self.total_bounds
+        if bbox is not None:
+            valid = np.flatnonzero(
+                np.isfinite(x) & np.isfinite(y)
+                & (x >= bbox[0]) & (x <= bbox[2])
+                & (y >= bbox[1]) & (y <= bbox[3])
+            )
+            positions[valid] = self._assign_indices(x[valid], y[valid])
+        return positions
+
+    def assign_points(self, lon: Any, lat: Any) -> pd.Series:
+        """
+        Asigna cada coordenada al barrio que la contiene.
+
+        Args:
+            lon: Longitudes (array, lista o Series).
+            lat: Latitudes, del mismo tamaño que ``lon``.
+
+        Returns:
+            Series ``Int64`` con el ``barrio_id`` de cada punto (``<NA>`` si el
+            punto no cae en ningún barrio o no tiene coordenadas). Conserva el
+            índice de ``lon`` si es una Series.
+        """
+        index = lon.index if isinstance(lon, pd.Series) else None
+        positions = self.locate(lon, lat)
+        found = positions >= 0
+        values = np.zeros(len(positions), dtype=np.int64)
+        values[found] = self.barrio_ids[positions[found]]
+        result = pd.arrays.IntegerArray(values, ~found)
+        return pd.Series(result, index=index, dtype="Int64")
+
+
+_INDEX_CACHE: Dict[Tuple, BarrioGeometryIndex] = {}
+
+
+def get_barrio_geometry_index(
+    dim_barrios: pd.DataFrame,
+    backend: Optional[str] = None,
+) -> BarrioGeometryIndex:
+    """
+    Devuelve un ``BarrioGeometryIndex`` reutilizable para ``dim_barrios``.
+
+    El índice se cachea por ``barrio_id`` y ``geometry_json``, de forma que las
+    geometrías se parsean una sola vez por ejecución aunque varias fuentes
+    geocodificadas las necesiten.
+
+    Args:
+        dim_barrios: DataFrame con ``barrio_id`` y ``geometry_json``.
+        backend: Backend forzado (ver ``BarrioGeometryIndex``).
+
+    Returns:
+        Índice construido (o reutilizado) para esa dimensión.
+    """
+    key = (backend,) + tuple(
+        dim_barrios[["barrio_id", "geometry_json"]]
+        .astype(str)
+        .itertuples(index=False, name=None)
+    )
+    index = _INDEX_CACHE.get(key)
+    if index is None:
+        _INDEX_CACHE.clear()
+        index = BarrioGeometryIndex(dim_barrios, backend=backend)
+        _INDEX_CACHE[key] = index
+    return index
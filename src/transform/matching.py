@@ -0,0 +1,445 @@
+"""
+Matching por bloques y vectorizado de anuncios (Idealista) con inmuebles del Catastro.
+
+Los scripts del spike de Fase 2 comparaban cada anuncio con cada edificio del
+Catastro mediante dos bucles ``iterrows`` anidados (O(N×M) llamadas a
+``calculate_match_score``), inviable a escala de ciudad. Este módulo:
+
+- Indexa los edificios una sola vez (``CatastroMatcher``): una rejilla en metros
+  (celdas del tamaño de ``max_distance_m``) sobre lat/lon y bloques por barrio,
+  ambos como arrays ordenados con rangos ``[inicio, fin)`` por clave.
+- Genera los pares candidatos de forma vectorizada: los anuncios con
+  coordenadas se comparan con los edificios de las 3×3 celdas vecinas; los que
+  no tienen coordenadas, con los edificios de su barrio.
+- Calcula los scores de barrio, superficie, habitaciones y distancia como
+  arrays NumPy sobre todos los pares del bloque y devuelve el mejor edificio
+  por anuncio.
+
+Los pesos reproducen ``calculate_match_score`` del spike: barrio 0.35,
+superficie 0.40 (tolerancia adaptativa según el tamaño), habitaciones 0.15 y
+0.05 de bonus si el anuncio documenta características. El score geográfico es
+lineal (1 a 0 m, 0 a ``max_distance_m``) y se combina con el heurístico con
+``geographic_weight``. Un edificio fuera de las celdas vecinas tiene score
+geográfico 0, así que el bloqueo no pierde matches siempre que
+``min_score > 1 - geographic_weight`` (0.5 > 0.4 con los valores por defecto).
+
+Uso típico:
+    from src.transform.matching import CatastroMatcher
+
+    matcher = CatastroMatcher(df_catastro, barrio_col="barrio_id")
+    result = matcher.match(df_idealista, barrio_col="barrio_id")
+    df = df_idealista.join(result)
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Pesos del score heurístico (máximo 1.0: 0.35 + 0.40 + 0.15 + 0.10 de características)
+WEIGHT_BARRIO = 0.35
+WEIGHT_BARRIO_PARCIAL = 0.25
+WEIGHT_SUPERFICIE = 0.40
+WEIGHT_HABITACIONES = 0.15
+WEIGHT_HABITACIONES_CERCA = 0.08
+BONUS_CARACTERISTICAS = 0.05
+
+DEFAULT_MAX_DISTANCE_M = 50.0
+DEFAULT_GEOGRAPHIC_WEIGHT = 0.6
+DEFAULT_MIN_SCORE = 0.5
+
+# Anuncios procesados a la vez (acota la memoria de los pares candidatos)
+DEFAULT_CHUNK_SIZE = 20_000
+
+METHOD_GEOGRAPHIC = "geographic+heuristic"
+METHOD_HEURISTIC = "heuristic_only"
+
+EARTH_RADIUS_M = 6_371_000.0
+
+# Cambio de base para combinar (cx, cy) en una única clave int64
+_CELL_KEY_BASE = np.int64(1 << 31)
+
+MATCH_COLUMNS = [
+    "catastro_index",
+    "match_score",
+    "match_score_heuristic",
+    "match_score_geographic",
+    "match_distance_m",
+    "match_method",
+    "matched",
+]
+
+
+def superficie_tolerance(superficie: np.ndarray) -> np.ndarray:
+    """
+    Tolerancia relativa de superficie según el tamaño del inmueble.
+
+    Args:
+        superficie: Superficies en m² del anuncio.
+
+    Returns:
+        Array con la tolerancia (0.10 < 50 m², 0.15 < 100, 0.20 < 150, 0.25 resto).
+    """
+    superficie = np.asarray(superficie, dtype=float)
+    return np.select(
+        [superficie < 50, superficie < 100, superficie < 150],
+        [0.10, 0.15, 0.20],
+        default=0.25,
+    )
+
+
+def haversine_m(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """Distancia de gran círculo en metros entre arrays de coordenadas."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _numeric(df: pd.DataFrame, column: Optional[str]) -> np.ndarray:
+    if column is None or column not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+
+
+def _block_ranges(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ordena claves de bloque y devuelve ``(orden, claves_únicas, inicios, fines)``.
+
+    Los edificios del bloque ``claves_únicas[i]`` son ``orden[inicios[i]:fines[i]]``.
+    """
+    order = np.argsort(keys, kind="stable")
+    unique, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    return order, unique, starts, starts + counts
+
+
+def _expand_ranges(
+    owners: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expande rangos ``[inicio, fin)`` a pares ``(propietario, posición)`` sin bucles.
+
+    Returns:
+        Tupla ``(propietarios repetidos, posiciones dentro del array ordenado)``.
+    """
+    counts = ends - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    positions = np.arange(total, dtype=np.int64) - np.repeat(offsets - starts, counts)
+    return np.repeat(owners, counts), positions
+
+
+class CatastroMatcher:
+    """
+    Índice de edificios del Catastro para emparejar anuncios por bloques.
+
+    Attributes:
+        buildings: DataFrame de edificios tal como se recibió.
+        max_distance_m: Distancia a partir de la cual el score geográfico es 0
+            (también tamaño de celda de la rejilla).
+    """
+
+    def __init__(
+        self,
+        buildings: pd.DataFrame,
+        barrio_col: Optional[str] = "barrio_id",
+        lat_col: Optional[str] = "lat",
+        lon_col: Optional[str] = "lon",
+        superficie_col: str = "superficie_m2",
+        habitaciones_col: Optional[str] = "habitaciones",
+        max_distance_m: float = DEFAULT_MAX_DISTANCE_M,
+    ) -> None:
+        self.buildings = buildings
+        self.max_distance_m = float(max_distance_m)
+
+        self._lat = _numeric(buildings, lat_col)
+        self._lon = _numeric(buildings, lon_col)
+        self._superficie = _numeric(buildings, superficie_col)
+        self._habitaciones = np.trunc(_numeric(buildings, habitaciones_col))
+
+        # Barrios como códigos enteros; -1 = desconocido
+        if barrio_col is not None and barrio_col in buildings.columns:
+            barrio_codes, self._barrio_values = pd.factorize(buildings[barrio_col])
+        else:
+            barrio_codes, self._barrio_values = np.full(len(buildings), -1), pd.Index([])
+        self._barrio_codes = barrio_codes.astype(np.int64)
+        known = self._barrio_codes >= 0
+        order, unique, starts, ends = _block_ranges(self._barrio_codes[known])
+        self._barrio_order = np.flatnonzero(known)[order]
+        self._barrio_blocks = (unique, starts, ends)
+
+        # Rejilla en metros con origen en el centro de los edificios
+        has_coords = ~(np.isnan(self._lat) | np.isnan(self._lon))
+        self._ref_lat = float(np.nanmean(self._lat)) if has_coords.any() else 41.39
+        self._ref_lon = float(np.nanmean(self._lon)) if has_coords.any() else 2.17
+        cx, cy = self._cells(self._lat[has_coords], self._lon[has_coords])
+        order, unique, starts, ends = _block_ranges(cx * _CELL_KEY_BASE + cy)
+        self._grid_order = np.flatnonzero(has_coords)[order]
+        self._grid_blocks = (unique, starts, ends)
+
+        logger.info(
+            "Índice Catastro: %s edificios, %s celdas de %.0f m, %s barrios",
+            len(buildings),
+            len(unique),
+            self.max_distance_m,
+            len(self._barrio_values),
+        )
+
+    def __len__(self) -> int:
+        return len(self.buildings)
+
+    def _cells(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Celda de la rejilla (proyección equirectangular local)."""
+        meters_per_deg = np.pi * EARTH_RADIUS_M / 180.0
+        x = (lon - self._ref_lon) * meters_per_deg * np.cos(np.radians(self._ref_lat))
+        y = (lat - self._ref_lat) * meters_per_deg
+        return (
+            np.floor(x / self.max_distance_m).astype(np.int64),
+            np.floor(y / self.max_distance_m).astype(np.int64),
+        )
+
+    def _barrio_score_matrix(self, listing_values: pd.Index) -> np.ndarray:
+        """
+        Score de barrio para cada combinación (barrio anuncio, barrio edificio).
+
+        Coincidencia exacta = ``WEIGHT_BARRIO``; si ambos son texto y uno
+        contiene al otro, ``WEIGHT_BARRIO_PARCIAL``. La última fila y columna
+        corresponden a barrio desconocido (score 0).
+        """
+        building_values = list(self._barrio_values)
+        matrix = np.zeros((len(listing_values) + 1, len(building_values) + 1))
+        for i, listing_barrio in enumerate(listing_values):
+            for j, building_barrio in enumerate(building_values):
+                if listing_barrio == building_barrio:
+                    matrix[i, j] = WEIGHT_BARRIO
+                elif (
+                    isinstance(listing_barrio, str)
+                    and isinstance(building_barrio, str)
+                    and listing_barrio
+                    and building_barrio
+                    and (listing_barrio in building_barrio or building_barrio in listing_barrio)
+                ):
+                    matrix[i, j] = WEIGHT_BARRIO_PARCIAL
+        return matrix
+
+    def _spatial_candidates(
+        self, listing_ids: np.ndarray, lat: np.ndarray, lon: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        unique, starts, ends = self._grid_blocks
+        if len(listing_ids) == 0 or len(unique) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        cx, cy = self._cells(lat, lon)
+        owners, positions = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                keys = (cx + dx) * _CELL_KEY_BASE + (cy + dy)
+                slot = np.clip(np.searchsorted(unique, keys), 0, len(unique) - 1)
+                found = unique[slot] == keys
+                block_owners, block_positions = _expand_ranges(
+                    listing_ids[found], starts[slot[found]], ends[slot[found]]
+                )
+                owners.append(block_owners)
+                positions.append(block_positions)
+        return np.concatenate(owners), self._grid_order[np.concatenate(positions)]
+
+    def _barrio_candidates(
+        self, listing_ids: np.ndarray, barrio_codes: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        unique, starts, ends = self._barrio_blocks
+        known = barrio_codes >= 0
+        if not known.any() or len(unique) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        slot = np.clip(np.searchsorted(unique, barrio_codes[known]), 0, len(unique) - 1)
+        found = unique[slot] == barrio_codes[known]
+        ids = listing_ids[known][found]
+        owners, positions = _expand_ranges(ids, starts[slot[found]], ends[slot[found]])
+        return owners, self._barrio_order[positions]
+
+    def match(
+        self,
+        listings: pd.DataFrame,
+        barrio_col: Optional[str] = "barrio_id",
+        lat_col: Optional[str] = "lat",
+        lon_col: Optional[str] = "lon",
+        superficie_col: str = "superficie_m2",
+        habitaciones_col: Optional[str] = "habitaciones",
+        features_col: Optional[str] = None,
+        geographic_weight: float = DEFAULT_GEOGRAPHIC_WEIGHT,
+        min_score: float = DEFAULT_MIN_SCORE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> pd.DataFrame:
+        """
+        Busca el mejor edificio del Catastro para cada anuncio.
+
+        Args:
+            listings: DataFrame de anuncios.
+            barrio_col: Columna con el barrio del anuncio (mismos valores que la
+                columna de barrio de los edificios, p. ej. ``barrio_id`` o el
+                nombre normalizado).
+            lat_col: Columna de latitud del anuncio.
+            lon_col: Columna de longitud del anuncio.
+            superficie_col: Columna de superficie en m².
+            habitaciones_col: Columna con el número de habitaciones.
+            features_col: Columna booleana opcional; si es True el anuncio
+                recibe el bonus de características documentadas.
+            geographic_weight: Peso del score geográfico en el score combinado.
+            min_score: Score mínimo para considerar el match válido.
+            chunk_size: Anuncios por bloque de cálculo.
+
+        Returns:
+            DataFrame con el mismo índice que ``listings`` y las columnas
+            ``MATCH_COLUMNS``. ``catastro_index`` es la etiqueta del índice de
+            ``buildings`` del mejor candidato (o NA si no hay candidatos).
+        """
+        n_listings = len(listings)
+        lat = _numeric(listings, lat_col)
+        lon = _numeric(listings, lon_col)
+        superficie = _numeric(listings, superficie_col)
+        habitaciones = np.trunc(_numeric(listings, habitaciones_col))
+        if features_col is not None and features_col in listings.columns:
+            bonus = np.where(listings[features_col].fillna(False).astype(bool), BONUS_CARACTERISTICAS, 0.0)
+        else:
+            bonus = np.zeros(n_listings)
+
+        if barrio_col is not None and barrio_col in listings.columns:
+            listing_codes, listing_values = pd.factorize(listings[barrio_col])
+        else:
+            listing_codes, listing_values = np.full(n_listings, -1), pd.Index([])
+        listing_codes = listing_codes.astype(np.int64)
+        barrio_matrix = self._barrio_score_matrix(listing_values)
+        # Códigos del anuncio en el espacio de códigos de los edificios (bloques)
+        to_building = self._barrio_values.get_indexer(listing_values)
+        building_space = np.where(listing_codes >= 0, np.append(to_building, -1)[listing_codes], -1)
+
+        has_coords = ~(np.isnan(lat) | np.isnan(lon))
+
+        best_pos = np.full(n_listings, -1, dtype=np.int64)
+        best_score = np.zeros(n_listings)
+        best_heuristic = np.full(n_listings, np.nan)
+        best_geographic = np.full(n_listings, np.nan)
+        best_distance = np.full(n_listings, np.nan)
+
+        for chunk_start in range(0, n_listings, max(1, chunk_size)):
+            ids = np.arange(chunk_start, min(chunk_start + chunk_size, n_listings))
+            geo_ids = ids[has_coords[ids]]
+            plain_ids = ids[~has_coords[ids]]
+            geo_owner, geo_building = self._spatial_candidates(geo_ids, lat[geo_ids], lon[geo_ids])
+            plain_owner, plain_building = self._barrio_candidates(plain_ids, building_space[plain_ids])
+            owner = np.concatenate([geo_owner, plain_owner])
+            building = np.concatenate([geo_building, plain_building])
+            if len(owner) == 0:
+                continue
+
+            # Score heurístico sobre todos los pares
+            heuristic = barrio_matrix[listing_codes[owner], self._barrio_codes[building]]
+
+            s_listing = superficie[owner]
+            s_building = self._superficie[building]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                diff_ratio = np.abs(s_listing - s_building) / s_building
+                tolerance = superficie_tolerance(s_listing)
+                sup_score = WEIGHT_SUPERFICIE * (1 - diff_ratio / tolerance)
+            valid = (s_building > 0) & (diff_ratio <= tolerance)
+            heuristic += np.where(valid, sup_score, 0.0)
+
+            room_diff = np.abs(habitaciones[owner] - self._habitaciones[building])
+            heuristic += np.select(
+                [room_diff == 0, room_diff == 1], [WEIGHT_HABITACIONES, WEIGHT_HABITACIONES_CERCA], 0.0
+            )
+            heuristic += bonus[owner]
+
+            # Score geográfico (solo pares con coordenadas en ambos lados)
+            distance = haversine_m(lat[owner], lon[owner], self._lat[building], self._lon[building])
+            geographic = np.clip(1.0 - distance / self.max_distance_m, 0.0, 1.0)
+            with_coords = has_coords[owner] & ~np.isnan(distance)
+            geographic = np.where(with_coords, geographic, 0.0)
+            combined = np.where(
+                with_coords,
+                geographic_weight * geographic + (1 - geographic_weight) * heuristic,
+                heuristic,
+            )
+
+            # Mejor candidato por anuncio (empates: primer edificio, como el bucle original)
+            keep = combined > 0
+            order = np.lexsort((building[keep], -combined[keep], owner[keep]))
+            owner_sorted = owner[keep][order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = owner_sorted[1:] != owner_sorted[:-1]
+            winners = np.flatnonzero(keep)[order[first]]
+            winner_owner = owner[winners]
+            best_pos[winner_owner] = building[winners]
+            best_score[winner_owner] = combined[winners]
+            best_heuristic[winner_owner] = heuristic[winners]
+            best_geographic[winner_owner] = np.where(with_coords[winners], geographic[winners], np.nan)
+            best_distance[winner_owner] = np.where(with_coords[winners], distance[winners], np.nan)
+
+        has_match = best_pos >= 0
+        catastro_index = pd.Series(pd.NA, index=listings.index, dtype="object")
+        catastro_index[has_match] = self.buildings.index.to_numpy()[best_pos[has_match]]
+        method = np.where(
+            ~has_match, None, np.where(np.isnan(best_distance), METHOD_HEURISTIC, METHOD_GEOGRAPHIC)
+        )
+        result = pd.DataFrame(
+            {
+                "catastro_index": catastro_index,
+                "match_score": best_score,
+                "match_score_heuristic": best_heuristic,
+                "match_score_geographic": best_geographic,
+                "match_distance_m": best_distance,
+                "match_method": method,
+                "matched": has_match & (best_score >= min_score),
+            },
+            index=listings.index,
+        )
+        logger.info(
+            "Matching Catastro: %s/%s anuncios emparejados (%s sin candidatos)",
+            int(result["matched"].sum()),
+            n_listings,
+            int((~has_match).sum()),
+        )
+        return result
+
+
+def match_listings_to_catastro(
+    listings: pd.DataFrame,
+    buildings: pd.DataFrame,
+    barrio_col: Optional[str] = "barrio_id",
+    lat_col: str = "lat",
+    lon_col: str = "lon",
+    max_distance_m: float = DEFAULT_MAX_DISTANCE_M,
+    **match_kwargs,
+) -> pd.DataFrame:
+    """
+    Atajo para indexar ``buildings`` y emparejar ``listings`` en una llamada.
+
+    Las columnas de barrio y coordenadas se asumen con el mismo nombre en ambos
+    DataFrames; el resto de argumentos se pasan a ``CatastroMatcher.match``.
+
+    Returns:
+        DataFrame de resultados de ``CatastroMatcher.match``.
+    """
+    matcher = CatastroMatcher(
+        buildings,
+        barrio_col=barrio_col,
+        lat_col=lat_col,
+        lon_col=lon_col,
+        max_distance_m=max_distance_m,
+    )
+    return matcher.match(listings, barrio_col=barrio_col, lat_col=lat_col, lon_col=lon_col, **match_kwargs)
+
+
+__all__ = [
+    "CatastroMatcher",
+    "MATCH_COLUMNS",
+    "haversine_m",
+    "match_listings_to_catastro",
+    "superficie_tolerance",
+]
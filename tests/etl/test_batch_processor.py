@@ -0,0 +1,103 @@
+"""Tests para la carga masiva en SQLite (src/etl/batch_processor.py)."""
+
+from __future__ import annotations
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.database_setup import create_database_schema
+from src.etl.batch_processor import (
+    bulk_insert_dataframe,
+    dataframe_to_records,
+    insert_dataframe_in_batches,
+)
+
+
+@pytest.fixture
+def conn() -> sqlite3.Connection:
+    connection = sqlite3.connect(":memory:")
+    create_database_schema(connection)
+    yield connection
+    connection.close()
+
+
+def _ampliada(n: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "barrio_id": np.arange(n) % 73 + 1,
+            "anio": 2024,
+            "sexo": np.where(np.arange(n) % 2 == 0, "hombre", "mujer"),
+            "grupo_edad": "25-29",
+            "nacionalidad": None,
+            "poblacion": pd.array(np.arange(n), dtype="Int64"),
+            "dataset_id": "test",
+            "source": "opendatabcn",
+            "etl_loaded_at": "2024-01-01T00:00:00",
+        }
+    )
+
+
+def test_records_match_to_sql_values() -> None:
+    df = pd.DataFrame(
+        {
+            "entero": pd.Series([1, 2], dtype="int16"),
+            "real": [0.5, np.nan],
+            "texto": ["a", np.nan],
+            "fecha": pd.to_datetime(["2024-01-01 10:00:00", None]),
+            "nullable": pd.array([None, 3], dtype="Int64"),
+        }
+    )
+    reference = sqlite3.connect(":memory:")
+    df.to_sql("t", reference, index=False)
+
+    assert dataframe_to_records(df) == reference.execute("SELECT * FROM t").fetchall()
+
+
+def test_bulk_insert_loads_rows_and_restores_indexes(conn: sqlite3.Connection) -> None:
+    df = _ampliada(2500)
+    inserted = bulk_insert_dataframe(df, "fact_demografia_ampliada", conn, batch_size=1000)
+
+    assert inserted == 2500
+    assert conn.execute("SELECT COUNT(*) FROM fact_demografia_ampliada").fetchone()[0] == 2500
+    indexes = {
+        row[0]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' "
+            "AND tbl_name='fact_demografia_ampliada' AND sql IS NOT NULL"
+        )
+    }
+    assert indexes == {"idx_fact_demografia_ampliada_barrio_anio"}
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] != 0
+
+
+def test_clear_first_replaces_existing_rows(conn: sqlite3.Connection) -> None:
+    insert_dataframe_in_batches(_ampliada(10), "fact_demografia_ampliada", conn)
+    insert_dataframe_in_batches(
+        _ampliada(4), "fact_demografia_ampliada", conn, clear_first=True
+    )
+
+    assert conn.execute("SELECT COUNT(*) FROM fact_demografia_ampliada").fetchone()[0] == 4
+
+
+def test_replace_recreates_table_from_dataframe(conn: sqlite3.Connection) -> None:
+    df = pd.DataFrame({"barrio_id": [1, 2], "anio": [2024, 2024], "valor": [1.0, 2.0]})
+    bulk_insert_dataframe(df, "fact_ruido", conn, if_exists="replace")
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(fact_ruido)")]
+    assert columns == ["barrio_id", "anio", "valor"]
+
+
+def test_failed_load_rolls_back_and_keeps_indexes(conn: sqlite3.Connection) -> None:
+    insert_dataframe_in_batches(_ampliada(5), "fact_demografia_ampliada", conn)
+    bad = _ampliada(5).assign(barrio_id=None)  # barrio_id es NOT NULL
+
+    with pytest.raises(sqlite3.IntegrityError):
+        bulk_insert_dataframe(bad, "fact_demografia_ampliada", conn, clear_first=True)
+
+    assert conn.execute("SELECT COUNT(*) FROM fact_demografia_ampliada").fetchone()[0] == 5
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name='idx_fact_demografia_ampliada_barrio_anio'"
+    ).fetchone()
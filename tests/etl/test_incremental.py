@@ -0,0 +1,139 @@
+"""Tests para el modo incremental del ETL (src/etl/incremental.py)."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from dataclasses import replace
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.database_setup import create_database_schema
+from src.etl.incremental import (
+    IncrementalPlan,
+    fingerprint_dataframe,
+    fingerprint_file,
+    load_poblacion_snapshot,
+    load_table_states,
+)
+
+
+@pytest.fixture
+def conn() -> sqlite3.Connection:
+    connection = sqlite3.connect(":memory:")
+    create_database_schema(connection)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def dim_barrios() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "barrio_id": [1, 2],
+            "barrio_nombre": ["el Raval", "el Barri Gòtic"],
+            "etl_created_at": ["2024-01-01T00:00:00", "2024-01-01T00:00:00"],
+            "etl_updated_at": ["2024-01-01T00:00:00", "2024-01-01T00:00:00"],
+        }
+    )
+
+
+def test_fingerprint_file_reuses_hash_when_size_and_mtime_match(tmp_path: Path) -> None:
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+    first = fingerprint_file(path)
+
+    fake_previous = {first.path: replace(first, sha256="cached")}
+    assert fingerprint_file(path, fake_previous).sha256 == "cached"
+
+    path.write_text("a,b\n1,3\n", encoding="utf-8")
+    os.utime(path, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+    assert fingerprint_file(path, fake_previous).sha256 not in {"cached", first.sha256}
+
+
+def test_fingerprint_dataframe_ignores_audit_columns(dim_barrios: pd.DataFrame) -> None:
+    later = dim_barrios.copy()
+    later["etl_updated_at"] = "2025-06-01T00:00:00"
+    assert fingerprint_dataframe(dim_barrios) == fingerprint_dataframe(later)
+
+    renamed = dim_barrios.copy()
+    renamed.loc[0, "barrio_nombre"] = "Raval"
+    assert fingerprint_dataframe(dim_barrios) != fingerprint_dataframe(renamed)
+
+
+def test_plan_rebuilds_only_tables_with_changed_inputs(
+    tmp_path: Path, conn: sqlite3.Connection, dim_barrios: pd.DataFrame
+) -> None:
+    airbnb_dir = tmp_path / "airbnb"
+    airbnb_dir.mkdir()
+    (airbnb_dir / "listings.csv").write_text("id\n1\n", encoding="utf-8")
+    venta = tmp_path / "venta.csv"
+    venta.write_text("Any,Valor\n2024,1\n", encoding="utf-8")
+    inputs = {"fact_presion_turistica": [airbnb_dir], "fact_precios": [venta]}
+
+    first = IncrementalPlan.build(conn, inputs, dim_barrios)
+    assert first.stale_tables == {"fact_presion_turistica", "fact_precios"}
+    first.save(conn, "etl_1")
+
+    unchanged = IncrementalPlan.build(conn, inputs, dim_barrios)
+    assert unchanged.stale_tables == set()
+
+    (airbnb_dir / "calendar.csv").write_text("listing_id\n1\n", encoding="utf-8")
+    changed = IncrementalPlan.build(conn, inputs, dim_barrios)
+    assert changed.stale_tables == {"fact_presion_turistica"}
+    assert changed.summary()["skipped_tables"] == ["fact_precios"]
+
+
+def test_plan_rebuilds_everything_when_dim_barrios_changes(
+    tmp_path: Path, conn: sqlite3.Connection, dim_barrios: pd.DataFrame
+) -> None:
+    venta = tmp_path / "venta.csv"
+    venta.write_text("Any,Valor\n2024,1\n", encoding="utf-8")
+    inputs = {"fact_precios": [venta], "fact_renta": []}
+    IncrementalPlan.build(conn, inputs, dim_barrios).save(conn, "etl_1")
+
+    extended = pd.concat(
+        [dim_barrios, dim_barrios.head(1).assign(barrio_id=3, barrio_nombre="Sants")],
+        ignore_index=True,
+    )
+    plan = IncrementalPlan.build(conn, inputs, extended)
+    assert plan.stale_tables == {"fact_precios", "fact_renta"}
+
+
+def test_disabled_plan_always_rebuilds(
+    conn: sqlite3.Connection, dim_barrios: pd.DataFrame
+) -> None:
+    inputs = {"fact_renta": []}
+    IncrementalPlan.build(conn, inputs, dim_barrios).save(conn, "etl_1")
+
+    plan = IncrementalPlan.build(conn, inputs, dim_barrios, enabled=False)
+    assert plan.needs_rebuild("fact_renta")
+    assert plan.needs_rebuild("tabla_no_planificada")
+
+
+def test_save_skips_excluded_tables(
+    conn: sqlite3.Connection, dim_barrios: pd.DataFrame
+) -> None:
+    plan = IncrementalPlan.build(conn, {"fact_renta": [], "fact_ruido": []}, dim_barrios)
+    plan.save(conn, "etl_1", tables={"fact_renta"})
+
+    assert set(load_table_states(conn)) == {"fact_renta"}
+
+
+def test_load_poblacion_snapshot(conn: sqlite3.Connection) -> None:
+    assert load_poblacion_snapshot(conn) is None
+
+    conn.execute(
+        "INSERT INTO dim_barrios (barrio_id, barrio_nombre, barrio_nombre_normalizado) "
+        "VALUES (1, 'el Raval', 'el raval')"
+    )
+    conn.execute(
+        "INSERT INTO fact_demografia (barrio_id, anio, poblacion_total) VALUES (1, 2024, 47000)"
+    )
+    snapshot = load_poblacion_snapshot(conn)
+    assert snapshot is not None
+    assert snapshot.to_dict("records") == [
+        {"barrio_id": 1, "anio": 2024, "poblacion_total": 47000}
+    ]
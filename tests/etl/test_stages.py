@@ -0,0 +1,89 @@
+"""Tests para el ejecutor de etapas del ETL (src/etl/stages.py)."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from src.etl.stages import (
+    ETL_WORKERS_ENV,
+    Stage,
+    resolve_max_workers,
+    run_stage_graph,
+    stage_timings,
+)
+
+
+def _make_frame(n: int) -> pd.DataFrame:
+    return pd.DataFrame({"barrio_id": range(1, n + 1), "valor": [1.0] * n})
+
+
+def _count_rows(df: pd.DataFrame, offset: int = 0) -> int:
+    return len(df) + offset
+
+
+def _fail() -> None:
+    raise ValueError("fallo simulado")
+
+
+def _graph():
+    return [
+        Stage("base", _make_frame, kwargs={"n": 3}),
+        Stage("conteo", _count_rows, kwargs={"offset": 1}, depends_on={"df": "base"}),
+        Stage("independiente", _make_frame, kwargs={"n": 2}),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_stage_graph_passes_dependency_results(workers: int) -> None:
+    results = run_stage_graph(_graph(), max_workers=workers)
+
+    assert results["conteo"].value == 4
+    assert len(results["independiente"].value) == 2
+    assert all(result.ok for result in results.values())
+    assert set(stage_timings(results)) == {"base", "conteo", "independiente"}
+
+
+def test_failed_stage_is_reported_and_dependents_receive_none() -> None:
+    stages = [
+        Stage("origen", _fail),
+        Stage("conteo", _count_rows, depends_on={"df": "origen"}),
+        Stage("independiente", _make_frame, kwargs={"n": 1}),
+    ]
+    results = run_stage_graph(stages, max_workers=1)
+
+    assert isinstance(results["origen"].error, ValueError)
+    assert isinstance(results["conteo"].error, TypeError)
+    assert results["independiente"].ok
+
+
+def test_critical_failure_skips_pending_stages() -> None:
+    stages = [
+        Stage("demografia", _fail, critical=True),
+        Stage("seguridad", _make_frame, kwargs={"n": 1}),
+    ]
+    results = run_stage_graph(stages, max_workers=1)
+
+    assert results["seguridad"].skipped
+    assert stage_timings(results)["seguridad"] is None
+
+
+def test_invalid_graphs_are_rejected() -> None:
+    with pytest.raises(ValueError, match="inexistentes"):
+        run_stage_graph([Stage("a", _make_frame, depends_on={"df": "b"})])
+    with pytest.raises(ValueError, match="Ciclo"):
+        run_stage_graph(
+            [
+                Stage("a", _count_rows, depends_on={"df": "b"}),
+                Stage("b", _count_rows, depends_on={"df": "a"}),
+            ]
+        )
+
+
+def test_resolve_max_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(ETL_WORKERS_ENV, raising=False)
+    assert resolve_max_workers() == 1
+    monkeypatch.setenv(ETL_WORKERS_ENV, "3")
+    assert resolve_max_workers() == 3
+    assert resolve_max_workers(2) == 2
+    assert resolve_max_workers(0) >= 1
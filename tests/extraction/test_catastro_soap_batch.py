@@ -0,0 +1,158 @@
+"""
+Tests del cliente batch del Catastro SOAP contra un servidor SOAP local.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "spike-data-validation" / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from catastro_soap_client import (  # noqa: E402
+    CatastroBatchFetcher,
+    CatastroSOAPClient,
+    CatastroSOAPConfig,
+    CatastroSOAPError,
+    ResponseCache,
+    TokenBucket,
+)
+
+RESPONSE_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap:Body>
+    <cat:Consulta_DNP xmlns:cat="http://www.catastro.meh.es/">
+      <bico><bi><debi><luso>V</luso><sfc>{sfc}</sfc><ant>1975</ant></debi></bi></bico>
+    </cat:Consulta_DNP>
+  </soap:Body>
+</soap:Envelope>"""
+
+
+class StubCatastro:
+    """Servidor SOAP mínimo: superficie = últimos dígitos de la referencia."""
+
+    def __init__(self) -> None:
+        self.requests: Counter = Counter()
+        self.failures: Counter = Counter()  # respuestas 503 pendientes por referencia
+        self._lock = threading.Lock()
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802
+                body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+                ref = re.search(r"<RefCat[^>]*>([^<]+)</RefCat>", body).group(1)
+                with stub._lock:
+                    stub.requests[ref] += 1
+                    fail = stub.failures[ref] > 0
+                    if fail:
+                        stub.failures[ref] -= 1
+                if fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                payload = RESPONSE_TEMPLATE.format(sfc=int(ref[-3:])).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/xml")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def stub() -> Iterator[tuple]:
+    catastro = StubCatastro()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), catastro.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    config = CatastroSOAPConfig(base_url=f"http://127.0.0.1:{server.server_port}/", timeout=5)
+    try:
+        yield catastro, config
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _refs(n: int) -> list:
+    return [f"0000000DF2800A{i:06d}" for i in range(1, n + 1)]
+
+
+def test_fetch_concurrently_in_input_order(stub) -> None:
+    """Las referencias se consultan en paralelo y se devuelven en el orden de entrada."""
+    catastro, config = stub
+    refs = _refs(12)
+    fetcher = CatastroBatchFetcher(config=config, max_workers=4, rate_per_second=None)
+
+    result = fetcher.fetch(refs + refs[:2])  # duplicados se consultan una vez
+
+    assert [r["referencia_catastral"] for r in result.resultados] == refs
+    assert [r["superficie_m2"] for r in result.resultados] == [float(i) for i in range(1, 13)]
+    assert sum(catastro.requests.values()) == 12
+
+
+def test_transient_errors_are_retried(stub, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Un HTTP 503 se reintenta con backoff; un error persistente se reporta."""
+    catastro, config = stub
+    refs = _refs(3)
+    catastro.failures[refs[0]] = 2
+    catastro.failures[refs[1]] = 10
+    fetcher = CatastroBatchFetcher(
+        config=config, max_workers=2, rate_per_second=None, max_retries=2, backoff_base=0.001
+    )
+
+    result = fetcher.fetch(refs)
+
+    assert [r["referencia_catastral"] for r in result.resultados] == [refs[0], refs[2]]
+    assert set(result.errores) == {refs[1]}
+    assert catastro.requests[refs[0]] == 3
+    assert result.retries == 4
+
+    with pytest.raises(CatastroSOAPError):
+        fetcher.fetch([refs[1]], continue_on_error=False)
+
+
+def test_cache_skips_seen_references(stub, tmp_path: Path) -> None:
+    """En la segunda ejecución solo se consultan las referencias nuevas."""
+    catastro, config = stub
+    refs = _refs(6)
+    cache_path = tmp_path / "catastro_cache.db"
+
+    first = CatastroSOAPClient(config).get_buildings_batch(
+        refs[:4], delay_seconds=0, max_workers=3, cache_path=cache_path
+    )
+    fetcher = CatastroBatchFetcher(
+        config=config, rate_per_second=None, cache=ResponseCache(cache_path)
+    )
+    second = fetcher.fetch(refs)
+    fetcher.close()
+
+    assert len(first) == 4
+    assert second.cache_hits == 4
+    assert second.fetched == 2
+    assert len(second.resultados) == 6
+    assert all(count == 1 for count in catastro.requests.values())
+
+
+def test_token_bucket_limits_rate() -> None:
+    """Tras agotar la ráfaga, cada token espera 1 / rate segundos."""
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[0] == 0.0
+    assert sum(waits[1:]) == pytest.approx(3 / 50, rel=0.5)
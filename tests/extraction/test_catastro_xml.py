@@ -0,0 +1,115 @@
+"""
+Tests del parser en streaming de XML masivos del Catastro (src.extraction.catastro_xml).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.extraction.catastro_xml import (
+    CATASTRO_DTYPES,
+    PYARROW_AVAILABLE,
+    export_catastro_xml,
+    iter_catastro_batches,
+    iter_catastro_records,
+    load_catastro_xml_to_sqlite,
+)
+
+BIE_TEMPLATE = (
+    "<BIE><IBI><RCA><PCA>{ref}</PCA></RCA><SUP>{sup}</SUP><ACO>{aco}</ACO></IBI>"
+    "<DTR>CL VERDI {num}</DTR><LEC><ELC><PLA>{pla}</PLA></ELC></LEC></BIE>"
+)
+
+
+def _write_xml(path: Path, n: int, with_orphan: bool = False) -> Path:
+    """XML con estructura DS -> LDS -> DSA -> LBI -> BIE y ``n`` inmuebles."""
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write('<?xml version="1.0" encoding="UTF-8"?>\n<DS><CAB><FEC>2025-01-01</FEC></CAB><LDS><DSA><LBI>')
+        for i in range(n):
+            handle.write(
+                BIE_TEMPLATE.format(ref=f"{i:07d}DF2800A0001", sup=50 + i % 100, aco=1900 + i % 120, num=i, pla=1 + i % 8)
+            )
+        if with_orphan:
+            handle.write("<BIE><IBI><SUP>10</SUP></IBI></BIE>")  # sin referencia
+        handle.write("</LBI></DSA></LDS></DS>")
+    return path
+
+
+def test_iter_records_extracts_fields(tmp_path: Path) -> None:
+    """Cada BIE con referencia produce un registro con sus campos."""
+    xml_path = _write_xml(tmp_path / "masivo.xml", 3, with_orphan=True)
+
+    records = list(iter_catastro_records(xml_path))
+
+    assert len(records) == 3
+    assert records[1] == {
+        "referencia_catastral": "0000001DF2800A0001",
+        "direccion_normalizada": "CL VERDI 1",
+        "superficie_m2": "51",
+        "ano_construccion": "1901",
+        "plantas": "2",
+    }
+
+
+def test_batches_are_typed_and_fixed_size(tmp_path: Path) -> None:
+    xml_path = _write_xml(tmp_path / "masivo.xml", 25)
+
+    batches = list(iter_catastro_batches(xml_path, batch_size=10))
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert {col: str(dtype) for col, dtype in batches[0].dtypes.items()} == CATASTRO_DTYPES
+    assert batches[2]["superficie_m2"].iloc[-1] == 74.0
+
+
+@pytest.mark.parametrize("suffix", [".csv"] + ([".parquet"] if PYARROW_AVAILABLE else []))
+def test_export_round_trip(tmp_path: Path, suffix: str) -> None:
+    xml_path = _write_xml(tmp_path / "masivo.xml", 30)
+    out_path = tmp_path / f"catastro{suffix}"
+
+    stats = export_catastro_xml(xml_path, out_path, batch_size=7, log_interval=0)
+
+    df = pd.read_parquet(out_path) if suffix == ".parquet" else pd.read_csv(out_path)
+    assert stats["records"] == 30
+    assert stats["bytes_read"] == xml_path.stat().st_size
+    assert len(df) == 30
+    assert df["ano_construccion"].tolist() == [1900 + i for i in range(30)]
+    assert not out_path.with_name(out_path.name + ".tmp").exists()
+
+
+def test_load_to_sqlite(tmp_path: Path) -> None:
+    xml_path = _write_xml(tmp_path / "masivo.xml", 12)
+    conn = sqlite3.connect(tmp_path / "db.sqlite")
+    try:
+        load_catastro_xml_to_sqlite(xml_path, conn, batch_size=5, log_interval=0)
+        stats = load_catastro_xml_to_sqlite(xml_path, conn, batch_size=5, limit=4, log_interval=0)
+
+        count, plantas = conn.execute(
+            "SELECT COUNT(*), SUM(plantas) FROM fact_catastro_inmuebles"
+        ).fetchone()
+        assert stats["records"] == 4
+        assert count == 4  # replace=True vacía la tabla
+        assert plantas == 1 + 2 + 3 + 4
+    finally:
+        conn.close()
+
+
+def test_memory_does_not_grow_with_file_size(tmp_path: Path) -> None:
+    """La memoria máxima del parseo no escala con el número de inmuebles."""
+
+    def peak_bytes(n: int) -> int:
+        xml_path = _write_xml(tmp_path / f"masivo_{n}.xml", n)
+        tracemalloc.start()
+        for _ in iter_catastro_records(xml_path):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    small, large = peak_bytes(2_000), peak_bytes(20_000)
+
+    assert large < 2 * small
@@ -0,0 +1,79 @@
+"""Tests para las copias Parquet de archivos raw (src/extraction/columnar.py)."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.extraction.base import BaseExtractor
+from src.extraction.columnar import (
+    PARQUET_MIRROR_ENV,
+    find_parquet_mirror,
+    mirror_path_for,
+    read_tabular,
+    write_parquet_mirror,
+)
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def raw_csv(tmp_path: Path) -> Path:
+    df = pd.DataFrame(
+        {
+            "Any": [2023, 2023, 2024, 2024],
+            "Codi_Barri": [1, 2, 1, np.nan],
+            "Nom_Barri": ["el Raval", "el Barri Gòtic", "el Raval", None],
+            "Sexe": ["Home", "Dona", "Home", "Dona"],
+            "Valor": [10.5, 11.0, 12.25, 13.0],
+        }
+    )
+    path = tmp_path / "opendatabcn_demo.csv"
+    pd.concat([df, df], ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+def test_read_tabular_matches_read_csv(raw_csv: Path) -> None:
+    mirror = write_parquet_mirror(raw_csv)
+
+    assert mirror == mirror_path_for(raw_csv)
+    assert find_parquet_mirror(raw_csv) == mirror
+    pd.testing.assert_frame_equal(read_tabular(raw_csv), pd.read_csv(raw_csv))
+
+
+def test_mirror_keeps_stable_categories(raw_csv: Path) -> None:
+    write_parquet_mirror(raw_csv)
+    df = read_tabular(raw_csv, keep_categories=True)
+
+    assert isinstance(df["Sexe"].dtype, pd.CategoricalDtype)
+    assert list(df["Sexe"].cat.categories) == ["Dona", "Home"]
+
+
+def test_stale_mirror_is_ignored(raw_csv: Path) -> None:
+    write_parquet_mirror(raw_csv)
+    with open(raw_csv, "a", encoding="utf-8") as file:
+        file.write("2025,3,Sants,Home,1.0\n")
+
+    assert find_parquet_mirror(raw_csv) is None
+    assert len(read_tabular(raw_csv)) == 9
+
+
+def test_mirror_can_be_disabled(raw_csv: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(PARQUET_MIRROR_ENV, "0")
+
+    assert write_parquet_mirror(raw_csv) is None
+    assert not mirror_path_for(raw_csv).exists()
+
+
+def test_save_raw_data_writes_mirror(tmp_path: Path) -> None:
+    extractor = BaseExtractor("OpenDataBCN", rate_limit_delay=0, output_dir=tmp_path)
+    df = pd.DataFrame({"Any": [2024], "Nom_Barri": ["Sants"], "Valor": [1]})
+
+    path = extractor._save_raw_data(df, "demo", format="csv")
+
+    assert find_parquet_mirror(path) == path.with_suffix(".parquet")
+    assert os.path.exists(tmp_path / "manifest.json")
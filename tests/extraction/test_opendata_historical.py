@@ -0,0 +1,130 @@
+"""
+Tests de la descarga histórica en paralelo de Open Data BCN contra un CKAN local.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from src.extraction.opendata import OpenDataBCNExtractor
+
+DATASETS = {"atles-renda": [2019, 2020, 2021], "pad_dom": [2020, 2021]}
+
+
+class StubCKAN:
+    """CKAN mínimo: ``package_show`` y un CSV por dataset y año."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.base_url = ""
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                parsed = urlparse(self.path)
+                if parsed.path.endswith("/package_show"):
+                    dataset_id = parse_qs(parsed.query)["id"][0]
+                    if dataset_id not in DATASETS:
+                        self._send(404, b"{}")
+                        return
+                    resources = [
+                        {
+                            "name": f"{year}_{dataset_id}.csv",
+                            "format": "CSV",
+                            "url": f"{stub.base_url}/files/{dataset_id}/{year}.csv",
+                        }
+                        for year in DATASETS[dataset_id]
+                    ]
+                    self._send(200, json.dumps({"result": {"resources": resources}}).encode())
+                    return
+
+                _, _, dataset_id, filename = parsed.path.split("/")
+                year = int(filename[:4])
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                # El año más antiguo tarda más: termina el último
+                time.sleep(stub.delay * (3 if year == DATASETS[dataset_id][0] else 1))
+                with stub._lock:
+                    stub.in_flight -= 1
+                rows = "".join(f"{barrio},{year * 10 + barrio}\n" for barrio in range(1, 4))
+                self._send(200, f"Codi_Barri,Valor\n{rows}".encode())
+
+            def _send(self, status: int, payload: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def ckan(tmp_path: Path) -> Iterator[tuple]:
+    stub = StubCKAN()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    stub.base_url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    extractor = OpenDataBCNExtractor(rate_limit_delay=0, output_dir=tmp_path)
+    extractor.API_URL = f"{stub.base_url}/api/3/action"
+    try:
+        yield stub, extractor
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_downloads_all_datasets_concurrently(ckan) -> None:
+    """Los recursos de todos los datasets se descargan a la vez, con el límite por host."""
+    stub, extractor = ckan
+
+    results = extractor.download_datasets_historical(
+        list(DATASETS) + ["inexistente"], 2019, 2021, max_concurrency=3
+    )
+
+    assert 1 < stub.max_in_flight <= 3
+    df, metadata = results["atles-renda"]
+    # Orden de los recursos, no de finalización de las descargas
+    assert df["Any"].tolist() == [2019] * 3 + [2020] * 3 + [2021] * 3
+    assert df["Valor"].iloc[-1] == 20213
+    assert metadata["success"] and metadata["coverage_percentage"] == 100
+    assert [r["year"] for r in metadata["resources_downloaded"]] == [2019, 2020, 2021]
+
+    df, metadata = results["pad_dom"]
+    assert len(df) == 6
+    assert metadata["missing_years"] == [2019]
+
+    df, metadata = results["inexistente"]
+    assert df is None
+    assert metadata["error"] == "Dataset no encontrado"
+
+
+def test_single_dataset_matches_batch(ckan) -> None:
+    """``download_dataset_historical`` devuelve lo mismo que la ruta por lotes."""
+    _, extractor = ckan
+
+    df, metadata = extractor.download_dataset_historical("atles-renda", 2020, 2021)
+
+    assert df["Any"].tolist() == [2020] * 3 + [2021] * 3
+    assert metadata["available_years"] == [2020, 2021]
+    saved = list((Path(extractor.output_dir) / "opendatabcn").glob("opendatabcn_atles-renda_*.csv"))
+    assert len(saved) == 1
+    pd.testing.assert_frame_equal(pd.read_csv(saved[0]), df)
@@ -0,0 +1,114 @@
+"""
+Tests de la caché raw direccionada por contenido y las peticiones condicionales.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pytest
+
+from src.extraction.base import BaseExtractor
+from src.extraction.raw_cache import sha256_bytes
+
+
+class StubServer:
+    """Servidor con ``ETag`` en ``/etag`` y sin validadores en ``/plain``."""
+
+    def __init__(self) -> None:
+        self.body = b"Codi_Barri,Valor\n1,10\n"
+        self.requests = []
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                etag = f'"{sha256_bytes(stub.body)[:16]}"'
+                stub.requests.append((self.path, self.headers.get("If-None-Match")))
+                if self.path == "/etag" and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if self.path == "/etag":
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(stub.body)))
+                self.end_headers()
+                self.wfile.write(stub.body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def server() -> Iterator[tuple]:
+    stub = StubServer()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield stub, f"http://127.0.0.1:{httpd.server_port}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _manifest(output_dir: Path) -> list:
+    return json.loads((output_dir / "manifest.json").read_text(encoding="utf-8"))
+
+
+def test_save_identical_content_registers_existing_blob(tmp_path: Path) -> None:
+    """Guardar dos veces el mismo contenido no crea un segundo archivo."""
+    extractor = BaseExtractor("Demo", rate_limit_delay=0, output_dir=tmp_path)
+    df = pd.DataFrame({"barrio_id": [1, 2], "valor": [10.5, 11.0]})
+
+    first = extractor._save_raw_data(df, "demo", format="csv", data_type="demographics")
+    second = extractor._save_raw_data(df.copy(), "demo", format="csv", data_type="demographics")
+    third = extractor._save_raw_data(df.assign(valor=0), "demo", format="csv", data_type="demographics")
+
+    assert len(list((tmp_path / "demo").glob("*.csv"))) == 2
+    assert second != first and second.read_bytes() == first.read_bytes()
+    pd.testing.assert_frame_equal(pd.read_csv(second), df)
+    entries = _manifest(tmp_path)
+    assert [entry["file_path"] for entry in entries] == [
+        str(path.relative_to(tmp_path)) for path in (first, second, third)
+    ]
+    assert entries[0]["sha256"] == entries[1]["sha256"] != entries[2]["sha256"]
+
+
+def test_conditional_request_reuses_blob_on_304(tmp_path: Path, server) -> None:
+    stub, base_url = server
+    extractor = BaseExtractor("Demo", rate_limit_delay=0, output_dir=tmp_path)
+
+    first = extractor._fetch_cached(f"{base_url}/etag", suffix=".csv")
+    second = extractor._fetch_cached(f"{base_url}/etag", suffix=".csv")
+    stub.body = b"Codi_Barri,Valor\n1,12\n"
+    third = extractor._fetch_cached(f"{base_url}/etag", suffix=".csv")
+
+    assert [status for status in (first.status_code, second.status_code, third.status_code)] == [200, 304, 200]
+    assert stub.requests[0][1] is None and stub.requests[1][1] is not None
+    assert second.unchanged and not third.unchanged
+    assert second.path == first.path
+    assert third.content == stub.body
+
+
+def test_hash_match_without_validators(tmp_path: Path, server) -> None:
+    """Sin ``ETag`` se descarga de nuevo, pero el contenido igual se detecta por hash."""
+    stub, base_url = server
+    extractor = BaseExtractor("Demo", rate_limit_delay=0, output_dir=tmp_path)
+
+    first = extractor._fetch_cached(f"{base_url}/plain")
+    second = extractor._fetch_cached(f"{base_url}/plain")
+
+    assert len(stub.requests) == 2
+    assert not first.unchanged and second.unchanged
+    assert second.path == first.path
+    assert len(list((tmp_path / "_cache" / "blobs").rglob("*"))) == 2  # subdirectorio + blob
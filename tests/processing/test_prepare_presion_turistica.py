@@ -158,3 +158,40 @@ def test_prepare_presion_turistica_empty_barrios_df(tmp_path: Path) -> None:
     with pytest.raises(ValueError, match="barrios_df no puede estar vacío"):
         prepare_presion_turistica(raw_data_path=raw_dir, barrios_df=empty_barrios)
 
+
+def test_prepare_presion_turistica_streams_calendar_and_reviews(
+    tmp_path: Path, barrios_df: pd.DataFrame
+) -> None:
+    """El modo por bloques debe producir las mismas métricas que la carga completa."""
+    raw_dir = tmp_path / "airbnb"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+
+    pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "neighbourhood": ["Barrio 1", "Barrio 1", "Barrio 2"],
+            "room_type": ["Entire home/apt", "Private room", "Entire home/apt"],
+            "price": ["100", "50", "80"],
+            "last_review": ["2024-01-15", "2024-01-20", "2024-01-10"],
+        }
+    ).to_csv(raw_dir / "insideairbnb_listings_20240101.csv", index=False)
+    pd.DataFrame(
+        {
+            "listing_id": [1, 1, 2, 2, 3, 3, 99],
+            "date": ["2024-01-01", "2024-01-02"] * 3 + ["2024-01-01"],
+            "available": ["f", "t", "f", "f", "t", "t", "f"],
+            "price": ["$100"] * 7,
+        }
+    ).to_csv(raw_dir / "calendar.csv.gz", index=False)
+    pd.DataFrame(
+        {"listing_id": [1, 2, 3, 3], "date": ["2024-01-05"] * 4}
+    ).to_csv(raw_dir / "reviews.csv", index=False)
+
+    streamed = prepare_presion_turistica(raw_dir, barrios_df, chunksize=2)
+    in_memory = prepare_presion_turistica(raw_dir, barrios_df, chunksize=None)
+
+    pd.testing.assert_frame_equal(streamed, in_memory)
+    by_barrio = streamed.set_index("barrio_id")
+    assert by_barrio.loc[1, "tasa_ocupacion"] == pytest.approx(0.75)
+    assert by_barrio.loc[2, "tasa_ocupacion"] == 0.0
+    assert by_barrio.loc[2, "num_reviews_mes"] == 2
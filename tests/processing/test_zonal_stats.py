@@ -0,0 +1,122 @@
+"""
+Tests unitarios para el motor de estadísticas zonales (zonal_stats).
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processing.prepare_ruido import _raster_indicator, _raster_year
+from src.processing.zonal_stats import (
+    ZonalAccumulator,
+    rasterize_labels,
+    zonal_statistics_array,
+)
+from src.transform.geometry import BACKEND_NUMPY, BarrioGeometryIndex
+
+
+def _rectangle(x0: float, width: float, height: float) -> dict:
+    ring = [[x0, 0], [x0 + width, 0], [x0 + width, height], [x0, height], [x0, 0]]
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+@pytest.fixture
+def geometry_index() -> BarrioGeometryIndex:
+    """Barrio 10 = mitad izquierda, barrio 20 = mitad derecha de un ráster 4x4."""
+    return BarrioGeometryIndex(
+        pd.DataFrame(
+            {
+                "barrio_id": [10, 20],
+                "geometry_json": [
+                    json.dumps(_rectangle(0, 2, 4)),
+                    json.dumps(_rectangle(2, 2, 4)),
+                ],
+            }
+        ),
+        backend=BACKEND_NUMPY,
+    )
+
+
+# Píxeles de 1x1 con origen arriba a la izquierda en (0, 4)
+TRANSFORM = (1.0, 0.0, 0.0, 0.0, -1.0, 4.0)
+
+
+def test_rasterize_labels_uses_pixel_centers(geometry_index: BarrioGeometryIndex) -> None:
+    """Cada píxel recibe la etiqueta del barrio que contiene su centro."""
+    labels = rasterize_labels(geometry_index, TRANSFORM, (4, 5), block_rows=3)
+
+    expected_row = [1, 1, 2, 2, 0]
+    assert labels.tolist() == [expected_row] * 4
+
+
+def test_zonal_statistics_array_matches_numpy(geometry_index: BarrioGeometryIndex) -> None:
+    """Media, extremos, percentiles y % de área > 65 dB coinciden con NumPy."""
+    labels = rasterize_labels(geometry_index, TRANSFORM, (4, 4))
+    lden = np.array(
+        [
+            [60.0, 70.0, 50.0, 50.0],
+            [62.0, 66.0, 55.0, -1.0],
+            [58.0, 64.0, 52.0, 51.0],
+            [61.0, 68.0, np.nan, 53.0],
+        ],
+        dtype=np.float32,
+    )
+    ln = lden - 10
+
+    stats = zonal_statistics_array(
+        np.stack([lden, ln]), labels, geometry_index.barrio_ids, nodata=-1.0, block_rows=1
+    )
+
+    left = stats[1].set_index("barrio_id").loc[10]
+    left_values = lden[:, :2].ravel()
+    assert left["n_pixeles"] == 8
+    assert left["media"] == pytest.approx(left_values.mean())
+    assert left["minimo"] == 58.0
+    assert left["maximo"] == 70.0
+    assert left["p50"] == pytest.approx(
+        np.percentile(left_values, 50, method="inverted_cdf"), abs=0.1
+    )
+    assert left["pct_area_above_65db"] == pytest.approx(37.5)
+
+    right = stats[1].set_index("barrio_id").loc[20]
+    assert right["n_pixeles"] == 6  # sin nodata ni NaN
+    assert right["pct_area_above_65db"] == 0.0
+    assert stats[2].set_index("barrio_id").loc[10, "media"] == pytest.approx(
+        left_values.mean() - 10
+    )
+
+
+def test_accumulator_is_block_invariant(geometry_index: BarrioGeometryIndex) -> None:
+    """Acumular por bloques da el mismo resultado que un único bloque."""
+    rng = np.random.default_rng(3)
+    labels = rasterize_labels(geometry_index, TRANSFORM, (4, 4))
+    values = rng.uniform(40, 80, (4, 4))
+
+    one_pass = ZonalAccumulator(2)
+    one_pass.add(labels, values, np.ones_like(labels, dtype=bool))
+    blocked = zonal_statistics_array(values, labels, geometry_index.barrio_ids, block_rows=1)
+
+    pd.testing.assert_frame_equal(one_pass.to_frame(geometry_index.barrio_ids), blocked[1])
+
+
+@pytest.mark.parametrize(
+    "name, indicator",
+    [
+        ("MER_2017_Lden", "nivel_lden_medio"),
+        ("mapa_soroll_ln_2022", "nivel_ln_noche"),
+        ("Ld2012", "nivel_ld_dia"),
+        ("mapa_ruido", None),
+    ],
+)
+def test_raster_indicator_from_name(name: str, indicator: str) -> None:
+    """El indicador se deduce de los tokens del nombre de archivo o banda."""
+    assert _raster_indicator(name) == indicator
+
+
+def test_raster_year_from_name() -> None:
+    assert _raster_year("MER_2017_Lden") == 2017
+    assert _raster_year("mapa_ruido_v12345") is None
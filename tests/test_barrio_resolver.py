@@ -0,0 +1,82 @@
+"""Tests para BarrioResolver (src/etl/transformations/utils.py)."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from src.etl.transformations.utils import (
+    BarrioResolver,
+    _map_territorio_to_barrio_id,
+    cleaner,
+    get_barrio_resolver,
+)
+
+
+@pytest.fixture
+def dim_barrios() -> pd.DataFrame:
+    nombres = [
+        "el Raval",
+        "el Barri Gòtic",
+        "l'Antiga Esquerra de l'Eixample",
+        "Sants",
+        "Sants - Badal",
+        "la Guineueta",
+    ]
+    df = pd.DataFrame({"barrio_id": range(1, len(nombres) + 1), "barrio_nombre": nombres})
+    df["barrio_nombre_normalizado"] = df["barrio_nombre"].map(cleaner.normalize_neighborhoods)
+    return df
+
+
+@pytest.mark.parametrize(
+    ("territorio", "expected"),
+    [
+        ("el Raval", 1),
+        ("EL BARRI GÒTIC", 2),
+        ("Antiga Esquerra Eixample", 3),  # alias del cleaner
+        ("Guineueta", 6),  # alias del cleaner
+        ("Sants", 4),
+        ("Badal", 5),  # subcadena del nombre
+        ("el Ravall", 1),  # coincidencia aproximada
+        ("Barcelona", None),
+    ],
+)
+def test_resolve_barri(dim_barrios: pd.DataFrame, territorio: str, expected) -> None:
+    resolver = BarrioResolver(dim_barrios)
+    assert resolver.resolve(territorio, "Barri") == expected
+    assert _map_territorio_to_barrio_id(territorio, "Barri", dim_barrios) == expected
+
+
+def test_aggregated_levels_are_not_mapped(dim_barrios: pd.DataFrame) -> None:
+    resolver = BarrioResolver(dim_barrios)
+    assert resolver.resolve("Ciutat Vella", "Districte") is None
+    assert resolver.resolve("Barcelona", "Municipi") is None
+
+
+def test_resolve_many_maps_unique_values_once(
+    dim_barrios: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    resolver = BarrioResolver(dim_barrios)
+    calls = []
+    original = resolver._resolve_barri
+    monkeypatch.setattr(
+        resolver, "_resolve_barri", lambda value: calls.append(value) or original(value)
+    )
+
+    series = pd.Series(["el Raval", "Sants", "el Raval", None, "Sants"], index=[10, 11, 12, 13, 14])
+    types = pd.Series(["Barri", "Barri", "Barri", "Barri", "Districte"], index=series.index)
+    result = resolver.resolve_many(series, types)
+
+    assert result.dtype == "Int64"
+    assert result.index.tolist() == [10, 11, 12, 13, 14]
+    assert result.tolist() == [1, 4, 1, pd.NA, pd.NA]
+    assert sorted(calls) == ["Sants", "el Raval"]
+
+
+def test_get_barrio_resolver_reuses_instance(dim_barrios: pd.DataFrame) -> None:
+    first = get_barrio_resolver(dim_barrios)
+    assert get_barrio_resolver(dim_barrios.copy()) is first
+
+    changed = dim_barrios.copy()
+    changed.loc[0, "barrio_nombre"] = "Raval"
+    assert get_barrio_resolver(changed) is not first
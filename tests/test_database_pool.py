@@ -0,0 +1,94 @@
+"""
+Tests para el pool de conexiones de solo lectura (src.database_pool).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.database_pool import ReadOnlyConnectionPool, get_pool, get_readonly_connection
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    path = tmp_path / "database.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE dim_barrios (barrio_id INTEGER PRIMARY KEY, barrio_nombre TEXT)")
+    conn.executemany("INSERT INTO dim_barrios VALUES (?, ?)", [(1, "Raval"), (2, "Gòtic")])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_close_returns_connection_to_pool(db_path: Path) -> None:
+    """``close()`` devuelve la conexión y la siguiente petición la reutiliza."""
+    pool = ReadOnlyConnectionPool(db_path)
+
+    conn = pool.acquire()
+    conn.close()
+    conn.close()  # un segundo close() no la duplica en el pool
+
+    assert pool.idle_count == 1
+    assert pool.acquire() is conn
+
+
+def test_connections_are_read_only(db_path: Path) -> None:
+    """Las conexiones del pool no pueden escribir."""
+    conn = get_readonly_connection(db_path)
+    try:
+        assert pd.read_sql("SELECT COUNT(*) AS n FROM dim_barrios", conn)["n"].iloc[0] == 2
+        with pytest.raises(sqlite3.DatabaseError):
+            conn.execute("INSERT INTO dim_barrios VALUES (3, 'Sants')")
+    finally:
+        conn.close()
+
+
+def test_rebuilt_database_invalidates_connections(db_path: Path) -> None:
+    """Si el archivo cambia, las conexiones antiguas se descartan."""
+    pool = ReadOnlyConnectionPool(db_path)
+    old = pool.acquire()
+    old.close()
+
+    writer = sqlite3.connect(db_path)
+    writer.execute("INSERT INTO dim_barrios VALUES (3, 'Sants')")
+    writer.commit()
+    writer.close()
+    stat = db_path.stat()
+    os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    conn = pool.acquire()
+    try:
+        assert conn is not old
+        assert conn.execute("SELECT COUNT(*) FROM dim_barrios").fetchone()[0] == 3
+    finally:
+        conn.close()
+
+
+def test_shared_pool_across_threads(db_path: Path) -> None:
+    """El pool compartido atiende consultas concurrentes sin abrir una conexión por consulta."""
+    pool = get_pool(db_path)
+    pool.close_all()
+
+    def query(_: int) -> int:
+        conn = get_readonly_connection(db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM dim_barrios").fetchone()[0]
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(query, range(50)))
+
+    assert results == [2] * 50
+    assert 1 <= pool.idle_count <= 4
+
+
+def test_missing_database_raises(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        get_readonly_connection(tmp_path / "missing.db")
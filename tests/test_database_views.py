@@ -7,7 +7,11 @@ import tempfile
 from pathlib import Path
 
 from src.database_setup import create_connection, create_database_schema
-from src.database_views import create_analytical_views
+from src.database_views import (
+    create_analytical_views,
+    get_materialized_views_info,
+    refresh_materialized_views,
+)
 
 
 def _get_conn(tmpdir: str) -> sqlite3.Connection:
@@ -214,3 +218,96 @@ def test_v_gentrificacion_tendencias_basic_signal() -> None:
             conn.close()
 
 
+def _insert_barrio_with_prices(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        INSERT INTO dim_barrios (
+            barrio_id, barrio_nombre, barrio_nombre_normalizado,
+            distrito_id, distrito_nombre, municipio, ambito,
+            codi_districte, codi_barri, geometry_json,
+            source_dataset, etl_created_at, etl_updated_at
+        ) VALUES (1, 'Test', 'test', 1, 'Distrito', 'Barcelona', 'barri',
+                  '01', '01', NULL, 'test', 'ts', 'ts')
+        """,
+    )
+    conn.execute(
+        """
+        INSERT INTO fact_precios (
+            barrio_id, anio, periodo, trimestre,
+            precio_m2_venta, precio_mes_alquiler,
+            dataset_id, source, etl_loaded_at
+        ) VALUES (1, 2020, '2020', NULL, 3000.0, NULL, 'test', 'unit', 'ts')
+        """,
+    )
+    conn.commit()
+
+
+def test_refresh_materialized_views_creates_indexed_tables() -> None:
+    """Las vistas se materializan en tablas mv_* indexadas y versionadas por run_id."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = _get_conn(tmpdir)
+        try:
+            create_database_schema(conn)
+            _insert_barrio_with_prices(conn)
+            # El scorecard aún lee num_licencias_vut de fact_regulacion
+            conn.execute("ALTER TABLE fact_regulacion ADD COLUMN num_licencias_vut INTEGER")
+            conn.commit()
+
+            refreshed = refresh_materialized_views(conn, run_id="etl_1")
+
+            assert refreshed["v_precios_evolucion_anual"] == 1
+            assert "v_barrio_scorecard" in refreshed
+            view_sql = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'v_barrio_scorecard'"
+            ).fetchone()[0]
+            assert "mv_barrio_scorecard" in view_sql
+
+            plan = " ".join(
+                str(row[-1])
+                for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM v_barrio_scorecard WHERE barrio_id = ?",
+                    (1,),
+                )
+            )
+            assert "USING INDEX" in plan
+
+            info = {row["view_name"]: row for row in get_materialized_views_info(conn)}
+            assert info["v_precios_evolucion_anual"]["etl_run_id"] == "etl_1"
+            assert info["v_precios_evolucion_anual"]["table_name"] == "mv_precios_evolucion_anual"
+        finally:
+            conn.close()
+
+
+def test_refresh_materialized_views_picks_up_new_data() -> None:
+    """Un segundo refresco recalcula desde las tablas de hechos y actualiza la versión."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = _get_conn(tmpdir)
+        try:
+            create_database_schema(conn)
+            _insert_barrio_with_prices(conn)
+            refresh_materialized_views(conn, run_id="etl_1")
+
+            conn.execute(
+                """
+                INSERT INTO fact_precios (
+                    barrio_id, anio, periodo, trimestre,
+                    precio_m2_venta, precio_mes_alquiler,
+                    dataset_id, source, etl_loaded_at
+                ) VALUES (1, 2021, '2021', NULL, 3300.0, NULL, 'test', 'unit', 'ts')
+                """,
+            )
+            conn.commit()
+            refresh_materialized_views(conn, run_id="etl_2", views=["v_precios_evolucion_anual"])
+
+            years = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT anio FROM v_precios_evolucion_anual ORDER BY anio"
+                )
+            ]
+            assert years == [2020, 2021]
+            info = {row["view_name"]: row for row in get_materialized_views_info(conn)}
+            assert info["v_precios_evolucion_anual"]["etl_run_id"] == "etl_2"
+            assert info["v_precios_evolucion_anual"]["row_count"] == 2
+        finally:
+            conn.close()
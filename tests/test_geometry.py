@@ -0,0 +1,90 @@
+"""
+Tests para el índice espacial de barrios (src.transform.geometry).
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.transform.geometry import (
+    BACKEND_NUMPY,
+    BACKEND_SHAPELY,
+    SHAPELY_AVAILABLE,
+    BarrioGeometryIndex,
+    get_barrio_geometry_index,
+    parse_geometry_json,
+)
+
+BACKENDS = [BACKEND_NUMPY] + ([BACKEND_SHAPELY] if SHAPELY_AVAILABLE else [])
+
+
+def _square(x0: float, y0: float, size: float) -> list:
+    return [[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size], [x0, y0]]
+
+
+@pytest.fixture
+def dim_barrios() -> pd.DataFrame:
+    """Dos barrios cuadrados contiguos; el segundo con un hueco en el centro."""
+    barrio_1 = {"type": "Polygon", "coordinates": [_square(2.10, 41.38, 0.01)]}
+    barrio_2 = {
+        "type": "MultiPolygon",
+        "coordinates": [[_square(2.11, 41.38, 0.01), _square(2.114, 41.384, 0.002)]],
+    }
+    return pd.DataFrame(
+        {
+            "barrio_id": [1, 2, 3],
+            "geometry_json": [json.dumps(barrio_1), json.dumps(barrio_2), None],
+        }
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_assign_points_basic(dim_barrios: pd.DataFrame, backend: str) -> None:
+    """Asigna cada punto a su barrio y deja NA fuera, en huecos y sin coordenadas."""
+    index = BarrioGeometryIndex(dim_barrios, backend=backend)
+    lon = pd.Series([2.105, 2.112, 2.115, 2.50, np.nan, "x"], index=list("abcdef"))
+    lat = pd.Series([41.385, 41.381, 41.385, 41.385, 41.385, 41.385], index=list("abcdef"))
+
+    result = index.assign_points(lon, lat)
+
+    assert len(index) == 2
+    assert str(result.dtype) == "Int64"
+    assert list(result.index) == list("abcdef")
+    assert result.tolist() == [1, 2, pd.NA, pd.NA, pd.NA, pd.NA]
+
+
+@pytest.mark.skipif(not SHAPELY_AVAILABLE, reason="shapely no instalado")
+def test_backends_agree_on_random_points(dim_barrios: pd.DataFrame) -> None:
+    """El backend NumPy debe coincidir con el STRtree de shapely."""
+    rng = np.random.default_rng(7)
+    lon = rng.uniform(2.09, 2.13, 5_000)
+    lat = rng.uniform(41.37, 41.40, 5_000)
+
+    numpy_result = BarrioGeometryIndex(dim_barrios, backend=BACKEND_NUMPY).assign_points(lon, lat)
+    shapely_result = BarrioGeometryIndex(dim_barrios, backend=BACKEND_SHAPELY).assign_points(
+        lon, lat
+    )
+
+    pd.testing.assert_series_equal(numpy_result, shapely_result)
+
+
+@pytest.mark.skipif(not SHAPELY_AVAILABLE, reason="shapely no instalado")
+def test_parse_geometry_json_accepts_wkt() -> None:
+    """Las geometrías en WKT se convierten a GeoJSON."""
+    parsed = parse_geometry_json("POLYGON ((0 0, 1 0, 1 1, 0 1, 0 0))")
+
+    assert parsed["type"] == "Polygon"
+    assert parse_geometry_json("") is None
+    assert parse_geometry_json("{no es json") is None
+
+
+def test_get_barrio_geometry_index_is_cached(dim_barrios: pd.DataFrame) -> None:
+    """La misma dimensión reutiliza el índice ya construido."""
+    first = get_barrio_geometry_index(dim_barrios)
+
+    assert get_barrio_geometry_index(dim_barrios.copy()) is first
+    assert get_barrio_geometry_index(dim_barrios.iloc[:1]) is not first
@@ -0,0 +1,123 @@
+"""
+Tests para el matching por bloques Idealista ↔ Catastro (src.transform.matching).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.transform.matching import (
+    METHOD_GEOGRAPHIC,
+    METHOD_HEURISTIC,
+    CatastroMatcher,
+    haversine_m,
+    match_listings_to_catastro,
+    superficie_tolerance,
+)
+
+# ~1 m en grados de latitud
+DEG_PER_M = 1 / 111_195
+
+
+@pytest.fixture
+def buildings() -> pd.DataFrame:
+    """Edificios en dos barrios; los de Gràcia separados 30 m en latitud."""
+    return pd.DataFrame(
+        {
+            "barrio_id": [28, 28, 28, 29],
+            "lat": [41.40, 41.40 + 30 * DEG_PER_M, 41.40 + 60 * DEG_PER_M, 41.45],
+            "lon": [2.15, 2.15, 2.15, 2.12],
+            "superficie_m2": [80.0, 80.0, 60.0, 80.0],
+            "habitaciones": [3, 3, 2, 3],
+        },
+        index=["A", "B", "C", "D"],
+    )
+
+
+def _brute_force_heuristic(listing: pd.Series, building: pd.Series) -> float:
+    score = 0.35 if listing["barrio_id"] == building["barrio_id"] else 0.0
+    diff = abs(listing["superficie_m2"] - building["superficie_m2"]) / building["superficie_m2"]
+    tolerance = float(superficie_tolerance(np.array([listing["superficie_m2"]]))[0])
+    if diff <= tolerance:
+        score += 0.40 * (1 - diff / tolerance)
+    rooms = abs(listing["habitaciones"] - building["habitaciones"])
+    score += 0.15 if rooms == 0 else (0.08 if rooms == 1 else 0.0)
+    return score
+
+
+def test_barrio_block_matches_brute_force(buildings: pd.DataFrame) -> None:
+    """Sin coordenadas, el mejor candidato del barrio coincide con el cálculo par a par."""
+    listings = pd.DataFrame(
+        {"barrio_id": [28, 28, 29], "superficie_m2": [62.0, 85.0, 75.0], "habitaciones": [2, 3, 3]}
+    )
+
+    result = CatastroMatcher(buildings).match(listings)
+
+    for i, listing in listings.iterrows():
+        block = buildings[buildings["barrio_id"] == listing["barrio_id"]]
+        scores = block.apply(lambda b: _brute_force_heuristic(listing, b), axis=1)
+        assert result.loc[i, "catastro_index"] == scores.idxmax()
+        assert result.loc[i, "match_score"] == pytest.approx(scores.max())
+        assert result.loc[i, "match_method"] == METHOD_HEURISTIC
+    assert result["matched"].all()
+
+
+def test_geographic_match_prefers_nearest_building(buildings: pd.DataFrame) -> None:
+    """Con coordenadas gana el edificio cercano y se combina el score geográfico."""
+    listings = pd.DataFrame(
+        {
+            "barrio_id": [28],
+            "lat": [41.40 + 28 * DEG_PER_M],
+            "lon": [2.15],
+            "superficie_m2": [80.0],
+            "habitaciones": [3],
+        }
+    )
+
+    result = CatastroMatcher(buildings, max_distance_m=50).match(listings)
+
+    row = result.iloc[0]
+    assert row["catastro_index"] == "B"
+    assert row["match_distance_m"] == pytest.approx(2.0, abs=0.05)
+    assert row["match_score_geographic"] == pytest.approx(1 - row["match_distance_m"] / 50)
+    assert row["match_score"] == pytest.approx(
+        0.6 * row["match_score_geographic"] + 0.4 * row["match_score_heuristic"]
+    )
+    assert row["match_method"] == METHOD_GEOGRAPHIC
+
+
+def test_result_is_chunk_invariant(buildings: pd.DataFrame) -> None:
+    """Procesar los anuncios en bloques de uno da el mismo resultado."""
+    rng = np.random.default_rng(0)
+    listings = pd.DataFrame(
+        {
+            "barrio_id": rng.choice([28, 29], 40),
+            "lat": 41.40 + rng.uniform(-40, 100, 40) * DEG_PER_M,
+            "lon": np.full(40, 2.15),
+            "superficie_m2": rng.uniform(50, 100, 40),
+            "habitaciones": rng.integers(1, 4, 40),
+        }
+    )
+    listings.loc[::5, ["lat", "lon"]] = np.nan
+
+    expected = match_listings_to_catastro(listings, buildings)
+    chunked = match_listings_to_catastro(listings, buildings, chunk_size=1)
+
+    pd.testing.assert_frame_equal(expected, chunked)
+
+
+def test_listing_without_candidates_is_unmatched(buildings: pd.DataFrame) -> None:
+    """Un anuncio sin coordenadas ni barrio conocido no tiene candidatos."""
+    listings = pd.DataFrame({"barrio_id": [None, 99], "superficie_m2": [80.0, 80.0]})
+
+    result = CatastroMatcher(buildings).match(listings)
+
+    assert result["catastro_index"].isna().all()
+    assert not result["matched"].any()
+    assert (result["match_score"] == 0).all()
+
+
+def test_haversine_m_known_distance() -> None:
+    assert haversine_m(41.40, 2.15, 41.40 + 100 * DEG_PER_M, 2.15) == pytest.approx(100, rel=1e-3)